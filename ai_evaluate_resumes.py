@@ -7,6 +7,8 @@ import PyPDF2
 import openai
 from collections import defaultdict
 
+from utils.report_parser import parse_report_file
+
 # OpenAI API setup
 # Replace with your API key or set environment variable
 # openai.api_key = "your-api-key-here"
@@ -224,60 +226,17 @@ def generate_summary():
     # Process all evaluation files
     for eval_file in evaluations_dir.glob("*_evaluation.md"):
         try:
-            with open(eval_file, 'r') as f:
-                content = f.read()
-            
-            # Extract candidate name and role
-            name_role_match = re.search(r'# (.*?) - (.*?)\n', content)
-            name = name_role_match.group(1) if name_role_match else "Unknown"
-            role = name_role_match.group(2) if name_role_match else "Unknown"
-            
-            # Extract recommendation
-            recommendation_match = re.search(r'## 🏆 RECOMMENDATION: (.*?)\n', content)
-            recommendation = recommendation_match.group(1) if recommendation_match else "Unknown"
-            
-            # Extract total score
-            total_score_match = re.search(r'Sum of all positive flags: (.*?) = \*\*(.*?)\*\*', content)
-            total_score = total_score_match.group(2) if total_score_match else "0"
-            
-            # Extract critical flag score
-            critical_score_match = re.search(r'Sum of positive critical flags: (.*?) = \*\*(.*?)\*\*', content)
-            critical_score = critical_score_match.group(2) if critical_score_match else "0"
-            
-            # Extract green flag percentage
-            percentage_match = re.search(r'Green Flag Percentage: (.*?)%', content)
-            percentage = percentage_match.group(1) if percentage_match else "0"
-            
-            # Extract individual flag scores
-            flag_scores = {}
-            flag_pattern = re.compile(r'\| (\d+) \| \*\*(.*?)\*\* \| (.*?) \| (Critical)? \| ([-\d]+) \|')
-            for match in flag_pattern.finditer(content):
-                flag_id = match.group(1)
-                flag_score = match.group(5)
-                flag_scores[f"Flag_{flag_id}"] = int(flag_score) if flag_score.lstrip('-').isdigit() else 0
-            
-            # Extract strengths
-            strengths = []
-            strength_pattern = re.compile(r'- 💪 (.*?)\n')
-            for match in strength_pattern.finditer(content):
-                strengths.append(match.group(1))
-            
-            # Extract areas for improvement
-            improvements = []
-            improvement_pattern = re.compile(r'- [⚠️🔍] (.*?)\n')
-            for match in improvement_pattern.finditer(content):
-                improvements.append(match.group(1))
-            
+            report = parse_report_file(eval_file)
             candidates.append({
-                "name": name,
-                "role": role,
-                "recommendation": recommendation,
-                "total_score": float(total_score) if total_score.replace('.', '', 1).isdigit() else 0,
-                "critical_score": float(critical_score) if critical_score.replace('.', '', 1).isdigit() else 0,
-                "percentage": float(percentage) if percentage.replace('.', '', 1).isdigit() else 0,
-                "flag_scores": flag_scores,
-                "strengths": strengths,
-                "improvements": improvements,
+                "name": report.name,
+                "role": report.current_role,
+                "recommendation": report.recommendation,
+                "total_score": report.total_score,
+                "critical_score": report.critical_score,
+                "percentage": report.green_flag_percentage,
+                "flag_scores": {f"Flag_{flag.flag_id}": flag.score for flag in report.flags},
+                "strengths": report.strengths,
+                "improvements": report.concerns,
                 "file_path": str(eval_file)
             })
         except Exception as e:
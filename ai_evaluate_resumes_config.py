@@ -7,10 +7,42 @@ import os
 import json
 import re
 import time
+import argparse
 from pathlib import Path
-import PyPDF2
-from openai import OpenAI
 from collections import defaultdict
+from utils.rate_limiter import get_rate_limiter, estimate_request_tokens
+from utils.openai_clients import get_openai_client, get_client_stats
+from utils.resume_processor import extract_text_from_pdf_file
+from utils.extraction_pool import extract_pdfs_parallel
+from utils.job_ledger import JobLedger, QUEUED, EXTRACTED, EVALUATING, DONE, FAILED, SKIPPED
+from utils.batch_api import write_batch_input, submit_batch, wait_for_batch, download_batch_results
+from utils.results_store import get_results_store, record_from_markdown, record_from_structured
+from utils.structured_output import (
+    STRUCTURED_OUTPUT_INSTRUCTIONS, format_template, get_response_format,
+    parse_structured_evaluation, structured_evaluation_path
+)
+from utils.prescreen import AUTO_REJECT, build_prescreener, load_prescreen_config, write_prescreen_report
+from utils.dedup import DEFAULT_DEDUP_THRESHOLD, NearDuplicateIndex, minhash_signature, write_dedup_report
+from utils.prompt_builder import PromptCacheStats, build_messages, format_prompt_cache_summary
+from utils.retry_policy import RetryBudget, RetryPolicy, classify_error
+from utils.endpoint_guard import format_endpoint_summary, get_endpoint_guard
+from utils.model_cascade import CHEAP_TIER, STRONG_TIER, has_distinct_tiers, load_cascade_config, run_cascade
+from utils.packing import (
+    DEFAULT_PACK_TOKEN_BUDGET, DEFAULT_PACKED_REPORT_TOKENS, PACKING_INSTRUCTIONS, ResumePacker, max_pack_size_for,
+    pack_resume_text, split_packed_response
+)
+
+# Most completion tokens a model may be asked for, unless model_options.json sets "max_completion_tokens"
+DEFAULT_MAX_COMPLETION_TOKENS = 4096
+
+# Per-project job ledger, stored next to the project's PDFs
+JOB_LEDGER_FILENAME = ".job_ledger.jsonl"
+
+# Written next to the evaluations when resumes are pre-screened
+PRESCREEN_REPORT_FILENAME = "prescreen_report.csv"
+
+# Written next to the evaluations when near-duplicate resumes are linked
+DEDUP_REPORT_FILENAME = "dedup_report.csv"
 
 # Import the configuration loader
 class ConfigLoader:
@@ -63,6 +95,14 @@ class ConfigLoader:
         except Exception:
             return "Please evaluate the following resume: {resume_text}"
     
+    def get_prescreen_config(self):
+        """Get the local pre-screening settings."""
+        return load_prescreen_config(self.nice_to_configure_dir / "prescreen.json")
+    
+    def get_cascade_config(self):
+        """Get the cheap and strong models and the escalation band of the model cascade."""
+        return load_cascade_config(self.nice_to_configure_dir / "model_options.json")
+    
     def get_model_config(self, model_name=None):
         """Get the configuration for a specific model."""
         if not model_name:
@@ -96,50 +136,9 @@ class ConfigLoader:
         evaluation_with_name = evaluation.copy()
         evaluation_with_name["candidate_name"] = candidate_name
         
-        # Helper function to handle nested dictionary access with format strings
-        def nested_format(template_str, data_dict):
-            result = template_str
-            
-            # Find all format placeholders like {field} or {field[subfield]}
-            placeholders = re.findall(r'\{([^}]+)\}', template_str)
-            
-            for placeholder in placeholders:
-                # Handle nested dictionary access with square brackets like flag_scores[ai_ml_experience][score]
-                if '[' in placeholder and ']' in placeholder:
-                    parts = re.split(r'[\[\]]', placeholder)
-                    parts = [p for p in parts if p]  # Remove empty strings
-                    
-                    # Navigate the nested dictionary
-                    try:
-                        value = data_dict
-                        for part in parts:
-                            if isinstance(value, dict) and part in value:
-                                value = value[part]
-                            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
-                                value = value[int(part)]
-                            else:
-                                value = "N/A"  # Set a default value for missing keys
-                                break
-                        
-                        # Replace the placeholder with the value
-                        result = result.replace(f"{{{placeholder}}}", str(value))
-                    except Exception as e:
-                        print(f"Error accessing nested field {placeholder}: {e}")
-                        result = result.replace(f"{{{placeholder}}}", "N/A")
-                else:
-                    # Handle simple fields
-                    try:
-                        value = data_dict.get(placeholder, "N/A")
-                        result = result.replace(f"{{{placeholder}}}", str(value))
-                    except Exception as e:
-                        print(f"Error accessing field {placeholder}: {e}")
-                        result = result.replace(f"{{{placeholder}}}", "N/A")
-            
-            return result
-        
         # Format the output
         try:
-            return nested_format(template, evaluation_with_name)
+            return format_template(template, evaluation_with_name)
         except Exception as e:
             print(f"Error formatting output: {e}")
             return json.dumps(evaluation, indent=4)
@@ -172,13 +171,8 @@ class ConfigLoader:
         return self.config.get("pdf_path", "")
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file."""
-    with open(pdf_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-    return text
+    """Extract text from a PDF file, reusing the cached text if the file is unchanged."""
+    return extract_text_from_pdf_file(pdf_path)
 
 def get_current_role(text):
     """Extract the current role from resume text."""
@@ -199,95 +193,150 @@ def get_current_role(text):
     # Default if no role found
     return "Unknown Role"
 
-def evaluate_resume_with_ai(resume_text, candidate_name, config_loader):
-    """Use OpenAI to evaluate the resume using the provided configuration."""
-    # Get OpenAI API key
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        print("Error: OPENAI_API_KEY environment variable not set")
-        return None
-    
-    # Initialize the OpenAI client
-    client = OpenAI(api_key=api_key)
+def build_evaluation_request(resume_text, config_loader, structured=False, pack_size=1, model_name=None):
+    """
+    Build the chat completion request body for a resume from the configuration.
     
+    With `pack_size` > 1, `resume_text` holds that many delimited resumes (see utils/packing.py).
+    `model_name` overrides the configured model.
+    """
     # Get system prompt from config
     system_prompt = config_loader.get_system_prompt()
     
+    # Structured output swaps the report format for a JSON schema; packing asks for one report per candidate
+    instructions = STRUCTURED_OUTPUT_INSTRUCTIONS if structured else PACKING_INSTRUCTIONS if pack_size > 1 else None
+    
     # Get user prompt from config
     try:
         user_prompt_template = config_loader.get_user_prompt_template()
-        user_prompt = user_prompt_template.format(resume_text=resume_text)
+        # Prompts first and resume last, so every request shares the same cacheable prefix
+        messages = build_messages(system_prompt, user_prompt_template, resume_text, instructions=instructions)
         print("Using prompt template from config file")
     except Exception as e:
         print(f"Error loading prompt template: {e}")
         print("Using default prompt")
-        user_prompt = f"Please evaluate this resume: {resume_text}"
+        messages = build_messages(system_prompt, "Please evaluate this resume: {resume_text}", resume_text, instructions=instructions)
+    user_prompt = messages[-1]["content"]
     
     # Get model config
-    model_name = config_loader.config.get("model", "gpt-4-turbo")
+    model_name = model_name or config_loader.config.get("model", "gpt-4-turbo")
     model_config = config_loader.get_model_config(model_name)
     
     # Set defaults if not in config
     temperature = model_config.get("temperature", 0.2)
-    max_tokens = model_config.get("max_tokens", 4000)
+    if pack_size > 1:
+        # A packed reply holds one report per candidate; packs are sized to fit the completion limit
+        max_tokens = DEFAULT_PACKED_REPORT_TOKENS * pack_size
+    else:
+        max_tokens = model_config.get("max_tokens", 4000)
+    # The API rejects requests for more completion tokens than the model can produce
+    max_tokens = min(max_tokens, model_config.get("max_completion_tokens", DEFAULT_MAX_COMPLETION_TOKENS))
+    
+    request_body = {
+        "model": model_name,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    
+    # Check if we need JSON response format or not
+    if structured:
+        # Ask for the rubric as schema-checked JSON; the markdown report is rendered locally
+        print("Using structured JSON output")
+        request_body["response_format"] = get_response_format()
+    elif "json" in user_prompt.lower() or "json" in system_prompt.lower():
+        print("Using JSON response format")
+        request_body["response_format"] = {"type": "json_object"}
+    else:
+        # Use standard text response for Markdown
+        print("Using standard text response format")
+    
+    return request_body
+
+def evaluate_resume_with_ai(resume_text, candidate_name, config_loader, structured=False, prompt_cache_stats=None,
+                            request_body=None, model_name=None, retry_policy=None):
+    """
+    Use OpenAI to evaluate the resume using the provided configuration.
+    
+    The request's token usage is recorded under the candidate's name in `prompt_cache_stats`, if given.
+    A prebuilt `request_body` (e.g. for a pack of resumes) is sent instead of building one.
+    `model_name` overrides the configured model. Failed requests are retried per `retry_policy`.
+    """
+    # Get OpenAI API key
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OPENAI_API_KEY environment variable not set")
+        return None
+    
+    # Reuse the pooled client so connections stay warm across resumes; retries are left to the retry policy
+    client = get_openai_client(api_key).with_options(max_retries=0)
+    
+    request_body = request_body or build_evaluation_request(resume_text, config_loader, structured=structured, model_name=model_name)
+    model_name = request_body["model"]
+    system_prompt = request_body["messages"][0]["content"]
+    user_prompt = request_body["messages"][-1]["content"]
+    max_tokens = request_body["max_tokens"]
     
-    max_retries = 3
-    for attempt in range(max_retries):
+    # Shared RPM/TPM budget for this model
+    rate_limiter = get_rate_limiter(model_name)
+    # user_prompt already has the resume text filled in
+    estimated_tokens = estimate_request_tokens(system_prompt, user_prompt, "", max_tokens)
+    
+    retry_policy = retry_policy or RetryPolicy()
+    endpoint_guard = get_endpoint_guard(model_name)
+    
+    def send_request():
+        # Wait until the rate limits admit this request
+        waited = rate_limiter.acquire(estimated_tokens)
+        if waited:
+            print(f"Rate limit budget reached, waited {waited:.1f}s")
+        
+        print("Sending request to OpenAI API...")
         try:
-            print(f"Attempt {attempt+1}: Sending request to OpenAI API...")
-            
-            # Check if we need JSON response format or not
-            if "json" in user_prompt.lower() or "json" in system_prompt.lower():
-                print("Using JSON response format")
-                response = client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    response_format={"type": "json_object"}
-                )
-            else:
-                # Use standard text response for Markdown
-                print("Using standard text response format")
-                response = client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-            
-            # Get the response text
-            response_text = response.choices[0].message.content
-            
-            # Debug the response
-            print(f"Debug - Raw response first 100 chars: {response_text[:100]}...")
-            
-            # Save raw response to debug directory
-            debug_dir = Path("debug")
-            debug_dir.mkdir(exist_ok=True)
-            debug_file = debug_dir / f"{candidate_name.replace(' ', '_')}_response.txt"
-            with open(debug_file, 'w') as f:
-                f.write(response_text)
-            
-            # Simply return the raw response text - no parsing needed
-            return response_text
-            
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"Error: {e}. Retrying in 5 seconds...")
-                time.sleep(5)
-            else:
-                print(f"Failed after {max_retries} attempts: {e}")
-                return f"Error: {e}"
+            # Fails fast while the model's circuit breaker is open
+            with endpoint_guard.request():
+                return client.chat.completions.create(**request_body)
+        except Exception:
+            # A failed attempt produced no completion, so give its estimate back before the retry takes another
+            rate_limiter.reconcile(estimated_tokens, 0)
+            raise
+    
+    def report_retry(error, delay, retry_number):
+        print(f"Error ({classify_error(error)}): {error}. Retry {retry_number + 1} in {delay:.1f} seconds...")
+    
+    try:
+        response = retry_policy.call(send_request, on_retry=report_retry)
+    except Exception as e:
+        print(f"Request failed: {e}")
+        return f"Error: {e}"
+    
+    # Correct the token budget with the real usage
+    if getattr(response, "usage", None):
+        rate_limiter.reconcile(estimated_tokens, response.usage.total_tokens)
+        tokens = (prompt_cache_stats or PromptCacheStats()).record(candidate_name, response.usage)
+        print(f"Prompt tokens: {tokens['prompt_tokens']} ({tokens['cached_tokens']} cached)")
+    
+    # Get the response text
+    response_text = response.choices[0].message.content
+    if not response_text:
+        print("Error: the response has no content")
+        return "Error: the response has no content"
+    
+    # Debug the response
+    print(f"Debug - Raw response first 100 chars: {response_text[:100]}...")
+    
+    # Save raw response to debug directory
+    debug_dir = Path("debug")
+    debug_dir.mkdir(exist_ok=True)
+    debug_file = debug_dir / f"{candidate_name.replace(' ', '_')}_response.txt"
+    with open(debug_file, 'w') as f:
+        f.write(response_text)
+    
+    # Simply return the raw response text - no parsing needed
+    return response_text
 
-def process_single_resume(candidate_name, config_loader, evaluations_dir=None):
-    """Process a single resume."""
+def get_output_dir(config_loader, evaluations_dir=None):
+    """Get the directory evaluation files are written to, creating it if needed."""
     # Check if we should output to project folder
     output_in_project = config_loader.config.get("output_in_project_folder", False)
     projects_folder = config_loader.config.get("projects_folder", "PDF-PROJECTS")
@@ -305,53 +354,123 @@ def process_single_resume(candidate_name, config_loader, evaluations_dir=None):
         evaluations_dir = Path("evaluations")
         evaluations_dir.mkdir(exist_ok=True)
     
-    # Get PDF path for this candidate - first try in project folder
-    pdf_path = None
-    if current_project:
-        project_pdf_dir = Path(projects_folder) / current_project
-        for pdf_file in project_pdf_dir.glob("*.pdf"):
-            if candidate_name.lower().replace(" ", "_") in pdf_file.stem.lower():
-                pdf_path = str(pdf_file)
-                break
-    
-    # If not found in project folder, try the default path
-    if not pdf_path:
-        pdf_path = config_loader.get_pdf_path(candidate_name)
-    
-    if not pdf_path or not os.path.exists(pdf_path):
-        print(f"Error: PDF file not found for {candidate_name}")
-        return False
+    return Path(evaluations_dir)
+
+def render_structured_evaluation(response_text, candidate_name, config_loader):
+    """Validate a structured evaluation and render its markdown report. Returns `(markdown, evaluation)`."""
+    evaluation = parse_structured_evaluation(response_text)
+    markdown_text = config_loader.format_output("markdown_template", evaluation, evaluation["candidate_name"] or candidate_name)
+    return markdown_text, evaluation
+
+def save_evaluation(candidate_name, evaluation_text, evaluations_dir, structured_evaluation=None, config_loader=None,
+                    model=None):
+    """
+    Write a markdown evaluation to `<name>_evaluation.md`, plus the structured JSON if given, and return its path.
+    
+    With a config loader, the result is also recorded in the results store under the current project,
+    with `model` (default: the configured model) as the model that produced it.
+    """
+    output_path = Path(evaluations_dir) / f"{candidate_name.replace(' ', '_')}_evaluation.md"
+    
+    # Write the markdown evaluation directly to the file
+    with open(output_path, 'w') as f:
+        f.write(evaluation_text)
+    
+    # Keep the typed scores next to the report for the summary scripts
+    if structured_evaluation is not None:
+        with open(structured_evaluation_path(output_path), 'w') as f:
+            json.dump(structured_evaluation, f, indent=2)
+    
+    if config_loader is not None:
+        # A store failure shouldn't lose the evaluation, which is already on disk
+        try:
+            record = record_from_structured(structured_evaluation) if structured_evaluation else record_from_markdown(evaluation_text)
+            get_results_store().save_evaluation(
+                config_loader.config.get("current_project", ""),
+                record,
+                report_path=output_path,
+                model=model or config_loader.config.get("model"),
+                candidate_name=candidate_name
+            )
+        except Exception as e:
+            print(f"Error recording {candidate_name} in the results store: {e}")
     
-    # Extract text from PDF
-    print(f"Extracting text from {pdf_path}...")
-    resume_text = extract_text_from_pdf(pdf_path)
+    print(f"Completed evaluation for {candidate_name}")
+    print(f"Output saved to: {output_path}")
+    return output_path
+
+def process_single_resume(candidate_name, config_loader, evaluations_dir=None, resume_text=None, structured=False,
+                          prompt_cache_stats=None, retry_policy=None):
+    """Process a single resume. If `resume_text` is given, the PDF lookup and extraction are skipped."""
+    projects_folder = config_loader.config.get("projects_folder", "PDF-PROJECTS")
+    current_project = config_loader.config.get("current_project", "")
+    evaluations_dir = get_output_dir(config_loader, evaluations_dir)
+    
+    if resume_text is None:
+        # Get PDF path for this candidate - first try in project folder
+        pdf_path = None
+        if current_project:
+            project_pdf_dir = Path(projects_folder) / current_project
+            for pdf_file in project_pdf_dir.glob("*.pdf"):
+                if candidate_name.lower().replace(" ", "_") in pdf_file.stem.lower():
+                    pdf_path = str(pdf_file)
+                    break
+        
+        # If not found in project folder, try the default path
+        if not pdf_path:
+            pdf_path = config_loader.get_pdf_path(candidate_name)
+        
+        if not pdf_path or not os.path.exists(pdf_path):
+            print(f"Error: PDF file not found for {candidate_name}")
+            return False
+        
+        # Extract text from PDF
+        print(f"Extracting text from {pdf_path}...")
+        resume_text = extract_text_from_pdf(pdf_path)
     
     # Get AI evaluation
     print(f"Evaluating resume for {candidate_name}...")
     try:
         # Get evaluation as raw text (markdown)
-        evaluation_text = evaluate_resume_with_ai(resume_text, candidate_name, config_loader)
+        evaluation_text = evaluate_resume_with_ai(resume_text, candidate_name, config_loader, structured=structured,
+                                                  prompt_cache_stats=prompt_cache_stats, retry_policy=retry_policy)
         
-        # Define output path
-        output_path = evaluations_dir / f"{candidate_name.replace(' ', '_')}_evaluation.md"
+        # Don't save failed evaluations, so they are retried on the next run
+        if not evaluation_text or evaluation_text.startswith("Error:"):
+            print(f"Evaluation failed for {candidate_name}")
+            return False
         
-        # Write the markdown evaluation directly to the file
-        with open(output_path, 'w') as f:
-            f.write(evaluation_text)
+        structured_evaluation = None
+        if structured:
+            evaluation_text, structured_evaluation = render_structured_evaluation(evaluation_text, candidate_name, config_loader)
         
-        print(f"Completed evaluation for {candidate_name}")
-        print(f"Output saved to: {output_path}")
+        save_evaluation(candidate_name, evaluation_text, evaluations_dir, structured_evaluation, config_loader)
         return True
         
     except Exception as e:
         print(f"Error processing {candidate_name}: {e}")
         return False
 
-def process_resumes(test_mode=False, limit=None):
-    """Process resumes using the configuration system."""
-    # Initialize the config loader
-    config_loader = ConfigLoader()
+def evaluate_with_cascade(resume_text, candidate_name, config_loader, cascade_config, prompt_cache_stats=None, retry_policy=None):
+    """Score a resume with the cheap model, re-scoring it with the strong model if borderline. Returns the run_cascade result."""
+    def evaluate(model_name):
+        # Requests are labelled by model, so both tiers show up in the debug files and token counts
+        evaluation_text = evaluate_resume_with_ai(resume_text, f"{candidate_name} {model_name}", config_loader,
+                                                  prompt_cache_stats=prompt_cache_stats, model_name=model_name,
+                                                  retry_policy=retry_policy)
+        if not evaluation_text or evaluation_text.startswith("Error:"):
+            raise Exception(evaluation_text or "no response")
+        return evaluation_text
+    
+    return run_cascade(evaluate, cascade_config)
+
+def prepare_batch(config_loader, test_mode=False, limit=None):
+    """
+    Find the project's PDFs and work out which candidates still need an evaluation.
     
+    Returns a dict with the job ledger, the pending `{pdf_path: candidate_name}` map,
+    the total number of PDFs and how many were skipped, or None if there are no PDFs.
+    """
     # Get project configuration
     projects_folder = config_loader.config.get("projects_folder", "PDF-PROJECTS")
     current_project = config_loader.config.get("current_project", "")
@@ -376,7 +495,7 @@ def process_resumes(test_mode=False, limit=None):
     pdf_files = list(pdf_dir.glob("*.pdf"))
     if not pdf_files:
         print(f"No PDF files found in {pdf_dir}")
-        return 0
+        return None
     
     # In test mode, only process a few resumes
     if test_mode:
@@ -385,12 +504,16 @@ def process_resumes(test_mode=False, limit=None):
         else:
             pdf_files = pdf_files[:3]  # Default to 3 files in test mode
     
-    total_resumes = len(pdf_files)
-    processed_count = 0
-    success_count = 0
+    print(f"Found {len(pdf_files)} resumes to process")
     
-    print(f"Found {total_resumes} resumes to process")
+    # Durable per-file progress, so an interrupted batch resumes where it stopped
+    ledger = JobLedger(pdf_dir / JOB_LEDGER_FILENAME)
+    if ledger.jobs:
+        print(f"Resuming batch from job ledger: {ledger.counts()}")
     
+    # Work out which candidates still need an evaluation
+    pending_candidates = {}
+    skipped_count = 0
     for pdf_file in pdf_files:
         # Extract candidate name from filename
         filename = pdf_file.stem
@@ -416,24 +539,417 @@ def process_resumes(test_mode=False, limit=None):
             # Check in evaluations folder
             eval_file = evaluations_dir / f"{candidate_name.replace(' ', '_')}_evaluation.md"
         
-        if eval_file.exists() and not test_mode:
+        if (eval_file.exists() or ledger.is_done(str(pdf_file))) and not test_mode:
             print(f"Evaluation already exists for {candidate_name}, skipping...")
-            processed_count += 1
+            skipped_count += 1
             continue
         
-        # Process the resume
-        if process_single_resume(candidate_name, config_loader):
-            success_count += 1
+        pending_candidates[str(pdf_file)] = candidate_name
+        if not ledger.get(str(pdf_file)):
+            ledger.record(str(pdf_file), QUEUED, candidate_name=candidate_name)
+    
+    return {
+        "ledger": ledger,
+        "pending_candidates": pending_candidates,
+        "total_resumes": len(pdf_files),
+        "skipped_count": skipped_count
+    }
+
+def prescreen_resume(screener, candidate_name, pdf_path, resume_text, ledger, decisions):
+    """Pre-screen an extracted resume, recording it as skipped if it is auto-rejected. Returns True if it was."""
+    decision = screener.screen(resume_text)
+    decisions.append((candidate_name, pdf_path, decision))
+    if decision["label"] != AUTO_REJECT:
+        return False
+    
+    print(f"Pre-screen: skipping {candidate_name} (signal {decision['signal']})")
+    ledger.record(pdf_path, SKIPPED, prescreen=decision["label"], signal=decision["signal"])
+    return True
+
+def report_prescreen(decisions, config_loader):
+    """Write the pre-screen report and print how many resumes got each label."""
+    if not decisions:
+        return
+    report_path = write_prescreen_report(decisions, get_output_dir(config_loader) / PRESCREEN_REPORT_FILENAME)
+    label_counts = defaultdict(int)
+    for _, _, decision in decisions:
+        label_counts[decision["label"]] += 1
+    print(f"Pre-screen: {dict(label_counts)}, skipped {label_counts[AUTO_REJECT]} model call(s). Report: {report_path}")
+
+def get_dedup_index(config_loader):
+    """Create an empty near-duplicate index with the configured similarity threshold."""
+    return NearDuplicateIndex(threshold=config_loader.config.get("dedup_threshold", DEFAULT_DEDUP_THRESHOLD))
+
+def link_duplicate(candidate_name, pdf_path, match, ledger, links):
+    """Record a resume as a near-duplicate of a representative, so it is not evaluated on its own."""
+    representative_path, similarity = match
+    representative_name = ledger.get(representative_path)["candidate_name"]
+    print(f"Dedup: {candidate_name} is a near-duplicate of {representative_name} ({similarity:.0%} similar)")
+    links.append((candidate_name, pdf_path, representative_name, representative_path, similarity))
+    return representative_path, round(similarity, 3)
+
+def resolve_duplicates(ledger):
+    """Finish the near-duplicates waiting on a representative: done if it was evaluated, failed (to retry) if it failed."""
+    for job in list(ledger.jobs.values()):
+        if not job.get("duplicate_of") or job["state"] != EXTRACTED:
+            continue
+        representative = ledger.get(job["duplicate_of"])
+        if representative["state"] == DONE:
+            ledger.record(job["item_id"], DONE)
+        elif representative["state"] == FAILED:
+            ledger.record(job["item_id"], FAILED, duplicate_of=None,
+                          error=f"Near-duplicate of {representative['candidate_name']}, whose evaluation failed")
+
+def report_duplicates(links, config_loader):
+    """Write the dedup report and print how many evaluations it saved."""
+    if not links:
+        return
+    report_path = write_dedup_report(links, get_output_dir(config_loader) / DEDUP_REPORT_FILENAME)
+    print(f"Dedup: linked {len(links)} near-duplicate resume(s) to an existing evaluation, skipped {len(links)} model call(s). Report: {report_path}")
+
+def process_resumes(test_mode=False, limit=None, structured=False, prescreen=False, dedup=False, pack_budget=None,
+                    cascade=False):
+    """
+    Process resumes using the configuration system.
+    
+    With `pack_budget`, short resumes are evaluated several at a time, up to that many resume tokens per request.
+    With `cascade`, each resume is scored by the cascade's cheap model and only borderline ones by its strong model.
+    """
+    # Initialize the config loader
+    config_loader = ConfigLoader()
+    
+    batch = prepare_batch(config_loader, test_mode=test_mode, limit=limit)
+    if not batch:
+        return 0
+    
+    ledger = batch["ledger"]
+    pending_candidates = batch["pending_candidates"]
+    total_resumes = batch["total_resumes"]
+    processed_count = batch["skipped_count"]
+    success_count = 0
+    
+    # Local pre-screen against the rubric, to skip the model call for clear non-matches
+    screener = build_prescreener(config_loader.get_user_prompt_template(), config_loader.get_prescreen_config()) if prescreen else None
+    prescreen_decisions = []
+    
+    # Near-duplicates of an evaluated resume share its evaluation instead of getting their own
+    dedup_index = get_dedup_index(config_loader) if dedup else None
+    duplicate_links = []
+    
+    # Prompt and cached token counts of every request in this run
+    prompt_cache_stats = PromptCacheStats()
+    
+    # Short resumes wait here until their pack is full, with no more of them than the model's completion limit has room for
+    completion_token_limit = config_loader.get_model_config().get("max_completion_tokens", DEFAULT_MAX_COMPLETION_TOKENS)
+    packer = ResumePacker(token_budget=pack_budget, max_pack_size=max_pack_size_for(completion_token_limit)) if pack_budget else None
+    pack_counts = {"requests": 0, "resumes": 0}
+    evaluations_dir = get_output_dir(config_loader)
+    
+    # One retry budget for the whole run, so a persistent outage fails fast
+    retry_policy = RetryPolicy(budget=RetryBudget.for_batch(len(pending_candidates)))
+    
+    # Cheap model first, strong model for the borderline band
+    cascade_config = config_loader.get_cascade_config() if cascade else None
+    if cascade_config and not has_distinct_tiers(cascade_config):
+        print(f"Cascade is off: cheap_model and strong_model are both {cascade_config['cheap_model']}")
+        cascade_config = None
+    tier_counts = {CHEAP_TIER: 0, STRONG_TIER: 0}
+    
+    def evaluate_one(pdf_path, candidate_name, resume_text, signature):
+        """Evaluate one resume on its own. Returns 1 if its evaluation was saved, else 0."""
+        ledger.record(pdf_path, EXTRACTED)
+        ledger.record(pdf_path, EVALUATING)
+        if cascade_config:
+            try:
+                cascade_result = evaluate_with_cascade(resume_text, candidate_name, config_loader, cascade_config,
+                                                       prompt_cache_stats, retry_policy)
+            except Exception as e:
+                print(f"Error processing {candidate_name}: {e}")
+                ledger.record(pdf_path, FAILED, error="Evaluation failed")
+                return 0
+            print(f"Model tier for {candidate_name}: {cascade_result['tier']} ({cascade_result['model']})")
+            save_evaluation(candidate_name, cascade_result["report"], evaluations_dir, config_loader=config_loader,
+                            model=cascade_result["model"])
+            tier_counts[cascade_result["tier"]] += 1
+            ledger.record(pdf_path, DONE, tier=cascade_result["tier"], model=cascade_result["model"],
+                          escalation_reason=cascade_result["reason"])
+        elif not process_single_resume(candidate_name, config_loader, resume_text=resume_text, structured=structured,
+                                       prompt_cache_stats=prompt_cache_stats, retry_policy=retry_policy):
+            ledger.record(pdf_path, FAILED, error="Evaluation failed")
+            return 0
+        else:
+            ledger.record(pdf_path, DONE, usage=prompt_cache_stats.requests.get(candidate_name))
+        # Only evaluated resumes can stand in for their duplicates
+        if dedup_index:
+            dedup_index.add(pdf_path, signature)
+        return 1
+    
+    def evaluate_pack(pack):
+        """Evaluate a pack of short resumes in one request; any candidate missing from the reply is evaluated alone."""
+        if len(pack) == 1:
+            return evaluate_one(*pack[0])
+        
+        candidate_names = [candidate_name for _, candidate_name, _, _ in pack]
+        pack_label = f"Pack {candidate_names[0]} +{len(pack) - 1}"
+        print(f"Evaluating {len(pack)} packed resumes: {', '.join(candidate_names)}...")
+        for pdf_path, _, _, _ in pack:
+            ledger.record(pdf_path, EXTRACTED)
+            ledger.record(pdf_path, EVALUATING, pack_size=len(pack))
+        
+        request_body = build_evaluation_request(pack_resume_text([text for _, _, text, _ in pack]), config_loader, pack_size=len(pack))
+        response_text = evaluate_resume_with_ai(None, pack_label, config_loader, prompt_cache_stats=prompt_cache_stats,
+                                                request_body=request_body, retry_policy=retry_policy)
+        if not response_text or response_text.startswith("Error:"):
+            reports = [None] * len(pack)
+        else:
+            reports = split_packed_response(response_text, len(pack))
+        pack_counts["requests"] += 1
+        pack_counts["resumes"] += sum(1 for report in reports if report)
+        
+        # Each candidate's share of the request's tokens
+        usage = prompt_cache_stats.requests.get(pack_label)
+        usage_share = {key: count // len(pack) for key, count in usage.items()} if usage else None
+        
+        saved_count = 0
+        for (pdf_path, candidate_name, resume_text, signature), report in zip(pack, reports):
+            if report is None:
+                print(f"No complete report for {candidate_name} in the packed reply, evaluating it on its own")
+                saved_count += evaluate_one(pdf_path, candidate_name, resume_text, signature)
+                continue
+            save_evaluation(candidate_name, report, evaluations_dir, config_loader=config_loader)
+            ledger.record(pdf_path, DONE, usage=usage_share, pack_size=len(pack))
+            if dedup_index:
+                dedup_index.add(pdf_path, signature)
+            saved_count += 1
+        return saved_count
+    
+    # Parse PDFs in worker processes and evaluate each one as soon as its text is ready
+    extraction_workers = config_loader.config.get("extraction_workers")
+    print(f"Extracting text from {len(pending_candidates)} PDFs...")
+    for pdf_path, resume_text, error in extract_pdfs_parallel(pending_candidates, max_workers=extraction_workers):
+        candidate_name = pending_candidates[pdf_path]
+        
+        if error:
+            print(f"Error extracting text from {pdf_path}: {error}")
+            ledger.record(pdf_path, FAILED, error=f"Text extraction failed: {error}")
+        elif screener and prescreen_resume(screener, candidate_name, pdf_path, resume_text, ledger, prescreen_decisions):
+            # Auto-rejected locally, so there is no model call to make
+            pass
+        else:
+            signature = minhash_signature(resume_text) if dedup_index else None
+            match = dedup_index.find(signature) if dedup_index else None
+            if match:
+                duplicate_of, similarity = link_duplicate(candidate_name, pdf_path, match, ledger, duplicate_links)
+                ledger.record(pdf_path, DONE, duplicate_of=duplicate_of, similarity=similarity)
+            elif packer:
+                for pack in packer.add((pdf_path, candidate_name, resume_text, signature), resume_text):
+                    success_count += evaluate_pack(pack)
+            else:
+                success_count += evaluate_one(pdf_path, candidate_name, resume_text, signature)
         
         processed_count += 1
         print(f"Progress: {processed_count}/{total_resumes}")
-        
-        # Sleep to prevent API rate limiting
-        time.sleep(1)
+    
+    # Evaluate the last, partly filled pack
+    if packer:
+        for pack in packer.flush():
+            success_count += evaluate_pack(pack)
     
     print(f"Completed {success_count}/{processed_count} evaluations.")
+    if pack_counts["requests"]:
+        print(f"Packing: {pack_counts['resumes']} resume(s) evaluated in {pack_counts['requests']} packed request(s)")
+    if cascade_config:
+        print(f"Cascade: {tier_counts[CHEAP_TIER]} kept from {cascade_config['cheap_model']}, "
+              f"{tier_counts[STRONG_TIER]} re-scored with {cascade_config['strong_model']}")
+    report_prescreen(prescreen_decisions, config_loader)
+    report_duplicates(duplicate_links, config_loader)
+    if prompt_cache_stats.requests:
+        print(format_prompt_cache_summary(prompt_cache_stats.summary()))
+    if retry_policy.budget.spent:
+        print(f"Retries: {retry_policy.budget.spent} used, {retry_policy.budget.remaining} left in the run's budget")
+    
+    # Error rates, latency and circuit state of each model endpoint used
+    models = [cascade_config["cheap_model"], cascade_config["strong_model"]] if cascade_config else [
+        config_loader.config.get("model", config_loader.default_model)
+    ]
+    for model_name in models:
+        print(format_endpoint_summary(get_endpoint_guard(model_name).summary()))
+    
+    # Show how much connection setup the pooled client saved
+    client_stats = get_client_stats(os.environ.get("OPENAI_API_KEY"))
+    if client_stats:
+        print(f"API connections: {client_stats}")
+    return success_count
+
+def collect_batch_results(client, batch_id, ledger, config_loader, poll_interval=30):
+    """Wait for a submitted batch and write each result to its usual evaluation file."""
+    def report_progress(batch):
+        counts = batch.request_counts
+        if counts:
+            print(f"Batch {batch_id}: {batch.status} ({counts.completed}/{counts.total} completed, {counts.failed} failed)")
+        else:
+            print(f"Batch {batch_id}: {batch.status}")
+    
+    batch = wait_for_batch(client, batch_id, poll_interval=poll_interval, on_poll=report_progress)
+    results = download_batch_results(client, batch)
+    evaluations_dir = get_output_dir(config_loader)
+    
+    # Fan the results back out to the files submitted in this batch
+    success_count = 0
+    prompt_cache_stats = PromptCacheStats()
+    for job in list(ledger.jobs.values()):
+        if job.get("batch_id") != batch_id or job["state"] != EVALUATING:
+            continue
+        
+        result = results.get(job["custom_id"])
+        if not result:
+            ledger.record(job["item_id"], FAILED, error=f"No result in batch {batch_id} ({batch.status})")
+        elif "error" in result:
+            print(f"Error evaluating {job['candidate_name']}: {result['error']}")
+            ledger.record(job["item_id"], FAILED, error=result["error"])
+        elif job.get("structured"):
+            usage = prompt_cache_stats.record(job["item_id"], result.get("usage"))
+            try:
+                markdown_text, structured_evaluation = render_structured_evaluation(result["content"], job["candidate_name"], config_loader)
+            except Exception as e:
+                print(f"Error evaluating {job['candidate_name']}: {e}")
+                ledger.record(job["item_id"], FAILED, error=str(e))
+                continue
+            save_evaluation(job["candidate_name"], markdown_text, evaluations_dir, structured_evaluation, config_loader)
+            ledger.record(job["item_id"], DONE, usage=usage)
+            success_count += 1
+        else:
+            usage = prompt_cache_stats.record(job["item_id"], result.get("usage"))
+            save_evaluation(job["candidate_name"], result["content"], evaluations_dir, config_loader=config_loader)
+            ledger.record(job["item_id"], DONE, usage=usage)
+            success_count += 1
+    
+    if prompt_cache_stats.requests:
+        print(f"Batch {batch_id}: {format_prompt_cache_summary(prompt_cache_stats.summary())}")
+    return success_count
+
+def process_resumes_batch_api(test_mode=False, limit=None, poll_interval=30, structured=False, prescreen=False, dedup=False):
+    """Evaluate resumes through the OpenAI Batch API and write the usual evaluation files."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OPENAI_API_KEY environment variable not set")
+        return 0
+    
+    client = get_openai_client(api_key)
+    config_loader = ConfigLoader()
+    
+    batch = prepare_batch(config_loader, test_mode=test_mode, limit=limit)
+    if not batch:
+        return 0
+    
+    ledger = batch["ledger"]
+    success_count = 0
+    
+    # Collect batches submitted by an interrupted run instead of paying for them again
+    submitted_batch_ids = sorted({
+        job["batch_id"] for job in ledger.jobs.values()
+        if job["state"] == EVALUATING and job.get("batch_id")
+    })
+    for batch_id in submitted_batch_ids:
+        print(f"Resuming submitted batch {batch_id}...")
+        try:
+            success_count += collect_batch_results(client, batch_id, ledger, config_loader, poll_interval)
+        except Exception as e:
+            # The batch can no longer be collected, so submit its files again
+            print(f"Could not collect batch {batch_id}: {e}")
+            for job in list(ledger.jobs.values()):
+                if job.get("batch_id") == batch_id and job["state"] == EVALUATING:
+                    ledger.record(job["item_id"], FAILED, error=f"Could not collect batch {batch_id}: {e}")
+    resolve_duplicates(ledger)
+    
+    pending_candidates = {
+        pdf_path: candidate_name for pdf_path, candidate_name in batch["pending_candidates"].items()
+        if not ledger.is_done(pdf_path)
+    }
+    if not pending_candidates:
+        print(f"Completed {success_count} evaluations.")
+        return success_count
+    
+    # Build one request per resume from the configured prompts, leaving out pre-screen rejects
+    screener = build_prescreener(config_loader.get_user_prompt_template(), config_loader.get_prescreen_config()) if prescreen else None
+    prescreen_decisions = []
+    dedup_index = get_dedup_index(config_loader) if dedup else None
+    duplicate_links = []
+    requests = []
+    custom_ids = {}
+    extraction_workers = config_loader.config.get("extraction_workers")
+    print(f"Extracting text from {len(pending_candidates)} PDFs...")
+    for pdf_path, resume_text, error in extract_pdfs_parallel(pending_candidates, max_workers=extraction_workers):
+        if error:
+            print(f"Error extracting text from {pdf_path}: {error}")
+            ledger.record(pdf_path, FAILED, error=f"Text extraction failed: {error}")
+            continue
+        if screener and prescreen_resume(screener, pending_candidates[pdf_path], pdf_path, resume_text, ledger, prescreen_decisions):
+            continue
+        
+        # A near-duplicate waits for its representative's result instead of joining the batch
+        signature = minhash_signature(resume_text) if dedup_index else None
+        match = dedup_index.find(signature) if dedup_index else None
+        if match:
+            duplicate_of, similarity = link_duplicate(pending_candidates[pdf_path], pdf_path, match, ledger, duplicate_links)
+            ledger.record(pdf_path, EXTRACTED, duplicate_of=duplicate_of, similarity=similarity)
+            continue
+        if dedup_index:
+            dedup_index.add(pdf_path, signature)
+        
+        ledger.record(pdf_path, EXTRACTED)
+        custom_id = f"resume-{len(requests)}"
+        custom_ids[pdf_path] = custom_id
+        requests.append((custom_id, build_evaluation_request(resume_text, config_loader, structured=structured)))
+    
+    report_prescreen(prescreen_decisions, config_loader)
+    report_duplicates(duplicate_links, config_loader)
+    if not requests:
+        print(f"Completed {success_count} evaluations.")
+        return success_count
+    
+    # Submit the batch and remember which file went into it
+    batch_input_path = write_batch_input(requests, Path("debug") / f"batch_input_{int(time.time())}.jsonl")
+    submitted = submit_batch(client, batch_input_path, metadata={"project": config_loader.config.get("current_project", "")})
+    print(f"Submitted batch {submitted.id} with {len(requests)} requests")
+    for pdf_path, custom_id in custom_ids.items():
+        ledger.record(pdf_path, EVALUATING, batch_id=submitted.id, custom_id=custom_id, structured=structured)
+    
+    success_count += collect_batch_results(client, submitted.id, ledger, config_loader, poll_interval)
+    resolve_duplicates(ledger)
+    print(f"Completed {success_count} evaluations.")
     return success_count
 
 if __name__ == "__main__":
-    # Process all resumes
-    process_resumes(test_mode=False) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Evaluate the resumes of the configured project.")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="Submit all evaluations as one OpenAI Batch API job instead of calling the API per resume")
+    parser.add_argument("--poll-interval", type=int, default=30,
+                        help="Seconds between Batch API status checks (default: 30)")
+    parser.add_argument("--structured", action="store_true",
+                        help="Have the model return schema-validated JSON scores; the markdown report is rendered locally")
+    parser.add_argument("--prescreen", action="store_true",
+                        help="Skip the model call for resumes the local keyword pre-screen rejects (see prescreen.json)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Evaluate one resume per cluster of near-duplicates and link the rest to its evaluation")
+    parser.add_argument("--pack", nargs="?", type=int, const=DEFAULT_PACK_TOKEN_BUDGET, metavar="TOKENS",
+                        help=f"Evaluate short resumes several per request, up to TOKENS resume tokens each "
+                             f"(default: {DEFAULT_PACK_TOKEN_BUDGET}); not with --batch-api or --structured")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Score with a cheap model first and re-score only borderline resumes with a strong model "
+                             "(see \"cascade\" in model_options.json); not with --batch-api, --structured or --pack")
+    parser.add_argument("--test", action="store_true", help="Only process a few resumes")
+    parser.add_argument("--limit", type=int, help="Number of resumes to process in test mode")
+    args = parser.parse_args()
+    if args.pack and (args.batch_api or args.structured):
+        parser.error("--pack only works with per-resume markdown evaluations")
+    if args.cascade and (args.batch_api or args.structured or args.pack):
+        parser.error("--cascade only works with per-resume markdown evaluations, without --pack")
+    
+    if args.batch_api:
+        process_resumes_batch_api(test_mode=args.test, limit=args.limit, poll_interval=args.poll_interval,
+                                  structured=args.structured, prescreen=args.prescreen, dedup=args.dedup)
+    else:
+        # Process all resumes
+        process_resumes(test_mode=args.test, limit=args.limit, structured=args.structured,
+                        prescreen=args.prescreen, dedup=args.dedup, pack_budget=args.pack, cascade=args.cascade)
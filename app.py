@@ -4,23 +4,34 @@ Resume Evaluation System - Streamlit Web Application
 
 import os
 import json
-import time
 import streamlit as st
 from pathlib import Path
 import re
 import io # Import io for BytesIO
+import hashlib
 import zipfile
 from datetime import datetime
 
 # Import utility modules
 from utils.resume_processor import (
-    extract_text_from_pdf_bytes,
     extract_text_from_pdf_file,
+    save_uploaded_pdf,
+    prune_uploaded_pdfs,
     evaluate_resume_with_ai,
     get_available_templates,
     read_prompt_file,
     get_available_models
 )
+from utils.pipeline import run_pipeline
+from utils.openai_clients import get_client_counters, get_client_stats
+from utils.prompt_builder import PromptCacheStats, format_prompt_cache_summary
+from utils.retry_policy import RetryBudget, RetryPolicy
+from utils.endpoint_guard import format_endpoint_summary, get_endpoint_guard, load_endpoint_guard_config
+from utils.job_ledger import JobLedger, batch_job_id, JOB_LEDGER_DIR, QUEUED, EXTRACTED, EVALUATING, DONE, FAILED, SKIPPED
+from utils.prescreen import AUTO_REJECT, PRIORITY, build_prescreener
+from utils.dedup import NearDuplicateIndex, load_dedup_threshold, minhash_signature
+from utils.model_cascade import CHEAP_TIER, STRONG_TIER, has_distinct_tiers, load_cascade_config, run_cascade
+from utils.results_store import get_results_store, record_from_markdown
 from utils.ui_components import (
     set_page_config,
     add_custom_css,
@@ -34,6 +45,9 @@ from utils.ui_components import (
     show_markdown_content
 )
 
+# Prefix of the results store project of each app batch ("streamlit/<job id>")
+APP_RESULTS_PROJECT = "streamlit"
+
 # Set page configuration
 set_page_config()
 add_custom_css()
@@ -66,6 +80,17 @@ if 'custom_system_prompt' not in st.session_state:
     st.session_state.custom_system_prompt = None
 if 'custom_user_prompt' not in st.session_state:
     st.session_state.custom_user_prompt = None
+if 'max_concurrent_evaluations' not in st.session_state:
+    # Only a ceiling: the requests actually in flight adapt to the endpoint's 429s and latency
+    st.session_state.max_concurrent_evaluations = load_endpoint_guard_config()["max_concurrency"]
+if 'bypass_evaluation_cache' not in st.session_state:
+    st.session_state.bypass_evaluation_cache = False
+if 'prescreen_resumes' not in st.session_state:
+    st.session_state.prescreen_resumes = False
+if 'dedup_resumes' not in st.session_state:
+    st.session_state.dedup_resumes = False
+if 'use_model_cascade' not in st.session_state:
+    st.session_state.use_model_cascade = False
 
 # Get API key from Streamlit secrets or environment variable
 def get_api_key():
@@ -207,12 +232,15 @@ if st.session_state.step == 1:
             processed_files = []
             error_files = []
             
+            # Evict old spooled uploads before adding these
+            prune_uploaded_pdfs()
+            
             for uploaded_file in uploaded_files:
                 try:
-                    # Store file info (name and bytes) for later processing
+                    # Store file info (name and spooled path) for later processing
                     file_info = {
                         "filename": uploaded_file.name,
-                        "bytes": uploaded_file.read() # Read bytes here
+                        "path": save_uploaded_pdf(uploaded_file.getvalue())
                     }
                     st.session_state.uploaded_resumes.append(file_info)
                     processed_files.append(uploaded_file.name)
@@ -392,6 +420,38 @@ elif st.session_state.step == 2:
                         templates[st.session_state.selected_template_index]['custom_system_prompt'] = system_prompt_edited
                         templates[st.session_state.selected_template_index]['custom_user_prompt'] = user_prompt_edited
                         st.success("Custom prompts saved")
+        
+        # Bulk evaluation concurrency
+        st.markdown("### Bulk Processing")
+        st.session_state.max_concurrent_evaluations = st.slider(
+            "Max parallel evaluations",
+            min_value=1,
+            max_value=32,
+            value=st.session_state.max_concurrent_evaluations,
+            help="Most resumes evaluated at the same time in bulk mode. Within this, the number of requests in flight "
+                 "adapts to the model's rate limiting and latency, and pauses while its circuit breaker is open"
+        )
+        st.session_state.bypass_evaluation_cache = st.checkbox(
+            "Bypass evaluation cache",
+            value=st.session_state.bypass_evaluation_cache,
+            help="Re-run the model even if this resume was already evaluated with the same prompts and model"
+        )
+        st.session_state.prescreen_resumes = st.checkbox(
+            "Pre-screen resumes locally",
+            value=st.session_state.prescreen_resumes,
+            help="Skip the model call for resumes with no AI/ML, LLM/NLP or RAG keywords from the rubric (thresholds in prescreen.json)"
+        )
+        st.session_state.dedup_resumes = st.checkbox(
+            "Link near-duplicate resumes",
+            value=st.session_state.dedup_resumes,
+            help="Evaluate one copy of each near-identical resume (e.g. the same person in several sourcing exports) and link the others to it"
+        )
+        st.session_state.use_model_cascade = st.checkbox(
+            "Model cascade (cheap model first)",
+            value=st.session_state.use_model_cascade,
+            help="Score every resume with a fast, cheap model first (\"cascade\" in model_options.json) and re-score only "
+                 "borderline ones with the evaluation model. Has no effect when the evaluation model is the cheap model"
+        )
     
     # Navigation
     col1, col2, col3, col4 = st.columns([2, 2, 2, 4])
@@ -422,7 +482,6 @@ elif st.session_state.step == 2:
                         templates[st.session_state.selected_template_index]['custom_system_prompt'] = system_prompt_edited
                         templates[st.session_state.selected_template_index]['custom_user_prompt'] = user_prompt_edited
                         st.success("Custom prompts automatically saved")
-                        time.sleep(1)  # Brief pause to show the success message
                         
                 # Show a spinner to indicate processing
                 with st.spinner("Transitioning to evaluation..."):
@@ -483,27 +542,40 @@ elif st.session_state.step == 3:
             # Use default user prompt from file
             user_prompt_template = read_prompt_file(selected_template['user_prompt'])
         
-        # Prepare list of items to evaluate
-        items_to_evaluate = []
+        # Prepare list of sources; PDF text is extracted lazily by the pipeline
         if is_single_mode:
-            items_to_evaluate.append({"filename": st.session_state.filename, "text": st.session_state.resume_text})
-        elif is_bulk_mode:
-            for resume_info in st.session_state.uploaded_resumes:
-                try:
-                    # Extract text from bytes stored earlier, wrapping in BytesIO
-                    resume_bytes_stream = io.BytesIO(resume_info["bytes"])
-                    resume_text = extract_text_from_pdf_bytes(resume_bytes_stream)
-                    items_to_evaluate.append({"filename": resume_info["filename"], "text": resume_text})
-                except Exception as e:
-                    # Store error instead of text for this file
-                    items_to_evaluate.append({"filename": resume_info["filename"], "error": f"Text extraction failed: {e}"})
+            text_hash = hashlib.sha256(st.session_state.resume_text.encode("utf-8")).hexdigest()
+            sources = [{"filename": st.session_state.filename, "text": st.session_state.resume_text, "item_id": text_hash}]
+        else:
+            # Spooled uploads are named by content hash, which identifies them across reloads
+            sources = [
+                {**resume_info, "item_id": f"{Path(resume_info['path']).stem}:{resume_info['filename']}"}
+                for resume_info in st.session_state.uploaded_resumes
+            ]
         
-        total_items = len(items_to_evaluate)
-        results_list = []
-        errors_list = []
-        # Add a configurable delay between API calls (in seconds)
-        # Increased delay to 10s to stay within likely TPM limits
-        API_CALL_DELAY = 10 
+        total_items = len(sources)
+        
+        # Bulk runs can score with a cheap model first and the strong model only for borderline resumes.
+        # The evaluation model stays the strong tier, so the cascade only adds a cheaper first pass.
+        cascade_config = None
+        if is_bulk_mode and st.session_state.use_model_cascade:
+            cascade_config = {**load_cascade_config(), "strong_model": selected_model['value']}
+            if not has_distinct_tiers(cascade_config):
+                st.warning(f"Model cascade is off: {selected_model['value']} is already the cheap model")
+                cascade_config = None
+        
+        # Durable ledger for this batch, so a reloaded tab resumes without re-spending tokens
+        job_id = batch_job_id(
+            [source["item_id"] for source in sources], system_prompt, user_prompt_template, selected_model['value'],
+            *([cascade_config] if cascade_config else [])
+        )
+        ledger = JobLedger(Path(JOB_LEDGER_DIR) / f"{job_id}.jsonl")
+        resumed_count = sum(1 for source in sources if ledger.is_done(source["item_id"]))
+        if resumed_count:
+            st.info(f"Resuming batch: {resumed_count} of {total_items} resume(s) already evaluated")
+        for source in sources:
+            if not ledger.get(source["item_id"]):
+                ledger.record(source["item_id"], QUEUED, filename=source["filename"])
         
         # Progress tracking
         st.markdown(f"Processing {total_items} resume(s)...")
@@ -511,42 +583,134 @@ elif st.session_state.step == 3:
         status_text = st.empty()
         phase_indicator = st.empty()  # New element for showing the current phase
         
-        for i, item in enumerate(items_to_evaluate):
+        live_results = st.empty()  # Finished evaluations appear here as they land
+        live_result_lines = []
+        
+        # Read session state here - worker threads have no access to it
+        use_evaluation_cache = not st.session_state.bypass_evaluation_cache
+        
+        # Rate-limited and transient failures are retried, from one budget for the whole batch
+        retry_policy = RetryPolicy(budget=RetryBudget.for_batch(total_items))
+        
+        # The pooled client's stats cover the whole process; this batch is the difference from here
+        client_counters_before = get_client_counters(api_key)
+        
+        # Pre-screen bulk uploads against the rubric, so clear non-matches skip the model call
+        screener = None
+        if is_bulk_mode and st.session_state.prescreen_resumes:
+            try:
+                screener = build_prescreener(user_prompt_template)
+            except Exception as e:
+                st.warning(f"Pre-screening is off: {e}")
+        
+        # Near-duplicate uploads share the evaluation of the first copy; only the extraction thread touches the index
+        dedup_index = NearDuplicateIndex(threshold=load_dedup_threshold()) if is_bulk_mode and st.session_state.dedup_resumes else None
+        
+        def extract_item(source):
+            """Extract the text for one source, storing an error instead if extraction fails"""
+            if "text" in source or ledger.is_done(source["item_id"]):
+                return source
+            try:
+                item = {"filename": source["filename"], "item_id": source["item_id"], "text": extract_text_from_pdf_file(source["path"])}
+                ledger.record(source["item_id"], EXTRACTED)
+            except Exception as e:
+                return {"filename": source["filename"], "item_id": source["item_id"], "error": f"Text extraction failed: {e}"}
+            
+            # Pre-screen before linking, as the CLI does: a skipped resume is no representative,
+            # since a copy linked to it would be marked done without ever being evaluated
+            if screener:
+                item["prescreen"] = screener.screen(item["text"])
+                if item["prescreen"]["label"] == AUTO_REJECT:
+                    return item
+            
+            if dedup_index:
+                signature = minhash_signature(item["text"])
+                match = dedup_index.find(signature)
+                if match:
+                    item["duplicate_of"], item["similarity"] = match
+                else:
+                    dedup_index.add(source["item_id"], signature)
+            return item
+        
+        def evaluate_item(item):
+            """Evaluate one item, recording its progress in the ledger"""
+            item_id = item["item_id"]
+            
+            # Reuse the result stored by an earlier, interrupted run
+            if ledger.is_done(item_id):
+                return {**ledger.get(item_id)["result"], "_resumed": True}
+            
+            # Linked to its representative's result once the whole batch is done
+            if "duplicate_of" in item:
+                return {"filename": item["filename"], "item_id": item_id, "duplicate_of": item["duplicate_of"], "similarity": item["similarity"]}
+            
+            decision = item.get("prescreen")
+            if decision and decision["label"] == AUTO_REJECT:
+                ledger.record(item_id, SKIPPED, prescreen=decision["label"], signal=decision["signal"])
+                return {"filename": item["filename"], "skipped": True, "prescreen": decision}
+            
+            ledger.record(item_id, EVALUATING)
+            result = evaluate_single_item(item)
+            if decision:
+                result["prescreen"] = decision
+            if "error" in result:
+                ledger.record(item_id, FAILED, error=result["error"])
+            else:
+                ledger.record(item_id, DONE, result=result)
+            return result
+        
+        def evaluate_single_item(item):
+            """Evaluate one item, capturing extraction and API errors in the result dict"""
             filename = item["filename"]
-            status_text.text(f"Evaluating: {filename} ({i+1}/{total_items})")
             
             if "error" in item:
-                # Handle extraction errors
+                # Handle extraction errors - skip evaluation if text extraction failed
                 error_msg = f"Could not extract text from {filename}: {item['error']}"
-                results_list.append({"filename": filename, "error": error_msg, "_raw_response": error_msg})
-                errors_list.append(filename)
-                progress_bar.progress((i + 1) / total_items)
-                continue # Skip evaluation if text extraction failed
-
-            resume_text = item["text"]
+                return {"filename": filename, "error": error_msg, "_raw_response": error_msg}
             
             try:
-                # Show evaluation phases
-                phase_indicator.info("📋 Phase 1/3: Preparing resume content for analysis...")
-                time.sleep(0.5)  # Brief pause for UI update
-                
-                # Run the evaluation for this item
-                phase_indicator.warning("🔍 Phase 2/3: Analyzing candidate qualifications and experience...")
+                if cascade_config:
+                    # Each tier's evaluation is cached separately, keyed on its model
+                    tier_results = {}
+                    
+                    def evaluate_tier(model_name):
+                        tier_results[model_name] = evaluate_resume_with_ai(
+                            item["text"], system_prompt, user_prompt_template, model_name, api_key,
+                            use_cache=use_evaluation_cache, retry_policy=retry_policy
+                        )
+                        return tier_results[model_name]["markdown_content"]
+                    
+                    cascade_result = run_cascade(evaluate_tier, cascade_config)
+                    final_result = tier_results[cascade_result["model"]]
+                    return {
+                        "filename": filename,
+                        "markdown_content": cascade_result["report"],
+                        "_raw_response": cascade_result["report"],
+                        "_cached": final_result.get("_cached", False),
+                        "_usage": final_result.get("_usage"),
+                        "_tier": cascade_result["tier"],
+                        "_model": cascade_result["model"]
+                    }
                 
                 evaluation_result = evaluate_resume_with_ai(
-                    resume_text,
+                    item["text"],
                     system_prompt,
                     user_prompt_template,
                     selected_model['value'],
-                    api_key
+                    api_key,
+                    use_cache=use_evaluation_cache,
+                    stream=is_single_mode,
+                    retry_policy=retry_policy
                 )
                 
-                phase_indicator.success("✅ Phase 3/3: Generating comprehensive evaluation report...")
-                time.sleep(0.5)  # Brief pause for UI update
+                if is_single_mode:
+                    # Single mode runs in the script thread, so the report can be rendered as it streams
+                    with live_results.container():
+                        st.write_stream(evaluation_result)
+                    evaluation_result = evaluation_result.result
                 
                 # Store result (including filename)
-                result_item = {"filename": filename, **evaluation_result}
-                results_list.append(result_item)
+                return {"filename": filename, **evaluation_result}
                 
             except Exception as e:
                 # Handle evaluation errors
@@ -558,14 +722,70 @@ elif st.session_state.step == 3:
                 elif hasattr(e, 'message'): # Some OpenAI errors have a message attribute
                      raw_error_details = e.message
                      
-                results_list.append({"filename": filename, "error": error_msg, "_raw_response": raw_error_details})
-                errors_list.append(filename)
+                return {"filename": filename, "error": error_msg, "_raw_response": raw_error_details}
+        
+        # Each batch gets its own project, and each upload is keyed by its content hash, so candidates
+        # who share a name, or the same resume scored for another posting, do not replace each other
+        results_project = f"{APP_RESULTS_PROJECT}/{job_id}"
+        
+        def store_result(result, item_id):
+            """Record a successful evaluation in the results store"""
+            if "markdown_content" not in result:
+                return
+            try:
+                record = record_from_markdown(result["markdown_content"])
+                candidate_name = record["name"] if record["name"] != "Unknown" else Path(result["filename"]).stem
+                get_results_store().save_evaluation(
+                    results_project, record, model=result.get("_model", selected_model['value']),
+                    candidate_name=candidate_name, candidate_key=item_id
+                )
+            except Exception as e:
+                st.warning(f"Could not record {result['filename']} in the results store: {e}")
+        
+        def on_item_evaluated(index, result, completed_count):
+            """Update the progress indicators, list each evaluation as it finishes and store it"""
+            store_result(result, sources[index]["item_id"])
+            status_text.text(f"Evaluated: {result['filename']} ({completed_count}/{total_items})")
+            progress_bar.progress(completed_count / total_items)
+            status_icon = "❌" if "error" in result else "⏭️" if result.get("skipped") else "🔗" if "duplicate_of" in result else "✅"
+            live_result_lines.append(f"- {status_icon} {result['filename']}")
+            live_results.markdown("\n".join(live_result_lines))
+        
+        if is_single_mode:
+            # Evaluate in the script thread and stream the report straight into the page
+            status_text.text("Generating evaluation...")
+            results_list = [evaluate_item(extract_item(source)) for source in sources]
+            for source, result in zip(sources, results_list):
+                store_result(result, source["item_id"])
+        else:
+            phase_indicator.warning("🔍 Analyzing candidate qualifications and experience...")
+            status_text.text(f"Evaluating {total_items} resume(s), up to {st.session_state.max_concurrent_evaluations} at a time (adapting to the endpoint)...")
             
-            # Update progress bar
-            progress_bar.progress((i + 1) / total_items)
-            # Add delay between calls if not the last item
-            if i < total_items - 1:
-                 time.sleep(API_CALL_DELAY) 
+            # Stream extraction and evaluation; results keep the original upload order
+            results_list = run_pipeline(
+                sources,
+                extract_item,
+                evaluate_item,
+                on_result=on_item_evaluated,
+                max_workers=st.session_state.max_concurrent_evaluations
+            )
+        
+        # Point each near-duplicate at its representative, sharing its outcome
+        results_by_item = {source["item_id"]: result for source, result in zip(sources, results_list)}
+        for result in results_list:
+            if "duplicate_of" not in result or "duplicate_of_filename" in result:
+                continue
+            representative = results_by_item[result["duplicate_of"]]
+            result["duplicate_of_filename"] = representative["filename"]
+            if "error" in representative:
+                result["error"] = f"Near-duplicate of {representative['filename']}, whose evaluation failed"
+                ledger.record(result["item_id"], FAILED, error=result["error"])
+            else:
+                ledger.record(result["item_id"], DONE, result=result)
+        
+        errors_list = [result["filename"] for result in results_list if "error" in result]
+        skipped_list = [result["filename"] for result in results_list if result.get("skipped")]
+        duplicates_list = [result["filename"] for result in results_list if "duplicate_of" in result and "error" not in result]
         
         # Store results in session state
         if is_single_mode:
@@ -579,7 +799,42 @@ elif st.session_state.step == 3:
         progress_bar.empty()
         status_text.empty()
         phase_indicator.empty()  # Clear the phase indicator
-        st.success(f"Evaluation complete for {total_items - len(errors_list)} out of {total_items} resume(s).")
+        live_results.empty()
+        st.success(f"Evaluation complete for {total_items - len(errors_list) - len(skipped_list) - len(duplicates_list)} out of {total_items} resume(s).")
+        if skipped_list:
+            st.info(f"Pre-screen skipped {len(skipped_list)} resume(s) with no rubric signal: {', '.join(skipped_list)}")
+        if duplicates_list:
+            st.info(f"Linked {len(duplicates_list)} near-duplicate resume(s) to an evaluated copy: {', '.join(duplicates_list)}")
+        # Provider-side prompt caching over this run's API requests (cached and resumed results made none)
+        prompt_cache_stats = PromptCacheStats()
+        for result in results_list:
+            if result.get("_usage") and not result.get("_resumed"):
+                prompt_cache_stats.record(result["filename"], result["_usage"])
+        if prompt_cache_stats.requests:
+            st.caption(format_prompt_cache_summary(prompt_cache_stats.summary()))
+        st.caption(
+            f"Results store project: {results_project} (`generate_summary.py --from-store --project {APP_RESULTS_PROJECT}` "
+            "summarises every app batch)"
+        )
+        if cascade_config:
+            tiers = [result.get("_tier") for result in results_list]
+            st.caption(
+                f"Model cascade: {tiers.count(CHEAP_TIER)} kept from {cascade_config['cheap_model']}, "
+                f"{tiers.count(STRONG_TIER)} re-scored with {cascade_config['strong_model']}"
+            )
+        if retry_policy.budget.spent:
+            st.caption(f"Retried {retry_policy.budget.spent} failed request(s); {retry_policy.budget.remaining} retries left in this batch's budget")
+        # Adaptive concurrency limit, circuit state and recent error rates of each model endpoint used
+        for model_name in ([cascade_config["cheap_model"], cascade_config["strong_model"]] if cascade_config else [selected_model['value']]):
+            endpoint_summary = get_endpoint_guard(model_name).summary()
+            if endpoint_summary["recent_requests"] or endpoint_summary["times_opened"]:
+                st.caption(format_endpoint_summary(endpoint_summary))
+        client_stats = get_client_stats(api_key, since=client_counters_before)
+        if client_stats and client_stats["requests"]:
+            st.caption(
+                f"API requests: {client_stats['requests']} over {client_stats['new_connections']} new connection(s) "
+                f"(avg setup {client_stats['avg_connect_ms']} ms, avg response {client_stats['avg_response_seconds']} s)"
+            )
         if errors_list:
             st.warning(f"Errors occurred for: {', '.join(errors_list)}")
 
@@ -596,6 +851,35 @@ elif st.session_state.step == 3:
     if not results_to_display:
         st.info("No evaluation results to display.")
     else:
+        # Show how many evaluations were served from the cache
+        evaluated_results = [result for result in results_to_display if "markdown_content" in result]
+        if evaluated_results:
+            cache_hits = sum(1 for result in evaluated_results if result.get("_cached"))
+            st.caption(f"Cache hit rate: {cache_hits}/{len(evaluated_results)} ({cache_hits / len(evaluated_results) * 100:.0f}%)")
+        
+        # Pre-screen report: the label and keyword signal behind every skipped or evaluated resume
+        screened_results = [result for result in results_to_display if "prescreen" in result]
+        if screened_results:
+            with st.expander(f"Pre-screen report ({sum(1 for result in screened_results if result.get('skipped'))} skipped)"):
+                st.dataframe([
+                    {
+                        "Resume": result["filename"],
+                        "Label": result["prescreen"]["label"],
+                        "Signal": result["prescreen"]["signal"],
+                        "Matched terms": "; ".join(sorted({term for terms in result["prescreen"]["matched_terms"].values() for term in terms}))
+                    }
+                    for result in screened_results
+                ], use_container_width=True)
+        
+        # Dedup report: which resumes share another resume's evaluation
+        duplicate_results = [result for result in results_to_display if "duplicate_of_filename" in result]
+        if duplicate_results:
+            with st.expander(f"Near-duplicates ({len(duplicate_results)} linked)"):
+                st.dataframe([
+                    {"Resume": result["filename"], "Duplicate of": result["duplicate_of_filename"], "Similarity": round(result["similarity"], 3)}
+                    for result in duplicate_results
+                ], use_container_width=True)
+        
         # Add Download All button for multiple evaluations
         if len(results_to_display) > 1:
             st.markdown("### Batch Download")
@@ -654,6 +938,12 @@ elif st.session_state.step == 3:
                     recommendation = f" - Recommendation: {match.group(1).strip()}"
             elif "error" in result:
                 status = " - Status: Error"
+            elif result.get("skipped"):
+                status = " - Status: Skipped by pre-screen"
+            elif "duplicate_of_filename" in result:
+                status = f" - Status: Duplicate of {result['duplicate_of_filename']}"
+            if result.get("prescreen", {}).get("label") == PRIORITY:
+                header = f"⭐ {header}"
                 
             with st.expander(f"{header}{status}{recommendation}", expanded= (len(results_to_display) == 1) ): 
                 if "error" in result:
@@ -673,6 +963,16 @@ elif st.session_state.step == 3:
                     with st.popover("Debug Info"):
                         st.markdown("**Raw API Response**")
                         st.code(result.get("_raw_response", "Not available."), language="text")
+                elif result.get("skipped"):
+                    st.info(
+                        f"Not sent to the model: the pre-screen found almost none of the rubric's critical keywords "
+                        f"(signal {result['prescreen']['signal']}). Evaluate it on its own to override."
+                    )
+                elif "duplicate_of_filename" in result:
+                    st.info(
+                        f"Not sent to the model: {result['similarity']:.0%} similar to {result['duplicate_of_filename']}, "
+                        f"so it shares that resume's evaluation above."
+                    )
                 else:
                      st.warning("No content available for this item.")
 
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the evaluation report parser against the per-field regex extraction it replaced.
+
+Reads every `*_evaluation.md` report in a directory (or synthesizes reports when there are
+none) and times both parsers over the same in-memory contents, so disk reads are excluded:
+
+    python3 benchmark_report_parser.py --dir evaluations --repeat 5
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+
+from utils.report_parser import parse_report
+
+def legacy_extract(content):
+    """The regex extraction previously duplicated in the summary scripts, kept as the baseline."""
+    name_role_match = re.search(r'# (.*?) - (.*?)\n', content)
+    recommendation_match = re.search(r'## 🏆 RECOMMENDATION: (.*?)\n', content)
+    total_score_match = re.search(r'Sum of all positive flags: (.*?) = \*\*(.*?)\*\*', content)
+    critical_score_match = re.search(r'Sum of positive critical flags: (.*?) = \*\*(.*?)\*\*', content)
+    percentage_match = re.search(r'Green Flag Percentage: (.*?)%', content)
+    linkedin_match = re.search(r'LinkedIn: (https://www\.linkedin\.com/in/[^\s]+)', content)
+    flag_pattern = re.compile(r'\| (\d+) \| \*\*(.*?)\*\* \| (.*?) \| (Critical)? \| ([-\d]+) \|')
+    strength_pattern = re.compile(r'- 💪 (.*?)\n')
+    improvement_pattern = re.compile(r'- [⚠️🔍] (.*?)\n')
+
+    total_score = total_score_match.group(2) if total_score_match else "0"
+    critical_score = critical_score_match.group(2) if critical_score_match else "0"
+    percentage = percentage_match.group(1) if percentage_match else "0"
+
+    return {
+        "name": name_role_match.group(1) if name_role_match else "Unknown",
+        "role": name_role_match.group(2) if name_role_match else "Unknown",
+        "recommendation": recommendation_match.group(1) if recommendation_match else "Unknown",
+        "total_score": float(total_score) if total_score.replace('.', '', 1).isdigit() else 0,
+        "critical_score": float(critical_score) if critical_score.replace('.', '', 1).isdigit() else 0,
+        "percentage": float(percentage) if percentage.replace('.', '', 1).isdigit() else 0,
+        "linkedin_url": linkedin_match.group(1) if linkedin_match else "",
+        "flag_scores": {
+            f"Flag_{match.group(1)}": int(match.group(5)) if match.group(5).lstrip('-').isdigit() else 0
+            for match in flag_pattern.finditer(content)
+        },
+        "strengths": [match.group(1) for match in strength_pattern.finditer(content)],
+        "improvements": [match.group(1) for match in improvement_pattern.finditer(content)]
+    }
+
+def synthesize_report(index, rng):
+    """Build a report in the format requested by resume_prompt.txt."""
+    scores = [rng.randint(0, 2) for _ in range(5)]
+    red_flags = -rng.randint(0, 1)
+    critical_score = sum(scores[:3])
+    total_score = sum(scores)
+    recommendation = "Strong Candidate" if critical_score >= 5 else "Consider" if critical_score >= 3 else "Reject"
+    categories = [
+        "AI/ML Experience & Engineering", "LLM/NLP Specialization & Engineering",
+        "Production-Grade RAG Implementation", "Startup Mentality & Hands-on Ownership", "STEM"
+    ]
+    rows = "\n".join(
+        f"| {flag_id} | **{category}** | Flag description | {'Critical' if flag_id <= 3 else ''} | {score} | Evidence {index} |"
+        for flag_id, (category, score) in enumerate(zip(categories, scores), 1)
+    )
+
+    return f"""# Candidate {index} - Engineer at Company {index % 97}
+
+## 🏆 RECOMMENDATION: {recommendation}
+
+LinkedIn: https://www.linkedin.com/in/candidate-{index}
+
+#### Flag Criteria Evaluation
+
+| **Flag ID** | **Category** | **Flag** | **Critical?** | **Score** | **Confirmation** |
+| --- | --- | --- | --- | --- | --- |
+{rows}
+| 6 | **Red Flags** | Issues that would prevent contribution | Critical | {red_flags} | Evidence {index} |
+
+### Summary Scores
+
+- **Total Score:**
+  - Sum of all positive flags: {' + '.join(str(score) for score in scores)} = **{total_score}**
+  - Sum of all negative flags: **{red_flags}**
+- **Critical Flag Score:**
+  - Sum of positive critical flags: {' + '.join(str(score) for score in scores[:3])} = **{critical_score}**
+  - Sum of negative critical flags: **{red_flags}**
+- **Green Flag Percentage:** {total_score * 10}% ({total_score}/10 possible points)
+
+### Strengths (Positive Flags) ✅
+
+- 💪 Strength one of candidate {index}
+- 💪 Strength two of candidate {index}
+
+### Areas for Improvement (Negative Flags) 📝
+
+- ⚠️ Concern one of candidate {index}
+- 🔍 Concern two of candidate {index}
+"""
+
+def load_reports(evaluations_dir, count):
+    """Read the reports in a directory, synthesizing `count` reports if it has none."""
+    contents = []
+    for eval_file in sorted(Path(evaluations_dir).glob("*_evaluation.md")):
+        with open(eval_file, 'r') as f:
+            contents.append(f.read())
+    if contents:
+        return contents, f"{len(contents)} reports from {evaluations_dir}"
+
+    rng = random.Random(0)
+    return [synthesize_report(index, rng) for index in range(count)], f"{count} synthesized reports"
+
+def time_parser(parse, contents, repeat):
+    """Get the best time of `repeat` passes of `parse` over every report."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            parse(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the evaluation report parser.")
+    parser.add_argument("--dir", default="evaluations", help="Directory of *_evaluation.md reports")
+    parser.add_argument("--count", type=int, default=5000, help="Reports to synthesize if the directory has none")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per parser; the best one is reported")
+    args = parser.parse_args()
+
+    contents, source = load_reports(args.dir, args.count)
+    print(f"Parsing {source}, best of {args.repeat} passes")
+
+    for label, parse in (("regex extraction (baseline)", legacy_extract), ("shared parser", parse_report)):
+        elapsed = time_parser(parse, contents, args.repeat)
+        per_report = elapsed / len(contents) * 1e6 if contents else 0
+        print(f"  {label:<28} {elapsed:.3f}s total, {per_report:.1f}µs per report")
@@ -0,0 +1,58 @@
+import os
+import argparse
+from pathlib import Path
+from utils.structured_output import load_structured_evaluation, structured_evaluation_path
+from utils.results_store import RESULTS_DB_PATH, ResultsStore, record_from_markdown, record_from_structured
+from utils.report_pool import parse_files
+from utils.columnar_export import export_records
+
+DEFAULT_EXPORT_PATH = "evaluations/results.parquet"
+
+def load_record_file(eval_file):
+    """Build a result record from one evaluation, preferring its structured evaluation over the markdown."""
+    json_file = structured_evaluation_path(eval_file)
+    if json_file.exists():
+        record = record_from_structured(load_structured_evaluation(json_file))
+    else:
+        with open(eval_file, 'r') as f:
+            record = record_from_markdown(f.read())
+    # Files carry no evaluation time, so use when the report was last written
+    return {**record, "created_at": os.stat(eval_file).st_mtime, "report_path": str(eval_file)}
+
+def load_records_from_files(project, workers=1):
+    """Build result records from the evaluation files, all attributed to `project`."""
+    records = []
+    for eval_file, record, error in parse_files(Path("evaluations").glob("*_evaluation.md"), load_record_file, workers=workers):
+        if error:
+            print(f"Error processing {eval_file}: {error}")
+        else:
+            records.append({**record, "project": project})
+    return records
+
+def export_results(output_path=DEFAULT_EXPORT_PATH, project=None, from_files=False, workers=1):
+    """Export evaluation results to a Parquet or Feather file."""
+    if from_files:
+        records = load_records_from_files(project or "evaluations", workers)
+    else:
+        store = ResultsStore(RESULTS_DB_PATH)
+        try:
+            records = store.get_records(project=project)
+        finally:
+            store.close()
+
+    row_count = export_records(records, output_path)
+    print(f"Exported {row_count} evaluation(s) to {output_path}")
+    return output_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export evaluation results to a typed, columnar file for analytics.")
+    parser.add_argument("--output", default=DEFAULT_EXPORT_PATH,
+                        help=f"Output file; .parquet or .feather (default: {DEFAULT_EXPORT_PATH})")
+    parser.add_argument("--project", help="Only export this project's results, including sub-projects such as streamlit/<job id>, or the project to record with --from-files")
+    parser.add_argument("--from-files", action="store_true",
+                        help=f"Parse the evaluation files instead of reading the results store ({RESULTS_DB_PATH})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse evaluation files in this many processes (with --from-files)")
+    args = parser.parse_args()
+
+    export_results(output_path=args.output, project=args.project, from_files=args.from_files, workers=args.workers)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI API, for exercising the evaluation scripts without a real key.
+
+Implements chat completions (including streamed responses and simulated prompt caching) plus the file and batch
+endpoints used by `--batch-api`. Chat completions can be made slow or unreliable with the fault injection options
+(see --help), e.g. to watch the endpoint guard's circuit breaker and adaptive concurrency at work:
+
+    python3 fake_openai_server.py --port 8765 --latency 1 --capacity 6 --error-rate 0.05
+
+Every completion is a deterministic evaluation report in the format requested by
+resume_prompt.txt. Point the scripts at it with:
+
+    python3 fake_openai_server.py --port 8765
+    export OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Pause between streamed chunks, so streaming clients see the report arrive gradually
+STREAM_CHUNK_DELAY = 0.02
+
+# Simulated provider-side prompt caching: prompts sharing a prefix of at least
+# PROMPT_CACHE_MIN_TOKENS reuse it in steps of PROMPT_CACHE_BLOCK_TOKENS (4 characters per token)
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_BLOCK_TOKENS = 128
+
+# Fault injection for chat completions, set from the command line; all off by default
+_faults = {
+    # Share of completions answered with a 503, and with a 429
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    # Sent as retry-after-ms with every 429
+    "retry_after_ms": 500,
+    # Seconds each completion takes, growing with the number in flight when a capacity is set
+    "latency": 0.0,
+    # Completions served at once; any beyond this get a 429 (0 for no limit)
+    "capacity": 0,
+    # After this many completions, every completion fails with a 503 for outage_seconds
+    "outage_after": None,
+    "outage_seconds": 0.0
+}
+_completions = {"in_flight": 0, "received": 0, "outage_started": None}
+_random = random.Random(0)
+
+_lock = threading.RLock()
+_files = {}
+_batches = {}
+_prompt_prefixes = set()
+
+def cached_prompt_tokens(messages):
+    """Count the prompt tokens served from the simulated cache, and cache this prompt's prefixes."""
+    prompt = "".join(f"{message.get('role')}\x00{message.get('content', '')}\x00" for message in messages)
+    block_chars = PROMPT_CACHE_BLOCK_TOKENS * 4
+    digest = hashlib.sha256()
+    cached_blocks = 0
+    with _lock:
+        for block_count, start in enumerate(range(0, len(prompt) - block_chars + 1, block_chars), 1):
+            digest.update(prompt[start:start + block_chars].encode("utf-8"))
+            prefix_hash = digest.copy().hexdigest()
+            if prefix_hash in _prompt_prefixes and cached_blocks == block_count - 1:
+                cached_blocks = block_count
+            _prompt_prefixes.add(prefix_hash)
+    cached_tokens = cached_blocks * PROMPT_CACHE_BLOCK_TOKENS
+    return cached_tokens if cached_tokens >= PROMPT_CACHE_MIN_TOKENS else 0
+
+def fake_evaluation(messages):
+    """Build a deterministic evaluation report from the prompt contents."""
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    scores = [digest[i] % 3 for i in range(5)]
+    red_flags = -(digest[5] % 2)
+    critical_score = sum(scores[:3])
+    total_score = sum(scores)
+    if critical_score >= 5:
+        recommendation = "Strong Candidate"
+    elif critical_score >= 3:
+        recommendation = "Consider"
+    else:
+        recommendation = "Reject"
+
+    name_match = re.search(r"Resume text:\s*(.+)", prompt)
+    name = name_match.group(1).strip()[:40] if name_match else "Test Candidate"
+
+    return f"""# {name} - AI Engineer at Example Co
+
+## 🏆 RECOMMENDATION: {recommendation}
+
+### Stats
+
+#### Flag Criteria Evaluation
+
+| **Flag ID** | **Category** | **Flag** | **Critical?** | **Score** | **Confirmation** |
+| --- | --- | --- | --- | --- | --- |
+| 1 | **AI/ML Experience & Engineering** | 2+ years in applied AI/ML | Critical | {scores[0]} | Stand-in evidence |
+| 2 | **LLM/NLP Specialization & Engineering** | 1+ years of LLM/NLP experience | Critical | {scores[1]} | Stand-in evidence |
+| 3 | **Production-Grade RAG Implementation** | Production-grade RAG system | Critical | {scores[2]} | Stand-in evidence |
+| 4 | **Startup Mentality & Hands-on Ownership** | Early-stage environments |  | {scores[3]} | Stand-in evidence |
+| 5 | **STEM** | STEM degree from a top-tier university |  | {scores[4]} | Stand-in evidence |
+| 6 | **Red Flags** | Issues that would prevent contribution | Critical | {red_flags} | Stand-in evidence |
+
+### Summary Scores
+
+- **Total Score:**
+  - Sum of all positive flags: {' + '.join(str(score) for score in scores)} = **{total_score}**
+  - Sum of all negative flags: **{red_flags}**
+- **Critical Flag Score:**
+  - Sum of positive critical flags: {' + '.join(str(score) for score in scores[:3])} = **{critical_score}**
+  - Sum of negative critical flags: **{red_flags}**
+- **Green Flag Percentage:** {total_score * 10}% ({total_score}/10 possible points)
+
+### Strengths (Positive Flags) ✅
+
+- 💪 Stand-in strength one
+- 💪 Stand-in strength two
+
+### Areas for Improvement (Negative Flags) 📝
+
+- ⚠️ Stand-in concern one
+- 🔍 Stand-in concern two
+"""
+
+# One resume of a packed multi-candidate request (see utils/packing.py)
+_PACKED_RESUME = re.compile(r"<<< CANDIDATE (\d+) >>>\n(.*?)\n<<< END CANDIDATE \1 >>>", re.DOTALL)
+
+def fake_packed_evaluation(messages):
+    """Build one report per candidate of a packed request, each after its `=== CANDIDATE n ===` line."""
+    sections = []
+    for number, resume_text in _PACKED_RESUME.findall(str(messages[-1].get("content", ""))):
+        candidate_messages = [*messages[:-1], {"role": "user", "content": f"Resume text: {resume_text}"}]
+        sections.append(f"=== CANDIDATE {number} ===\n\n{fake_evaluation(candidate_messages)}")
+    return "\n".join(sections)
+
+def fake_structured_evaluation(messages):
+    """Build the same evaluation as fake_evaluation, as JSON matching the structured output schema."""
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    report = fake_evaluation(messages)
+    scores = [int(score) for score in re.findall(r"\| \d \| \*\*.*?\*\* \| .*? \| (?:Critical)? *\| (-?\d+) \|", report)]
+    keys = ["ai_ml_experience", "llm_nlp_specialization", "rag_implementation", "startup_mentality", "stem_degree", "red_flags"]
+    recommendation = re.search(r"RECOMMENDATION: (.+)", report).group(1)
+    name_match = re.search(r"Resume text:\s*(.+)", prompt)
+
+    return json.dumps({
+        "candidate_name": name_match.group(1).strip()[:40] if name_match else "Test Candidate",
+        "current_role": "AI Engineer at Example Co",
+        "recommendation": recommendation,
+        "flag_scores": {key: {"score": score, "explanation": "Stand-in evidence"} for key, score in zip(keys, scores)},
+        "strengths": ["Stand-in strength one", "Stand-in strength two"],
+        "areas_for_improvement": ["Stand-in concern one", "Stand-in concern two"],
+        "overall_impression": {"explanation": "Stand-in impression"},
+        "summary": "Stand-in summary"
+    })
+
+def chat_completion(body):
+    """Build a chat completion response for a request body."""
+    messages = body.get("messages", [])
+    if (body.get("response_format") or {}).get("type") == "json_schema":
+        content = fake_structured_evaluation(messages)
+    elif messages and _PACKED_RESUME.search(str(messages[-1].get("content", ""))):
+        content = fake_packed_evaluation(messages)
+    else:
+        content = fake_evaluation(messages)
+    prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-{hashlib.md5(content.encode('utf-8')).hexdigest()[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake-model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_prompt_tokens(messages)}
+        }
+    }
+
+def begin_completion():
+    """
+    Count a completion in flight and decide whether to fail it.
+
+    Returns `(status, error, delay)`: the HTTP status and error body of an injected failure
+    (None for a normal response), and the seconds to wait before responding.
+    """
+    with _lock:
+        _completions["in_flight"] += 1
+        _completions["received"] += 1
+        in_flight = _completions["in_flight"]
+        now = time.monotonic()
+
+        if _faults["outage_after"] is not None and _completions["received"] > _faults["outage_after"]:
+            if _completions["outage_started"] is None:
+                _completions["outage_started"] = now
+            if now - _completions["outage_started"] < _faults["outage_seconds"]:
+                return 503, {"message": "The server is currently unavailable (injected outage)", "type": "server_error"}, 0.0
+
+        capacity = _faults["capacity"]
+        if capacity and in_flight > capacity:
+            return 429, {"message": f"Too many concurrent requests (capacity {capacity})", "type": "requests",
+                         "code": "rate_limit_exceeded"}, 0.0
+
+        roll = _random.random()
+        if roll < _faults["rate_limit_rate"]:
+            return 429, {"message": "Rate limit reached (injected)", "type": "requests", "code": "rate_limit_exceeded"}, 0.0
+        if roll < _faults["rate_limit_rate"] + _faults["error_rate"]:
+            return 503, {"message": "The server is overloaded (injected)", "type": "server_error"}, 0.0
+
+        # A loaded server answers more slowly
+        delay = _faults["latency"]
+        if capacity:
+            delay *= 1 + (in_flight - 1) / capacity
+        return None, None, delay
+
+def end_completion():
+    with _lock:
+        _completions["in_flight"] -= 1
+
+def chat_completion_chunks(completion, include_usage=False):
+    """Split a chat completion into the chunk objects of a streamed response."""
+    content = completion["choices"][0]["message"]["content"]
+    base = {key: completion[key] for key in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+
+    # One chunk per line, like a model emitting the report a line at a time
+    for line in content.splitlines(keepends=True):
+        yield {**base, "choices": [{"index": 0, "delta": {"content": line}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    if include_usage:
+        yield {**base, "choices": [], "usage": completion["usage"]}
+
+def store_file(content, filename, purpose):
+    """Keep an uploaded or generated file in memory and return its file object."""
+    with _lock:
+        file_id = f"file-{len(_files) + 1}"
+        _files[file_id] = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+            "content": content
+        }
+    return {key: value for key, value in _files[file_id].items() if key != "content"}
+
+def run_batch(batch_id):
+    """Process every request of a batch and attach the output file."""
+    batch = _batches[batch_id]
+    output_lines = []
+    for line in _files[batch["input_file_id"]]["content"].decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        output_lines.append(json.dumps({
+            "id": f"batch_req_{len(output_lines) + 1}",
+            "custom_id": request["custom_id"],
+            "response": {"status_code": 200, "request_id": "", "body": chat_completion(request["body"])},
+            "error": None
+        }))
+
+    output_file = store_file(("\n".join(output_lines) + "\n").encode("utf-8"), f"{batch_id}_output.jsonl", "batch_output")
+    batch["output_file_id"] = output_file["id"]
+    batch["request_counts"] = {"total": len(output_lines), "completed": len(output_lines), "failed": 0}
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Route the subset of OpenAI endpoints the scripts use."""
+
+    # Keep connections open so client-side connection reuse can be observed
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, chunks):
+        """Send chunks as server-sent events over a chunked HTTP response."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self._write_http_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            time.sleep(STREAM_CHUNK_DELAY)
+        self._write_http_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_http_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("utf-8") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        if self.path.endswith("/chat/completions"):
+            body = json.loads(self._read_body())
+            status, error, delay = begin_completion()
+            try:
+                time.sleep(delay)
+                if error:
+                    headers = {"retry-after-ms": str(_faults["retry_after_ms"])} if status == 429 else None
+                    self._send_json({"error": error}, status=status, headers=headers)
+                elif body.get("stream"):
+                    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                    self._send_stream(chat_completion_chunks(chat_completion(body), include_usage))
+                else:
+                    self._send_json(chat_completion(body))
+            finally:
+                end_completion()
+        elif self.path.endswith("/files"):
+            # Parse the multipart upload with the email package
+            raw = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self._read_body()
+            fields = {}
+            for part in BytesParser().parsebytes(raw).get_payload():
+                fields[part.get_param("name", header="content-disposition")] = part
+            upload = fields["file"]
+            purpose = fields["purpose"].get_payload(decode=True).decode("utf-8")
+            self._send_json(store_file(upload.get_payload(decode=True), upload.get_filename(), purpose))
+        elif self.path.endswith("/batches"):
+            body = json.loads(self._read_body())
+            with _lock:
+                batch_id = f"batch_{len(_batches) + 1}"
+                _batches[batch_id] = {
+                    "id": batch_id,
+                    "object": "batch",
+                    "endpoint": body["endpoint"],
+                    "input_file_id": body["input_file_id"],
+                    "completion_window": body["completion_window"],
+                    "status": "validating",
+                    "created_at": int(time.time()),
+                    "metadata": body.get("metadata"),
+                    "output_file_id": None,
+                    "error_file_id": None,
+                    "request_counts": {"total": 0, "completed": 0, "failed": 0}
+                }
+            self._send_json(_batches[batch_id])
+        else:
+            self._send_json({"error": {"message": f"Unknown endpoint {self.path}"}}, status=404)
+
+    def do_GET(self):
+        batch_match = re.search(r"/batches/([^/?]+)$", self.path)
+        content_match = re.search(r"/files/([^/?]+)/content$", self.path)
+        if batch_match and batch_match.group(1) in _batches:
+            batch = _batches[batch_match.group(1)]
+            with _lock:
+                # Report one in-progress poll, then finish the batch
+                if batch["status"] == "validating":
+                    batch["status"] = "in_progress"
+                elif batch["status"] == "in_progress":
+                    run_batch(batch["id"])
+                    batch["status"] = "completed"
+            self._send_json(batch)
+        elif content_match and content_match.group(1) in _files:
+            content = _files[content_match.group(1)]["content"]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        else:
+            self._send_json({"error": {"message": f"Unknown endpoint {self.path}"}}, status=404)
+
+    def log_message(self, format, *args):
+        print(f"[fake-openai] {self.command} {self.path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of completions failed with a 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of completions rejected with a 429")
+    parser.add_argument("--retry-after-ms", type=int, default=500, help="retry-after-ms header sent with 429s")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each completion takes when the server is idle")
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="Completions served at once; more get a 429, and latency grows with load (0 for no limit)")
+    parser.add_argument("--outage-after", type=int, default=None, help="Start an outage after this many completions")
+    parser.add_argument("--outage-seconds", type=float, default=30.0, help="Length of the outage in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the injected random failures")
+    args = parser.parse_args()
+
+    _faults.update(
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_ms=args.retry_after_ms,
+        latency=args.latency,
+        capacity=args.capacity,
+        outage_after=args.outage_after,
+        outage_seconds=args.outage_seconds
+    )
+    _random.seed(args.seed)
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeOpenAIHandler)
+    print(f"Fake OpenAI API listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
@@ -1,90 +1,131 @@
 import os
-import re
 import csv
+import argparse
 from pathlib import Path
+from utils.structured_output import load_structured_evaluation, structured_evaluation_path
+from utils.results_store import RESULTS_DB_PATH, ResultsStore
+from utils.summary_manifest import SummaryManifest
+from utils.report_parser import parse_report_file
+from utils.report_pool import parse_files
+from utils.summary_aggregator import TopK
+
+# Bump when the parsed record shape changes, to discard the records cached by --incremental
+SUMMARY_MANIFEST_VERSION = 2
 
 def extract_info_from_evaluation(file_path):
     """Extract key information from an evaluation file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    # Extract candidate name and role
-    name_role_match = re.search(r'# (.*?) - (.*?)\n', content)
-    name = name_role_match.group(1) if name_role_match else "Unknown"
-    role = name_role_match.group(2) if name_role_match else "Unknown"
-    
-    # Extract recommendation
-    recommendation_match = re.search(r'## 🏆 RECOMMENDATION: (.*?)\n', content)
-    recommendation = recommendation_match.group(1) if recommendation_match else "Unknown"
-    
-    # Extract total score
-    total_score_match = re.search(r'Sum of all positive flags: (.*?) = \*\*(.*?)\*\*', content)
-    total_score = total_score_match.group(2) if total_score_match else "0"
-    
-    # Extract critical flag score
-    critical_score_match = re.search(r'Sum of positive critical flags: (.*?) = \*\*(.*?)\*\*', content)
-    critical_score = critical_score_match.group(2) if critical_score_match else "0"
-    
-    # Extract individual flag scores
-    flag_scores = {}
-    flag_pattern = re.compile(r'\| (\d+) \| \*\*(.*?)\*\* \| (.*?) \| (Critical)? \| ([-\d]+) \| (.*?) \|')
-    for match in flag_pattern.finditer(content):
-        flag_id = match.group(1)
-        flag_score = match.group(5)
-        confirmation = match.group(6).strip()
-        flag_scores[f"Flag_{flag_id}"] = {
-            "score": int(flag_score) if flag_score.lstrip('-').isdigit() else 0,
-            "confirmation": confirmation
-        }
-    
-    # Extract LinkedIn URL if available
-    linkedin_match = re.search(r'https?://(?:www\.)?linkedin\.com/\S+', content)
-    linkedin_url = linkedin_match.group(0) if linkedin_match else ""
-    
-    # Extract strengths
-    strengths = []
-    strength_pattern = re.compile(r'- 💪 (.*?)\n')
-    for match in strength_pattern.finditer(content):
-        strengths.append(match.group(1))
-    
-    # Extract areas for improvement
-    improvements = []
-    improvement_pattern = re.compile(r'- [⚠️🔍] (.*?)\n')
-    for match in improvement_pattern.finditer(content):
-        improvements.append(match.group(1))
-    
+    report = parse_report_file(file_path)
+    return {
+        "Name": report.name,
+        "Current Role": report.current_role,
+        "Recommendation": report.recommendation,
+        "Total Score": report.total_score,
+        "Critical Score": report.critical_score,
+        "LinkedIn URL": report.linkedin_url,
+        "AI/ML Score": report.flag_score(1),
+        "LLM/NLP Score": report.flag_score(2),
+        "RAG Score": report.flag_score(3),
+        "Startup Score": report.flag_score(4),
+        "STEM Score": report.flag_score(5),
+        "Red Flags": report.flag_score(6),
+        "Key Strengths": "; ".join(report.strengths[:2]),
+        "Areas for Improvement": "; ".join(report.concerns[:2])
+    }
+
+def extract_info_from_structured(json_path):
+    """Build the same CSV row as extract_info_from_evaluation from a structured evaluation file."""
+    evaluation = load_structured_evaluation(json_path)
+    flag_scores = evaluation["flag_scores"]
     return {
-        "Name": name,
-        "Current Role": role,
-        "Recommendation": recommendation,
-        "Total Score": float(total_score) if total_score.replace('.', '', 1).isdigit() else 0,
-        "Critical Score": float(critical_score) if critical_score.replace('.', '', 1).isdigit() else 0,
-        "LinkedIn URL": linkedin_url,
-        "AI/ML Score": flag_scores.get("Flag_1", {}).get("score", 0),
-        "LLM/NLP Score": flag_scores.get("Flag_2", {}).get("score", 0),
-        "RAG Score": flag_scores.get("Flag_3", {}).get("score", 0),
-        "Startup Score": flag_scores.get("Flag_4", {}).get("score", 0),
-        "STEM Score": flag_scores.get("Flag_5", {}).get("score", 0),
-        "Red Flags": flag_scores.get("Flag_6", {}).get("score", 0),
-        "Key Strengths": "; ".join(strengths[:2]) if strengths else "",
-        "Areas for Improvement": "; ".join(improvements[:2]) if improvements else ""
+        "Name": evaluation["candidate_name"],
+        "Current Role": evaluation["current_role"],
+        "Recommendation": evaluation["recommendation"],
+        "Total Score": float(evaluation["total_score"]),
+        "Critical Score": float(evaluation["critical_score"]),
+        # Structured evaluations carry no free text to find a profile link in
+        "LinkedIn URL": "",
+        "AI/ML Score": flag_scores["ai_ml_experience"]["score"],
+        "LLM/NLP Score": flag_scores["llm_nlp_specialization"]["score"],
+        "RAG Score": flag_scores["rag_implementation"]["score"],
+        "Startup Score": flag_scores["startup_mentality"]["score"],
+        "STEM Score": flag_scores["stem_degree"]["score"],
+        "Red Flags": flag_scores["red_flags"]["score"],
+        "Key Strengths": "; ".join(evaluation["strengths"][:2]),
+        "Areas for Improvement": "; ".join(evaluation["areas_for_improvement"][:2])
     }
 
-def generate_csv_summary():
-    """Generate a CSV summary of all candidate evaluations."""
+def parse_evaluation_file(eval_file):
+    """Parse one evaluation, preferring the typed scores of a structured evaluation over the markdown."""
+    json_file = structured_evaluation_path(eval_file)
+    if json_file.exists():
+        return extract_info_from_structured(json_file)
+    return extract_info_from_evaluation(eval_file)
+
+def load_rows_from_store(project=None, db_path=RESULTS_DB_PATH):
+    """Yield CSV rows from the results store instead of parsing evaluation files."""
+    store = ResultsStore(db_path)
+    try:
+        # Stream the records a batch at a time rather than loading the whole project
+        for record in store.iter_records(project=project):
+            flag_scores = {flag["flag_id"]: flag["score"] for flag in record["flags"]}
+            yield {
+                "Name": record["name"],
+                "Current Role": record["current_role"],
+                "Recommendation": record["recommendation"],
+                "Total Score": record["total_score"],
+                "Critical Score": record["critical_score"],
+                "LinkedIn URL": record["linkedin_url"] or "",
+                "AI/ML Score": flag_scores.get(1, 0),
+                "LLM/NLP Score": flag_scores.get(2, 0),
+                "RAG Score": flag_scores.get(3, 0),
+                "Startup Score": flag_scores.get(4, 0),
+                "STEM Score": flag_scores.get(5, 0),
+                "Red Flags": flag_scores.get(6, 0),
+                "Key Strengths": "; ".join(record["strengths"][:2]),
+                "Areas for Improvement": "; ".join(record["concerns"][:2])
+            }
+    finally:
+        store.close()
+
+def iter_rows(from_store=False, project=None, incremental=False, workers=1):
+    """Yield CSV rows from the results store or the evaluation files."""
     evaluations_dir = Path("evaluations")
-    candidates = []
     
-    # Process all evaluation files
-    for eval_file in evaluations_dir.glob("*_evaluation.md"):
-        try:
-            candidate_data = extract_info_from_evaluation(eval_file)
-            candidates.append(candidate_data)
-        except Exception as e:
-            print(f"Error processing {eval_file}: {e}")
+    if from_store:
+        # Read the records written as evaluations finished
+        yield from load_rows_from_store(project)
+    elif incremental:
+        # Only parse evaluations that are new or changed since the last run
+        manifest = SummaryManifest("csv_summary", SUMMARY_MANIFEST_VERSION)
+        eval_files = list(evaluations_dir.glob("*_evaluation.md"))
+        records = manifest.get_records(
+            eval_files, parse_evaluation_file,
+            related_paths=lambda path: [structured_evaluation_path(path)], workers=workers
+        )
+        print(f"Parsed {manifest.parsed_count} new or changed evaluation(s), reused {len(records) - manifest.parsed_count}")
+        for _, record in records:
+            yield record
+    else:
+        # Process all evaluation files, across `workers` processes
+        for eval_file, record, error in parse_files(evaluations_dir.glob("*_evaluation.md"), parse_evaluation_file, workers=workers):
+            if error:
+                print(f"Error processing {eval_file}: {error}")
+            else:
+                yield record
+
+def generate_csv_summary(from_store=False, project=None, incremental=False, workers=1, top=None):
+    """Generate a CSV summary of all candidate evaluations, or of the `top` best ones."""
+    rows = iter_rows(from_store, project, incremental, workers)
     
-    # Sort candidates by total score (descending)
-    candidates.sort(key=lambda x: x["Total Score"], reverse=True)
+    if top is not None:
+        # Only keep the best `top` rows as they stream in
+        best_rows = TopK(top, key=lambda x: x["Total Score"])
+        for row in rows:
+            best_rows.add(row)
+        candidates = best_rows.items()
+    else:
+        # Sort candidates by total score (descending)
+        candidates = sorted(rows, key=lambda x: x["Total Score"], reverse=True)
     
     # Define CSV file path
     csv_file = Path("candidate_summary.csv")
@@ -106,4 +147,17 @@ def generate_csv_summary():
     return csv_file
 
 if __name__ == "__main__":
-    generate_csv_summary() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Write a CSV summary of all candidate evaluations.")
+    parser.add_argument("--from-store", action="store_true",
+                        help=f"Read results from the results store ({RESULTS_DB_PATH}) instead of the evaluation files")
+    parser.add_argument("--project", help="Only include this project's results, including sub-projects such as streamlit/<job id> (with --from-store)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the records of evaluation files that haven't changed since the last run")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse evaluation files in this many processes (default: 1)")
+    parser.add_argument("--top", type=int,
+                        help="Only write the TOP highest-scoring candidates")
+    args = parser.parse_args()
+    
+    generate_csv_summary(from_store=args.from_store, project=args.project, incremental=args.incremental,
+                         workers=args.workers, top=args.top) 
\ No newline at end of file
@@ -1,108 +1,131 @@
 import os
-import re
+import argparse
 from pathlib import Path
-import markdown
-from bs4 import BeautifulSoup
-import pandas as pd
-from collections import defaultdict
+from utils.structured_output import FLAG_KEYS, load_structured_evaluation, structured_evaluation_path
+from utils.results_store import RESULTS_DB_PATH, ResultsStore
+from utils.summary_manifest import SummaryManifest
+from utils.report_parser import parse_report_file
+from utils.report_pool import parse_files
+from utils.summary_aggregator import SummaryAggregator
+
+# Bump when the parsed record shape changes, to discard the records cached by --incremental
+SUMMARY_MANIFEST_VERSION = 2
+
+# Candidates listed and analysed in detail
+TOP_CANDIDATE_COUNT = 10
 
 def extract_score_from_evaluation(file_path):
     """Extract scores and other key information from evaluation file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    # Extract candidate name and role
-    name_role_match = re.search(r'# (.*?) - (.*?)\n', content)
-    name = name_role_match.group(1) if name_role_match else "Unknown"
-    role = name_role_match.group(2) if name_role_match else "Unknown"
-    
-    # Extract recommendation
-    recommendation_match = re.search(r'## 🏆 RECOMMENDATION: (.*?)\n', content)
-    recommendation = recommendation_match.group(1) if recommendation_match else "Unknown"
-    
-    # Extract total score
-    total_score_match = re.search(r'Sum of all positive flags: (.*?) = \*\*(.*?)\*\*', content)
-    total_score = total_score_match.group(2) if total_score_match else "0"
-    
-    # Extract critical flag score
-    critical_score_match = re.search(r'Sum of positive critical flags: (.*?) = \*\*(.*?)\*\*', content)
-    critical_score = critical_score_match.group(2) if critical_score_match else "0"
-    
-    # Extract green flag percentage
-    percentage_match = re.search(r'Green Flag Percentage: (.*?)%', content)
-    percentage = percentage_match.group(1) if percentage_match else "0"
-    
-    # Extract individual flag scores
-    flag_scores = {}
-    flag_pattern = re.compile(r'\| (\d+) \| \*\*(.*?)\*\* \| (.*?) \| (Critical)? \| (\d+) \|')
-    for match in flag_pattern.finditer(content):
-        flag_id = match.group(1)
-        flag_score = match.group(5)
-        flag_scores[f"Flag_{flag_id}"] = int(flag_score) if flag_score.isdigit() else 0
-    
-    # Extract strengths
-    strengths = []
-    strength_pattern = re.compile(r'- 💪 (.*?)\n')
-    for match in strength_pattern.finditer(content):
-        strengths.append(match.group(1))
-    
-    # Extract areas for improvement
-    improvements = []
-    improvement_pattern = re.compile(r'- [⚠️🔍] (.*?)\n')
-    for match in improvement_pattern.finditer(content):
-        improvements.append(match.group(1))
-    
+    report = parse_report_file(file_path)
     return {
-        "name": name,
-        "role": role,
-        "recommendation": recommendation,
-        "total_score": float(total_score) if total_score.replace('.', '', 1).isdigit() else 0,
-        "critical_score": float(critical_score) if critical_score.replace('.', '', 1).isdigit() else 0,
-        "percentage": float(percentage) if percentage.replace('.', '', 1).isdigit() else 0,
-        "flag_scores": flag_scores,
-        "strengths": strengths,
-        "improvements": improvements,
+        "name": report.name,
+        "role": report.current_role,
+        "recommendation": report.recommendation,
+        "total_score": report.total_score,
+        "critical_score": report.critical_score,
+        "percentage": report.green_flag_percentage,
+        "flag_scores": {f"Flag_{flag.flag_id}": flag.score for flag in report.flags},
+        "strengths": report.strengths,
+        "improvements": report.concerns,
         "file_path": file_path
     }
 
-def generate_summary():
-    """Generate a comprehensive summary of all candidates."""
-    evaluations_dir = Path("evaluations")
-    candidates = []
-    
-    # Process all evaluation files
-    for eval_file in evaluations_dir.glob("*_evaluation.md"):
+def extract_score_from_structured(json_path, file_path):
+    """Build the same record as extract_score_from_evaluation from a structured evaluation file."""
+    evaluation = load_structured_evaluation(json_path)
+    return {
+        "name": evaluation["candidate_name"],
+        "role": evaluation["current_role"],
+        "recommendation": evaluation["recommendation"],
+        "total_score": float(evaluation["total_score"]),
+        "critical_score": float(evaluation["critical_score"]),
+        "percentage": float(evaluation["green_flag_percentage"]),
+        "flag_scores": {f"Flag_{i}": evaluation["flag_scores"][key]["score"] for i, key in enumerate(FLAG_KEYS, 1)},
+        "strengths": evaluation["strengths"],
+        "improvements": evaluation["areas_for_improvement"],
+        "file_path": file_path
+    }
+
+def parse_evaluation_file(eval_file):
+    """Parse one evaluation, preferring the typed scores of a structured evaluation over the markdown."""
+    json_file = structured_evaluation_path(eval_file)
+    if json_file.exists():
+        candidate_data = extract_score_from_structured(json_file, eval_file)
+    else:
         candidate_data = extract_score_from_evaluation(eval_file)
-        candidates.append(candidate_data)
+    # Keep the record JSON-serialisable for the incremental manifest
+    return {**candidate_data, "file_path": str(eval_file)}
+
+def load_candidates_from_store(project=None, db_path=RESULTS_DB_PATH):
+    """Yield candidate records from the results store instead of parsing evaluation files."""
+    store = ResultsStore(db_path)
+    try:
+        # Stream the records a batch at a time rather than loading the whole project
+        for record in store.iter_records(project=project):
+            yield {
+                "name": record["name"],
+                "role": record["current_role"],
+                "recommendation": record["recommendation"],
+                "total_score": record["total_score"],
+                "critical_score": record["critical_score"],
+                "percentage": record["green_flag_percentage"],
+                "flag_scores": {f"Flag_{flag['flag_id']}": flag["score"] for flag in record["flags"]},
+                "strengths": record["strengths"],
+                "improvements": record["concerns"],
+                "file_path": record["report_path"]
+            }
+    finally:
+        store.close()
+
+def iter_candidates(from_store=False, project=None, incremental=False, workers=1):
+    """Yield candidate records from the results store or the evaluation files."""
+    evaluations_dir = Path("evaluations")
     
-    # Sort candidates by total score (descending)
-    candidates.sort(key=lambda x: (x["total_score"], x["critical_score"]), reverse=True)
+    if from_store:
+        # Read the records written as evaluations finished
+        yield from load_candidates_from_store(project)
+    elif incremental:
+        # Only parse evaluations that are new or changed since the last run
+        manifest = SummaryManifest("summary", SUMMARY_MANIFEST_VERSION)
+        eval_files = list(evaluations_dir.glob("*_evaluation.md"))
+        records = manifest.get_records(
+            eval_files, parse_evaluation_file,
+            related_paths=lambda path: [structured_evaluation_path(path)], workers=workers
+        )
+        print(f"Parsed {manifest.parsed_count} new or changed evaluation(s), reused {len(records) - manifest.parsed_count}")
+        for _, record in records:
+            yield record
+    else:
+        # Process all evaluation files, across `workers` processes
+        for eval_file, record, error in parse_files(evaluations_dir.glob("*_evaluation.md"), parse_evaluation_file, workers=workers):
+            if error:
+                print(f"Error processing {eval_file}: {error}")
+            else:
+                yield record
+
+def generate_summary(from_store=False, project=None, incremental=False, workers=1):
+    """Generate a comprehensive summary of all candidates."""
+    # Keep running stats and only the top candidates, by total then critical score, as records stream in
+    aggregator = SummaryAggregator(TOP_CANDIDATE_COUNT, key=lambda x: (x["total_score"], x["critical_score"]))
+    for candidate in iter_candidates(from_store, project, incremental, workers):
+        aggregator.add(candidate)
     
     # Get top 10 candidates
-    top_candidates = candidates[:10]
+    top_candidates = aggregator.top.items()
     
     # Calculate stats
-    total_candidates = len(candidates)
-    strong_candidates = sum(1 for c in candidates if c["recommendation"] == "Strong Candidate")
-    consider_candidates = sum(1 for c in candidates if c["recommendation"] == "Consider")
-    reject_candidates = sum(1 for c in candidates if c["recommendation"] == "Reject")
+    total_candidates = aggregator.count
+    strong_candidates = aggregator.recommendation_counts["Strong Candidate"]
+    consider_candidates = aggregator.recommendation_counts["Consider"]
+    reject_candidates = aggregator.recommendation_counts["Reject"]
     
     # Calculate average scores
-    avg_total = sum(c["total_score"] for c in candidates) / total_candidates if total_candidates > 0 else 0
-    avg_critical = sum(c["critical_score"] for c in candidates) / total_candidates if total_candidates > 0 else 0
-    
-    # Analyze common strengths and areas for improvement
-    all_strengths = defaultdict(int)
-    all_improvements = defaultdict(int)
-    
-    for candidate in candidates:
-        for strength in candidate["strengths"]:
-            all_strengths[strength] += 1
-        for improvement in candidate["improvements"]:
-            all_improvements[improvement] += 1
+    avg_total = aggregator.average("total_score")
+    avg_critical = aggregator.average("critical_score")
     
-    top_strengths = sorted(all_strengths.items(), key=lambda x: x[1], reverse=True)[:5]
-    top_improvements = sorted(all_improvements.items(), key=lambda x: x[1], reverse=True)[:5]
+    # Most common strengths and areas for improvement
+    top_strengths = aggregator.most_common_strengths(5)
+    top_improvements = aggregator.most_common_improvements(5)
     
     # Create summary markdown
     summary = f"""# Comprehensive Candidate Assessment for Applied AI Researcher Position
@@ -191,4 +214,15 @@ def generate_summary():
     print(f"Summary generated: {summary_file}")
 
 if __name__ == "__main__":
-    generate_summary() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Summarise all candidate evaluations.")
+    parser.add_argument("--from-store", action="store_true",
+                        help=f"Read results from the results store ({RESULTS_DB_PATH}) instead of the evaluation files")
+    parser.add_argument("--project", help="Only summarise this project's results, including sub-projects such as streamlit/<job id> (with --from-store)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the records of evaluation files that haven't changed since the last run")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse evaluation files in this many processes (default: 1)")
+    args = parser.parse_args()
+    
+    generate_summary(from_store=args.from_store, project=args.project, incremental=args.incremental,
+                     workers=args.workers) 
\ No newline at end of file
@@ -8,17 +8,12 @@ import json
 import re
 import time
 from pathlib import Path
-import PyPDF2
 from openai import OpenAI
+from utils.resume_processor import extract_text_from_pdf_file
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file."""
-    with open(pdf_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-    return text
+    """Extract text from a PDF file, reusing the cached text if the file is unchanged."""
+    return extract_text_from_pdf_file(pdf_path)
 
 def load_text_file(file_path):
     """Load text from a file."""
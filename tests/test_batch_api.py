@@ -0,0 +1,88 @@
+"""
+Tests for the Batch API mode against fake_openai_server, run in a thread
+"""
+
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import ai_evaluate_resumes_config
+from ai_evaluate_resumes_config import build_evaluation_request, collect_batch_results
+from fake_openai_server import FakeOpenAIHandler
+from utils.batch_api import download_batch_results, submit_batch, wait_for_batch, write_batch_input
+from utils.job_ledger import DONE, EVALUATING, EXTRACTED, QUEUED, JobLedger
+from utils.openai_clients import get_openai_client
+from utils.results_store import ResultsStore
+
+class FakeConfigLoader:
+    """Just enough of ConfigLoader to build requests and write evaluation files into a project folder."""
+
+    def __init__(self, projects_folder):
+        self.config = {"model": "gpt-4-turbo", "current_project": "batch-test",
+                       "output_in_project_folder": True, "projects_folder": str(projects_folder)}
+
+    def get_system_prompt(self):
+        return "You evaluate resumes."
+
+    def get_user_prompt_template(self):
+        return "Evaluate this resume.\n\nResume text: {resume_text}"
+
+    def get_model_config(self, model_name=None):
+        return {"max_tokens": 1000, "temperature": 0.3}
+
+@pytest.fixture
+def client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield get_openai_client("test", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_batch_round_trip(client, tmp_path):
+    loader = FakeConfigLoader(tmp_path)
+    requests = [(f"resume-{index}", build_evaluation_request(name, loader)) for index, name in enumerate(["Jane Doe", "John Roe"])]
+    input_path = write_batch_input(requests, tmp_path / "debug" / "batch_input.jsonl")
+    assert len(input_path.read_text().splitlines()) == 2
+
+    submitted = submit_batch(client, input_path, metadata={"project": "batch-test"})
+    statuses = []
+    batch = wait_for_batch(client, submitted.id, poll_interval=0, on_poll=lambda polled: statuses.append(polled.status))
+    assert statuses == ["in_progress", "completed"]
+    assert batch.request_counts.completed == 2
+
+    results = download_batch_results(client, batch)
+    assert sorted(results) == ["resume-0", "resume-1"]
+    assert results["resume-0"]["content"].startswith("# Jane Doe - ")
+    assert results["resume-1"]["usage"]["prompt_tokens"] > 0
+
+def test_batch_results_fan_out_to_evaluation_files(client, tmp_path, monkeypatch):
+    store = ResultsStore(tmp_path / "results.db")
+    monkeypatch.setattr(ai_evaluate_resumes_config, "get_results_store", lambda: store)
+    loader = FakeConfigLoader(tmp_path)
+    ledger_path = tmp_path / "jobs.jsonl"
+    ledger = JobLedger(ledger_path)
+
+    candidates = {"pdfs/Jane_Doe.pdf": "Jane Doe", "pdfs/John_Roe.pdf": "John Roe"}
+    requests = []
+    for pdf_path, candidate_name in candidates.items():
+        ledger.record(pdf_path, QUEUED, candidate_name=candidate_name)
+        ledger.record(pdf_path, EXTRACTED)
+        requests.append((f"resume-{len(requests)}", build_evaluation_request(candidate_name, loader)))
+    submitted = submit_batch(client, write_batch_input(requests, tmp_path / "batch_input.jsonl"))
+    for (pdf_path, _), (custom_id, _) in zip(candidates.items(), requests):
+        ledger.record(pdf_path, EVALUATING, batch_id=submitted.id, custom_id=custom_id)
+
+    assert collect_batch_results(client, submitted.id, ledger, loader, poll_interval=0) == 2
+
+    for candidate_name in candidates.values():
+        report = (tmp_path / "batch-test" / f"{candidate_name.replace(' ', '_')}_evaluation.md").read_text()
+        assert report.startswith(f"# {candidate_name} - ")
+    # The ledger on disk replays to done, so a rerun skips both files
+    replayed = JobLedger(ledger_path)
+    assert all(replayed.is_done(pdf_path) for pdf_path in candidates)
+    assert replayed.get("pdfs/Jane_Doe.pdf")["usage"]["prompt_tokens"] > 0
+    assert sorted(record["name"] for record in store.get_records("batch-test")) == ["Jane Doe", "John Roe"]
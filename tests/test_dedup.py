@@ -0,0 +1,50 @@
+"""
+Tests for near-duplicate resume detection
+"""
+
+import random
+
+from utils.dedup import DEFAULT_DEDUP_THRESHOLD, NearDuplicateIndex, load_dedup_threshold, minhash_signature
+
+WORDS = ("python pytorch transformer retrieval ranking startup founder research production pipeline "
+         "embedding vector search latency evaluation dataset annotation kubernetes spark analytics").split()
+
+def resume_text(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(length))
+
+def test_short_texts_have_no_signature():
+    assert minhash_signature("Scanned PDF with no text layer") is None
+    index = NearDuplicateIndex()
+    index.add("short", None)
+    assert index.find(None) is None
+
+def test_identical_and_lightly_edited_resumes_match():
+    original = resume_text(1)
+    edited = original.replace(original.split()[10], "changed", 1)
+    index = NearDuplicateIndex()
+    index.add("original", minhash_signature(original))
+
+    assert index.find(minhash_signature(original)) == ("original", 1.0)
+    match = index.find(minhash_signature(edited))
+    assert match is not None and match[0] == "original" and match[1] >= DEFAULT_DEDUP_THRESHOLD
+
+def test_different_resumes_do_not_match():
+    index = NearDuplicateIndex()
+    index.add("first", minhash_signature(resume_text(1)))
+    assert index.find(minhash_signature(resume_text(2))) is None
+
+def test_threshold_is_respected():
+    original = resume_text(3)
+    words = original.split()
+    # Replace every fifth word, leaving few shingles in common
+    edited = " ".join("other" if position % 5 == 0 else word for position, word in enumerate(words))
+    strict = NearDuplicateIndex(threshold=0.99)
+    strict.add("original", minhash_signature(original))
+    assert strict.find(minhash_signature(edited)) is None
+
+def test_load_dedup_threshold(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text('{"dedup_threshold": 0.9}')
+    assert load_dedup_threshold(config_path) == 0.9
+    assert load_dedup_threshold(tmp_path / "missing.json") == DEFAULT_DEDUP_THRESHOLD
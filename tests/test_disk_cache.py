@@ -0,0 +1,59 @@
+"""
+Tests for age- and size-based eviction, shared by the disk caches and the spooled uploads
+"""
+
+import os
+import time
+
+from utils.disk_cache import DiskCache, evict_files
+from utils.resume_processor import prune_uploaded_pdfs, save_uploaded_pdf
+
+def make_file(path, size, age_seconds):
+    """Write `size` bytes to `path`, last modified `age_seconds` ago."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    modified = time.time() - age_seconds
+    os.utime(path, (modified, modified))
+    return path
+
+def test_expired_files_go_first_then_the_least_recently_used(tmp_path):
+    expired = make_file(tmp_path / "expired", 10, 500)
+    old = make_file(tmp_path / "old", 10, 50)
+    recent = make_file(tmp_path / "recent", 10, 10)
+    assert evict_files(tmp_path.iterdir(), max_bytes=10, max_age_seconds=100) == 2
+    assert not expired.exists() and not old.exists() and recent.exists()
+
+def test_nothing_is_removed_within_the_limits(tmp_path):
+    make_file(tmp_path / "a", 10, 50)
+    make_file(tmp_path / "b", 10, 10)
+    assert evict_files(tmp_path.iterdir(), max_bytes=20, max_age_seconds=100) == 0
+    assert evict_files(tmp_path.iterdir()) == 0
+
+def test_files_within_the_grace_period_are_kept_over_the_size_cap(tmp_path):
+    old = make_file(tmp_path / "old", 10, 3600)
+    fresh = [make_file(tmp_path / f"fresh-{index}", 10, 60) for index in range(3)]
+    assert evict_files(tmp_path.iterdir(), max_bytes=10, min_age_seconds=600) == 1
+    assert not old.exists()
+    assert all(path.exists() for path in fresh)
+
+def test_disk_cache_prune_evicts_through_the_helper(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=100, max_age_seconds=1000)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.set(key, "v" * 40)
+    # Reading an entry makes it the most recently used
+    os.utime(cache._path_for("aa1"), (time.time() - 100, time.time() - 100))
+    os.utime(cache._path_for("bb2"), (time.time() - 50, time.time() - 50))
+    cache.get("aa1")
+    cache.prune()
+    assert cache.get("aa1") == "v" * 40
+    assert cache.get("bb2") is None
+    assert cache.get("cc3") == "v" * 40
+
+def test_prune_uploaded_pdfs_keeps_other_sessions_recent_uploads(tmp_path):
+    stale = make_file(tmp_path / "stale.pdf", 100, 2 * 24 * 3600)
+    queued = make_file(tmp_path / "queued.pdf", 100, 600)
+    other = make_file(tmp_path / "notes.txt", 100, 2 * 24 * 3600)
+    spooled = save_uploaded_pdf(b"%PDF-1.4 new upload", upload_dir=tmp_path)
+    assert prune_uploaded_pdfs(upload_dir=tmp_path, max_bytes=50, grace_seconds=3600) == 1
+    assert not stale.exists()
+    assert queued.exists() and os.path.exists(spooled) and other.exists()
@@ -0,0 +1,298 @@
+"""
+Tests for the circuit breaker, the AIMD concurrency limit and the endpoint guard combining them
+"""
+
+import asyncio
+
+import pytest
+
+from utils import endpoint_guard
+from utils.endpoint_guard import (
+    CLOSED, DEFAULT_ENDPOINT_GUARD_CONFIG, HALF_OPEN, OPEN, AdaptiveConcurrencyLimit, CircuitBreaker,
+    CircuitOpenError, EndpointGuard
+)
+from utils.retry_policy import PERMANENT, RATE_LIMIT, TRANSIENT, retry_after_seconds
+
+class FakeClock:
+    """Stands in for the time module in endpoint_guard, so cooldowns pass without waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(endpoint_guard, "time", fake_clock)
+    return fake_clock
+
+def make_breaker(**overrides):
+    settings = {"window_size": 10, "min_requests": 4, "failure_rate_threshold": 0.5,
+                "open_seconds": 30.0, "max_open_seconds": 100.0, **overrides}
+    return CircuitBreaker(**settings)
+
+def admit(breaker):
+    """Admit one request, failing the test if the breaker refuses it; returns whether it is the probe."""
+    wait, probe = breaker.seconds_until_allowed()
+    assert wait == 0
+    return probe
+
+def trip(breaker):
+    """Fail enough closed-state requests to open the breaker."""
+    for _ in range(breaker.min_requests):
+        admit(breaker)
+        breaker.record(True)
+    assert breaker.state == OPEN
+
+# Circuit breaker
+
+def test_breaker_needs_min_requests_before_opening(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        admit(breaker)
+        breaker.record(True)
+    assert breaker.state == CLOSED
+    admit(breaker)
+    breaker.record(True)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+
+def test_breaker_stays_closed_below_failure_rate(clock):
+    breaker = make_breaker()
+    for failed in [True, False, False, False, True, False, False]:
+        admit(breaker)
+        breaker.record(failed)
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate() == pytest.approx(2 / 7)
+
+def test_open_breaker_refuses_until_cooldown(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    wait, probe = breaker.seconds_until_allowed()
+    assert wait == pytest.approx(30.0) and not probe
+    clock.advance(20)
+    assert breaker.seconds_until_allowed() == (pytest.approx(10.0), False)
+
+def test_half_open_admits_a_single_probe(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+    assert breaker.seconds_until_allowed() == (0.0, True)
+    assert breaker.state == HALF_OPEN
+    # Everyone else waits for the probe's outcome
+    wait, probe = breaker.seconds_until_allowed()
+    assert wait > 0 and not probe
+
+def test_probe_success_closes_with_fresh_window(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+    breaker.record(False, admit(breaker))
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate() == 0.0
+    assert breaker.seconds_until_allowed() == (0.0, False)
+
+def test_probe_failure_reopens_for_twice_as_long_up_to_the_cap(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    for expected_cooldown in (60.0, 100.0, 100.0):
+        clock.advance(breaker._cooldown)
+        breaker.record(True, admit(breaker))
+        assert breaker.state == OPEN
+        assert breaker.seconds_until_allowed()[0] == pytest.approx(expected_cooldown)
+
+def test_stale_outcomes_do_not_count_as_the_probe(clock):
+    breaker = make_breaker()
+    # Requests admitted while closed, still in flight when the breaker opens
+    stragglers = [admit(breaker) for _ in range(2)]
+    assert stragglers == [False, False]
+    trip(breaker)
+    clock.advance(30)
+    probe = admit(breaker)
+
+    # A straggler succeeding while half-open must not close the breaker...
+    breaker.record(False, stragglers[0])
+    assert breaker.state == HALF_OPEN
+    # ...nor a failing one reopen it, or let a second probe through
+    breaker.record(True, stragglers[1])
+    assert breaker.state == HALF_OPEN
+    assert breaker.seconds_until_allowed()[0] > 0
+
+    # Only the probe's own outcome decides
+    breaker.record(False, probe)
+    assert breaker.state == CLOSED
+
+def test_cancelled_probe_lets_another_request_probe(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+    probe = admit(breaker)
+    # A cancelled non-probe request does not release the probe slot
+    breaker.record_cancelled(False)
+    assert breaker.seconds_until_allowed()[0] > 0
+    breaker.record_cancelled(probe)
+    assert breaker.seconds_until_allowed() == (0.0, True)
+
+def test_outcomes_while_open_are_ignored(clock):
+    breaker = make_breaker()
+    straggler = admit(breaker)
+    trip(breaker)
+    breaker.record(False, straggler)
+    assert breaker.state == OPEN
+
+# Adaptive concurrency limit
+
+def make_limit(initial=4, minimum=1, maximum=16, latency_tolerance=2.0):
+    return AdaptiveConcurrencyLimit(initial, minimum, maximum, latency_tolerance)
+
+def fill(limit, count):
+    for _ in range(count):
+        limit.acquire()
+
+def test_additive_increase_when_limit_is_used(clock):
+    limit = make_limit()
+    fill(limit, 4)
+    limit.release(None, 1.0)
+    assert limit.limit == pytest.approx(4.25)
+    assert limit.peak_limit == pytest.approx(4.25)
+
+def test_no_increase_when_limit_is_mostly_idle(clock):
+    limit = make_limit()
+    fill(limit, 1)
+    limit.release(None, 1.0)
+    assert limit.limit == 4.0
+
+def test_increase_grows_about_one_per_round_and_stops_at_maximum(clock):
+    limit = make_limit(initial=4, maximum=6)
+    for _ in range(40):
+        in_use = int(limit.limit)
+        fill(limit, in_use)
+        for _ in range(in_use):
+            limit.release(None, 1.0)
+    assert limit.limit == 6
+
+def test_rate_limit_halves_once_per_latency_window(clock):
+    limit = make_limit(initial=8)
+    fill(limit, 3)
+    limit.release(None, 2.0)
+    # A burst of 429s from requests sent together is one signal
+    limit.release(RATE_LIMIT, 2.0)
+    limit.release(RATE_LIMIT, 2.0)
+    assert limit.limit == pytest.approx(4.0)
+    clock.advance(2.0)
+    fill(limit, 1)
+    limit.release(TRANSIENT, 2.0)
+    assert limit.limit == pytest.approx(2.0)
+
+def test_decrease_stops_at_minimum(clock):
+    limit = make_limit(initial=2, minimum=1)
+    for _ in range(3):
+        fill(limit, 1)
+        limit.release(RATE_LIMIT, 1.0)
+        clock.advance(10)
+    assert limit.limit == 1
+
+def test_permanent_errors_and_cancellations_leave_the_limit(clock):
+    limit = make_limit()
+    fill(limit, 2)
+    limit.release(PERMANENT, 1.0)
+    limit.release(endpoint_guard._CANCELLED, 1.0)
+    assert limit.limit == 4.0
+    assert limit.in_flight == 0
+
+def test_latency_above_tolerance_cuts_by_a_fifth(clock):
+    limit = make_limit(initial=10)
+    fill(limit, 1)
+    limit.release(None, 1.0)
+    for _ in range(10):
+        fill(limit, 1)
+        limit.release(None, 5.0)
+        clock.advance(10)
+        if limit.limit < 10:
+            break
+    assert limit.limit == pytest.approx(8.0)
+
+def test_acquire_async_waits_for_a_slot(clock):
+    limit = make_limit(initial=1)
+
+    async def scenario():
+        await limit.acquire_async()
+        waiter = asyncio.ensure_future(limit.acquire_async())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limit.release(PERMANENT, 0.1)
+        await asyncio.wait_for(waiter, timeout=1)
+        return limit.in_flight
+
+    assert asyncio.run(scenario()) == 1
+
+# Endpoint guard
+
+def make_guard(**overrides):
+    # Room for a request in flight besides the probe, however far the failures cut the limit
+    config = {**DEFAULT_ENDPOINT_GUARD_CONFIG, "min_requests": 2, "window_size": 4, "open_seconds": 30.0,
+              "min_concurrency": 2, **overrides}
+    return EndpointGuard("test-model", config)
+
+def fail_request(guard, error):
+    with pytest.raises(type(error)):
+        with guard.request():
+            raise error
+
+def test_guard_opens_and_fails_fast_with_retry_after(clock):
+    guard = make_guard()
+    for _ in range(2):
+        fail_request(guard, ConnectionError("reset"))
+    with pytest.raises(CircuitOpenError) as excinfo:
+        with guard.request():
+            pytest.fail("request sent while the circuit is open")
+    assert retry_after_seconds(excinfo.value) == pytest.approx(30.0)
+    # The refused request gave its slot back
+    assert guard.concurrency.in_flight == 0
+    summary = guard.summary()
+    assert summary["circuit"] == OPEN and summary["times_opened"] == 1 and summary["error_rate"] == 1.0
+
+def test_guard_ignores_requests_finishing_during_the_probe(clock):
+    guard = make_guard()
+    straggler = guard.request()
+    straggler.__enter__()
+    for _ in range(2):
+        fail_request(guard, ConnectionError("reset"))
+    clock.advance(30)
+
+    probe = guard.request()
+    probe.__enter__()
+    assert guard.breaker.state == HALF_OPEN
+    # The straggler, sent while the breaker was closed, succeeds first
+    straggler.__exit__(None, None, None)
+    assert guard.breaker.state == HALF_OPEN
+    # The probe fails, so the endpoint has not recovered; the error is not swallowed
+    error = ConnectionError("reset")
+    assert probe.__exit__(ConnectionError, error, None) is False
+    assert guard.breaker.state == OPEN
+    assert guard.concurrency.in_flight == 0
+
+def test_guard_async_probe_closes_the_breaker(clock):
+    guard = make_guard()
+    for _ in range(2):
+        fail_request(guard, ConnectionError("reset"))
+    clock.advance(30)
+
+    async def send():
+        async with guard.request_async():
+            return "ok"
+
+    assert asyncio.run(send()) == "ok"
+    assert guard.breaker.state == CLOSED
+
+def test_permanent_errors_do_not_open_the_breaker(clock):
+    guard = make_guard()
+    for _ in range(4):
+        fail_request(guard, ValueError("bad request"))
+    assert guard.breaker.state == CLOSED
+    assert guard.summary()["error_rate"] == 0.0
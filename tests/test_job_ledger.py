@@ -0,0 +1,99 @@
+"""
+Tests for the job ledger's replay, which every resume path relies on
+"""
+
+import json
+
+from ai_evaluate_resumes_config import resolve_duplicates
+from utils.job_ledger import (
+    DONE, EVALUATING, EXTRACTED, FAILED, QUEUED, SKIPPED, JobLedger, batch_job_id
+)
+
+def test_replay_rebuilds_the_latest_record(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    ledger = JobLedger(path)
+    ledger.record("a.pdf", QUEUED, candidate_name="Jane Doe")
+    ledger.record("a.pdf", EVALUATING)
+    ledger.record("a.pdf", FAILED, error="HTTP 503")
+    ledger.record("a.pdf", EVALUATING)
+    ledger.record("a.pdf", DONE, usage={"prompt_tokens": 10})
+
+    job = JobLedger(path).get("a.pdf")
+    # The last state wins; earlier fields stay unless overwritten, and DONE clears the error
+    assert job["state"] == DONE and JobLedger(path).is_done("a.pdf")
+    assert job["candidate_name"] == "Jane Doe" and job["usage"] == {"prompt_tokens": 10}
+    assert job["attempts"] == 2 and "error" not in job
+    assert "duration_seconds" in job and "queued_at" in job
+
+def test_a_later_failure_undoes_done(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    ledger = JobLedger(path)
+    ledger.record("a.pdf", DONE)
+    ledger.record("a.pdf", FAILED, error="report deleted")
+    replayed = JobLedger(path)
+    assert not replayed.is_done("a.pdf")
+    assert replayed.counts() == {FAILED: 1}
+    assert replayed.get("missing.pdf") is None and not replayed.is_done("missing.pdf")
+
+def test_torn_last_line_is_ignored_and_cut_off(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    ledger = JobLedger(path)
+    ledger.record("a.pdf", QUEUED)
+    ledger.record("b.pdf", QUEUED)
+    # A crash in the middle of writing an event
+    with open(path, 'a') as f:
+        f.write('{"item_id": "a.pdf", "state": "do')
+
+    ledger = JobLedger(path)
+    assert ledger.counts() == {QUEUED: 2}
+    # The next event must not be glued to the fragment, or the following replay loses it
+    ledger.record("b.pdf", DONE)
+    replayed = JobLedger(path)
+    assert replayed.is_done("b.pdf") and not replayed.is_done("a.pdf")
+    assert all(json.loads(line) for line in path.read_text().splitlines())
+
+def test_whole_last_event_without_newline_is_kept(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text(json.dumps({"item_id": "a.pdf", "state": DONE, "time": 1.0}))
+    ledger = JobLedger(path)
+    assert ledger.is_done("a.pdf")
+    ledger.record("b.pdf", QUEUED)
+    assert JobLedger(path).counts() == {DONE: 1, QUEUED: 1}
+
+def test_skipped_and_duplicate_records_are_read_back(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    ledger = JobLedger(path)
+    ledger.record("reject.pdf", QUEUED, candidate_name="No Match")
+    ledger.record("reject.pdf", SKIPPED, prescreen="auto_reject", signal=0.01)
+    ledger.record("rep.pdf", QUEUED, candidate_name="Jane Doe")
+    ledger.record("rep.pdf", EVALUATING, batch_id="batch_1", custom_id="resume-0")
+    ledger.record("copy.pdf", QUEUED, candidate_name="Jane Doe")
+    ledger.record("copy.pdf", EXTRACTED, duplicate_of="rep.pdf", similarity=0.97)
+
+    replayed = JobLedger(path)
+    skipped = replayed.get("reject.pdf")
+    assert (skipped["state"], skipped["prescreen"], skipped["signal"]) == (SKIPPED, "auto_reject", 0.01)
+    assert not replayed.is_done("reject.pdf")
+    copy = replayed.get("copy.pdf")
+    assert (copy["state"], copy["duplicate_of"], copy["similarity"]) == (EXTRACTED, "rep.pdf", 0.97)
+    assert replayed.get("rep.pdf")["batch_id"] == "batch_1"
+
+    # After a restart, the copy follows its representative's outcome
+    replayed.record("rep.pdf", DONE)
+    resolve_duplicates(replayed)
+    assert JobLedger(path).is_done("copy.pdf")
+
+def test_duplicate_of_a_failed_representative_is_retried(tmp_path):
+    ledger = JobLedger(tmp_path / "jobs.jsonl")
+    ledger.record("rep.pdf", FAILED, candidate_name="Jane Doe", error="HTTP 500")
+    ledger.record("copy.pdf", EXTRACTED, duplicate_of="rep.pdf", similarity=0.9)
+    resolve_duplicates(ledger)
+    copy = JobLedger(tmp_path / "jobs.jsonl").get("copy.pdf")
+    assert copy["state"] == FAILED and copy["duplicate_of"] is None
+    assert "Jane Doe" in copy["error"]
+
+def test_batch_job_id_depends_on_items_and_settings():
+    job_id = batch_job_id(["a", "b"], "prompt", "gpt-4-turbo")
+    assert job_id == batch_job_id(["a", "b"], "prompt", "gpt-4-turbo")
+    assert job_id != batch_job_id(["b", "a"], "prompt", "gpt-4-turbo")
+    assert job_id != batch_job_id(["a", "b"], "prompt", "gpt-3.5-turbo")
@@ -0,0 +1,56 @@
+"""
+Tests for the cheap-then-strong model cascade
+"""
+
+import pytest
+
+from utils.model_cascade import (
+    CHEAP_TIER, DEFAULT_CASCADE_CONFIG, STRONG_TIER, escalation_reason, has_distinct_tiers, load_cascade_config, run_cascade
+)
+
+def report(critical_score):
+    """A minimal complete report with the given critical score."""
+    return (
+        "# Jane Doe - ML Engineer\n\n## RECOMMENDATION: Consider\n\n"
+        "| 1 | **AI/ML Experience & Engineering** | Critical | 1 | Models |\n\n"
+        f"- Sum of positive critical flags: **{critical_score}**\n"
+    )
+
+@pytest.mark.parametrize("critical_score, escalated", [(0, False), (1, False), (2, True), (4, True), (5, False), (6, False)])
+def test_default_band_escalates_only_borderline_scores(critical_score, escalated):
+    reason = escalation_reason(report(critical_score), DEFAULT_CASCADE_CONFIG["escalate_critical_scores"])
+    assert (reason is not None) == escalated
+
+def test_unparseable_or_empty_reports_escalate():
+    assert escalation_reason("", [2, 4]) == "the cheap model returned no report"
+    assert escalation_reason("No table here", [2, 4]) == "the cheap report could not be parsed"
+
+def test_shipped_config_uses_a_middle_band():
+    assert load_cascade_config()["escalate_critical_scores"] == [2, 4]
+
+def test_tiers_must_use_different_models():
+    assert has_distinct_tiers(DEFAULT_CASCADE_CONFIG)
+    assert not has_distinct_tiers({**DEFAULT_CASCADE_CONFIG, "strong_model": DEFAULT_CASCADE_CONFIG["cheap_model"]})
+
+def test_run_cascade_keeps_clear_cheap_reports():
+    calls = []
+    def evaluate(model):
+        calls.append(model)
+        return report(6)
+    result = run_cascade(evaluate, DEFAULT_CASCADE_CONFIG)
+    assert calls == ["gpt-3.5-turbo"]
+    assert result["tier"] == CHEAP_TIER and result["reason"] is None
+    assert result["report"].endswith("*Model tier: cheap (gpt-3.5-turbo)*\n")
+
+def test_run_cascade_escalates_borderline_and_failed_cheap_reports():
+    def evaluate(model):
+        return report(3) if model == "gpt-3.5-turbo" else report(5)
+    result = run_cascade(evaluate, DEFAULT_CASCADE_CONFIG)
+    assert (result["tier"], result["model"]) == (STRONG_TIER, "gpt-4-turbo")
+    assert "borderline band 2-4" in result["report"]
+
+    def cheap_fails(model):
+        if model == "gpt-3.5-turbo":
+            raise TimeoutError("slow")
+        return report(5)
+    assert run_cascade(cheap_fails, DEFAULT_CASCADE_CONFIG)["reason"] == "the cheap model failed (slow)"
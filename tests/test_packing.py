@@ -0,0 +1,96 @@
+"""
+Tests for packing short resumes into one request and splitting the reply per candidate
+"""
+
+from ai_evaluate_resumes_config import DEFAULT_MAX_COMPLETION_TOKENS, build_evaluation_request
+from utils.packing import (
+    DEFAULT_MAX_PACK_SIZE, DEFAULT_PACKED_REPORT_TOKENS, max_pack_size_for, split_packed_response
+)
+
+def make_report(name, recommendation="Consider"):
+    """A minimal report with the recommendation and flag table that make it complete."""
+    return f"""# {name} - Engineer
+
+## 🏆 RECOMMENDATION: {recommendation}
+
+| **Flag ID** | **Category** | **Flag** | **Critical?** | **Score** | **Confirmation** |
+| --- | --- | --- | --- | --- | --- |
+| 1 | **AI/ML Experience & Engineering** | Flag | Critical | 2 | Evidence |
+"""
+
+def section(number, body):
+    return f"=== CANDIDATE {number} ===\n{body}\n"
+
+def test_split_returns_each_report_in_pack_order():
+    reply = section(2, make_report("Bob")) + section(1, make_report("Alice"))
+    reports = split_packed_response(reply, 2)
+    assert reports[0].startswith("# Alice")
+    assert reports[1].startswith("# Bob")
+
+def test_split_accepts_decorated_markers():
+    reply = f"**=== CANDIDATE 1 ===**\n{make_report('Alice')}\n## === CANDIDATE 2 ===\n{make_report('Bob')}"
+    assert [report.splitlines()[0] for report in split_packed_response(reply, 2)] == ["# Alice - Engineer", "# Bob - Engineer"]
+
+def test_split_missing_section_is_none():
+    reply = section(1, make_report("Alice")) + section(3, make_report("Carol"))
+    reports = split_packed_response(reply, 3)
+    assert reports[1] is None
+    assert reports[0].startswith("# Alice") and reports[2].startswith("# Carol")
+
+def test_split_repeated_section_keeps_first_complete_one():
+    reply = (
+        section(1, "# Alice - Engineer\n\nThe report was cut short")
+        + section(1, make_report("Alice", "Reject"))
+        + section(1, make_report("Alice", "Strong Candidate"))
+    )
+    (report,) = split_packed_response(reply, 1)
+    assert "RECOMMENDATION: Reject" in report
+
+def test_split_incomplete_section_is_none():
+    # A reply cut off by max_tokens loses the flag table of its last candidate
+    truncated = make_report("Bob").split("| **Flag ID**")[0]
+    reports = split_packed_response(section(1, make_report("Alice")) + section(2, truncated), 2)
+    assert reports[0] is not None
+    assert reports[1] is None
+
+def test_split_ignores_out_of_range_numbers_and_empty_replies():
+    reply = section(0, make_report("Zero")) + section(5, make_report("Five"))
+    assert split_packed_response(reply, 2) == [None, None]
+    assert split_packed_response("", 2) == [None, None]
+    assert split_packed_response(None, 1) == [None]
+
+def test_max_pack_size_fits_the_completion_limit():
+    assert max_pack_size_for(4096) == min(DEFAULT_MAX_PACK_SIZE, 4096 // DEFAULT_PACKED_REPORT_TOKENS)
+    assert max_pack_size_for(2500) == 2
+    # Never below one candidate, never above the configured cap
+    assert max_pack_size_for(500) == 1
+    assert max_pack_size_for(100_000) == DEFAULT_MAX_PACK_SIZE
+
+class FakeConfigLoader:
+    """Just enough of ConfigLoader to build a request."""
+
+    def __init__(self, model_options):
+        self.config = {"model": "gpt-4-turbo"}
+        self.model_options = model_options
+
+    def get_system_prompt(self):
+        return "You evaluate resumes."
+
+    def get_user_prompt_template(self):
+        return "Evaluate this resume: {resume_text}"
+
+    def get_model_config(self, model_name=None):
+        return self.model_options.get(model_name or self.config["model"], {})
+
+def test_request_max_tokens_stays_within_completion_limit():
+    loader = FakeConfigLoader({"gpt-4-turbo": {"max_tokens": 4000, "max_completion_tokens": 4096}})
+    assert build_evaluation_request("resume", loader)["max_tokens"] == 4000
+
+    pack_size = max_pack_size_for(4096)
+    packed = build_evaluation_request("resumes", loader, pack_size=pack_size)
+    assert packed["max_tokens"] == DEFAULT_PACKED_REPORT_TOKENS * pack_size <= 4096
+
+    # Even an oversized pack or per-report setting is capped at the model's limit
+    assert build_evaluation_request("resumes", loader, pack_size=10)["max_tokens"] == 4096
+    loader = FakeConfigLoader({"gpt-4-turbo": {"max_tokens": 8000}})
+    assert build_evaluation_request("resume", loader)["max_tokens"] == DEFAULT_MAX_COMPLETION_TOKENS
@@ -0,0 +1,62 @@
+"""
+Tests for the local pre-screen: the terms it derives from the rubric and the labels it gives
+"""
+
+import pytest
+
+from utils.prescreen import (
+    AUTO_REJECT, EVALUATE, PRIORITY, build_prescreener, load_prescreen_config, rubric_flag_terms
+)
+
+RUBRIC_PATH = "configure/must_configure/resume_prompt.txt"
+CONFIG_PATH = "configure/nice_to_configure/prescreen.json"
+
+# Filler without any keyword, so each text is long enough to be judged
+FILLER = " Planned work, reported progress to stakeholders and took part in quarterly budget reviews." * 5
+
+def read_rubric():
+    with open(RUBRIC_PATH, 'r') as f:
+        return f.read()
+
+@pytest.fixture(scope="module")
+def screener():
+    return build_prescreener(read_rubric(), load_prescreen_config(CONFIG_PATH))
+
+def test_university_terms_follow_the_rubric():
+    terms = rubric_flag_terms(read_rubric())["stem_degree"]
+    for name in ("RWTH Aachen University", "Delft University of Technology", "Caltech", "Georgia Tech", "TUM", "Oxford"):
+        assert name in terms
+    assert not any("ETH" in term for term in terms)
+
+def test_flag_headings_give_their_acronyms():
+    terms = rubric_flag_terms(read_rubric())
+    assert {"LLM", "NLP"} <= terms["llm_nlp_specialization"]
+    assert "RAG" in terms["rag_implementation"]
+    assert "red_flags" not in terms
+
+def test_curated_synonyms_do_not_repeat_the_rubric():
+    config = load_prescreen_config(CONFIG_PATH)
+    derived = rubric_flag_terms(read_rubric())
+    for flag, synonyms in config["flag_keywords"].items():
+        assert not set(synonyms) & derived.get(flag, set()), flag
+
+@pytest.mark.parametrize("text, label", [
+    ("Chartered accountant with eight years in audit and tax. Prepared statutory accounts, managed payroll "
+     "and VAT returns, and led the month-end close.", AUTO_REJECT),
+    ("Data analyst building SQL reports and Tableau dashboards for the sales team. Built a churn prediction "
+     "model using machine learning in Python.", EVALUATE),
+    ("Machine learning engineer training deep learning models in PyTorch and TensorFlow, and owning the "
+     "MLOps pipelines. MSc Computer Science, Stanford University.", EVALUATE),
+    ("Senior NLP Engineer at an early-stage startup. Shipped a retrieval-augmented generation (RAG) assistant "
+     "on GPT-4 with LangChain, embeddings and a Pinecone vector database, and fine-tuned large language "
+     "models (LLMs) with Hugging Face transformers. PhD, University of Cambridge.", PRIORITY),
+])
+def test_representative_resumes_get_their_labels(screener, text, label):
+    assert screener.screen(text + FILLER)["label"] == label
+
+def test_a_single_mention_is_not_diluted_by_the_synonym_list(screener):
+    decision = screener.screen("Built a churn prediction model using machine learning." + FILLER)
+    assert decision["signal"] >= 2 * screener.auto_reject_below
+
+def test_short_text_is_always_evaluated(screener):
+    assert screener.screen("Accountant.")["label"] == EVALUATE
@@ -0,0 +1,64 @@
+"""
+Tests for the token-bucket rate limiter and how failed attempts are charged to it
+"""
+
+import asyncio
+
+import pytest
+
+from utils.rate_limiter import RateLimiter, TokenBucket
+from utils.resume_processor import _send_with_retries, _send_with_retries_async
+from utils.retry_policy import RetryPolicy
+
+# Large enough that the refill during a test is a rounding error next to the amounts checked
+TOKENS_PER_MINUTE = 60_000
+ESTIMATE = 15_000
+
+def test_bucket_waits_for_refill():
+    bucket = TokenBucket(capacity=10, refill_per_second=5)
+    bucket.consume(10)
+    assert bucket.time_until_available(5) == pytest.approx(1.0, abs=0.05)
+
+def test_reconcile_charges_the_difference():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=TOKENS_PER_MINUTE)
+    limiter.acquire(ESTIMATE)
+    limiter.reconcile(ESTIMATE, ESTIMATE + 5_000)
+    assert limiter.token_bucket.available == pytest.approx(TOKENS_PER_MINUTE - ESTIMATE - 5_000, abs=50)
+
+def flaky(failures, result="report"):
+    """A request function failing with a transient error `failures` times before succeeding."""
+    calls = []
+    def create(**request):
+        calls.append(request)
+        if len(calls) <= failures:
+            raise ConnectionError("connection reset")
+        return result
+    return create, calls
+
+def test_failed_attempts_give_back_their_estimate():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=TOKENS_PER_MINUTE)
+    create, calls = flaky(failures=2)
+    result = _send_with_retries(RetryPolicy(max_attempts=3, base_delay=0), limiter, ESTIMATE, create,
+                                model="test-refund-sync")
+    assert result == "report" and len(calls) == 3
+    # Only the successful attempt is still charged, until its usage is reconciled
+    assert limiter.token_bucket.available == pytest.approx(TOKENS_PER_MINUTE - ESTIMATE, abs=50)
+
+def test_failed_attempts_give_back_their_estimate_async():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=TOKENS_PER_MINUTE)
+    sync_create, calls = flaky(failures=2)
+    async def create(**request):
+        return sync_create(**request)
+    result = asyncio.run(_send_with_retries_async(RetryPolicy(max_attempts=3, base_delay=0), limiter, ESTIMATE,
+                                                  create, model="test-refund-async"))
+    assert result == "report" and len(calls) == 3
+    assert limiter.token_bucket.available == pytest.approx(TOKENS_PER_MINUTE - ESTIMATE, abs=50)
+
+def test_last_failure_is_refunded_and_raised():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=TOKENS_PER_MINUTE)
+    create, calls = flaky(failures=5)
+    with pytest.raises(ConnectionError):
+        _send_with_retries(RetryPolicy(max_attempts=2, base_delay=0), limiter, ESTIMATE, create,
+                           model="test-refund-exhausted")
+    assert len(calls) == 2
+    assert limiter.token_bucket.available == pytest.approx(TOKENS_PER_MINUTE, abs=50)
@@ -0,0 +1,117 @@
+"""
+Tests for the shared evaluation report parser
+"""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from benchmark_report_parser import legacy_extract, synthesize_report
+from utils.report_parser import is_complete_report, parse_report
+from utils.structured_output import MAX_TOTAL_SCORE, format_template
+
+PROMPT_REPORT = """# Jane Doe - Senior ML Engineer at Acme
+
+## 🏆 RECOMMENDATION: **Strong Candidate**
+
+LinkedIn: https://www.linkedin.com/in/jane-doe
+
+| **Flag ID** | **Category** | **Flag** | **Critical?** | **Score** | **Confirmation** |
+| --- | --- | --- | --- | --- | --- |
+| 1 | **AI/ML Experience & Engineering** | 2+ years | Critical | 2 | Led ranking models |
+| 2 | **LLM/NLP Specialization & Engineering** | 1+ years | Critical | 2/2 | Shipped an LLM assistant |
+| 3 | **Production-Grade RAG Implementation** | RAG | Critical | 1 | Internal search |
+| 4 | **Startup Mentality & Hands-on Ownership** | Startup |  | 0 | None |
+| 5 | **STEM** | Degree |  | 2 | MIT |
+| 6 | **Red Flags** | Issues | Critical | -1 | Job-hopping |
+
+### Summary Scores
+
+- **Total Score:**
+  - Sum of all positive flags: 2 + 2 + 1 + 0 + 2 = **7**
+  - Sum of all negative flags: **-1**
+- **Critical Flag Score:**
+  - Sum of positive critical flags: 2 + 2 + 1 = **5**
+- **Green Flag Percentage:** 70% (7/10 possible points)
+
+- 💪 Ships models to production
+- 💪 N/A
+- ⚠️ Little startup experience
+- 🔍 Short tenures
+"""
+
+def test_prompt_format():
+    report = parse_report(PROMPT_REPORT)
+    assert (report.name, report.current_role) == ("Jane Doe", "Senior ML Engineer at Acme")
+    assert report.recommendation == "Strong Candidate"
+    assert report.linkedin_url == "https://www.linkedin.com/in/jane-doe"
+    assert (report.total_score, report.critical_score, report.red_flag_score) == (7, 5, -1)
+    assert report.green_flag_percentage == 70
+    assert [flag.score for flag in report.flags] == [2, 2, 1, 0, 2, -1]
+    assert report.flags[0].category == "AI/ML Experience & Engineering"
+    assert report.flags[0].critical and not report.flags[3].critical
+    assert report.flags[4].evidence == "MIT" and report.flags[4].description == "Degree"
+    assert report.flag_score(6) == -1 and report.flag_score(9, default=None) is None
+    # Unfilled template slots are skipped
+    assert report.strengths == ["Ships models to production"]
+    assert is_complete_report(report)
+
+def test_warning_emoji_concerns_are_kept():
+    # ⚠️ is two code points, which the old [⚠️🔍] character class never matched
+    assert parse_report(PROMPT_REPORT).concerns == ["Little startup experience", "Short tenures"]
+    assert legacy_extract(PROMPT_REPORT)["improvements"] == ["Short tenures"]
+
+def test_bold_percentage_line_is_read():
+    assert legacy_extract(PROMPT_REPORT)["percentage"] == 0
+    assert parse_report(PROMPT_REPORT).green_flag_percentage == 70
+
+def test_totals_fall_back_to_the_flag_table():
+    content = "\n".join(line for line in PROMPT_REPORT.splitlines() if "Sum of" not in line and "Percentage" not in line)
+    report = parse_report(content)
+    assert report.total_score == 7
+    assert report.critical_score == 5
+    assert report.red_flag_score == -1
+    assert report.green_flag_percentage == pytest.approx(7 / MAX_TOTAL_SCORE * 100)
+
+def test_repeated_flag_rows_keep_the_first():
+    first_row = "| 1 | **AI/ML Experience & Engineering** | 2+ years | Critical | 2 | Led ranking models |"
+    content = PROMPT_REPORT.replace(first_row, first_row + "\n| 1 | **AI/ML Experience & Engineering** | 2+ years | Critical | 0 | None |")
+    report = parse_report(content)
+    assert [flag.flag_id for flag in report.flags] == [1, 2, 3, 4, 5, 6]
+    assert report.flag_score(1) == 2
+
+def test_rendered_template_format():
+    templates = json.loads((Path(__file__).resolve().parent.parent / "configure/nice_to_configure/output_templates.json").read_text())
+    flag_keys = ["ai_ml_experience", "llm_nlp_specialization", "rag_implementation", "startup_mentality", "stem_degree", "red_flags"]
+    scores = [2, 1, 0, 1, 1, 0]
+    evaluation = {
+        "candidate_name": "John Roe", "current_role": "Data Scientist", "recommendation": "Consider",
+        "total_score": 5, "critical_score": 3, "summary": "", "overall_impression": {"explanation": ""},
+        "flag_scores": {key: {"score": score, "explanation": f"Evidence for {key}"} for key, score in zip(flag_keys, scores)},
+        "strengths": ["Strong NLP", "Clear writing"], "areas_for_improvement": ["No RAG"],
+    }
+    report = parse_report(format_template(templates["markdown_template"], evaluation))
+    assert (report.name, report.current_role, report.recommendation) == ("John Roe", "Data Scientist", "Consider")
+    assert (report.total_score, report.critical_score) == (5, 3)
+    # "2/2" scores count as their first number
+    assert [flag.score for flag in report.flags] == scores
+    assert report.flags[0].evidence == "Evidence for ai_ml_experience"
+    assert report.strengths == ["Strong NLP", "Clear writing"]
+    assert report.concerns == ["No RAG"]
+
+def test_missing_fields_default():
+    report = parse_report("Nothing useful here")
+    assert (report.name, report.recommendation, report.total_score) == ("Unknown", "Unknown", 0)
+    assert not is_complete_report(report)
+
+def test_matches_the_old_extraction_on_synthesized_reports():
+    rng = random.Random(0)
+    for index in range(50):
+        content = synthesize_report(index, rng)
+        old, new = legacy_extract(content), parse_report(content)
+        assert (new.name, new.current_role, new.recommendation) == (old["name"], old["role"], old["recommendation"])
+        assert (new.total_score, new.critical_score) == (old["total_score"], old["critical_score"])
+        assert {f"Flag_{flag.flag_id}": flag.score for flag in new.flags} == old["flag_scores"]
+        assert new.strengths == old["strengths"]
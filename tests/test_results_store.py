@@ -0,0 +1,63 @@
+"""
+Tests for the SQLite results store
+"""
+
+from utils.results_store import ResultsStore, record_from_markdown
+
+FIRST_FLAG_ROW = "| 1 | **AI/ML Experience & Engineering** | 2+ years | Critical | 2 | Led ranking models |"
+
+PROMPT_REPORT = f"""# Jane Doe - Senior ML Engineer at Acme
+
+## 🏆 RECOMMENDATION: **Strong Candidate**
+
+| **Flag ID** | **Category** | **Flag** | **Critical?** | **Score** | **Confirmation** |
+| --- | --- | --- | --- | --- | --- |
+{FIRST_FLAG_ROW}
+| 2 | **LLM/NLP Specialization & Engineering** | 1+ years | Critical | 2 | Shipped an LLM assistant |
+| 3 | **Production-Grade RAG Implementation** | RAG | Critical | 1 | Internal search |
+| 4 | **Startup Mentality & Hands-on Ownership** | Startup |  | 0 | None |
+| 5 | **STEM** | Degree |  | 2 | MIT |
+| 6 | **Red Flags** | Issues | Critical | -1 | Job-hopping |
+
+- Sum of all positive flags: 2 + 2 + 1 + 0 + 2 = **7**
+
+- 💪 Ships models to production
+- ⚠️ Little startup experience
+- 🔍 Short tenures
+"""
+
+def test_save_and_read_back(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    store.save_evaluation("project", record_from_markdown(PROMPT_REPORT), report_path="jane_evaluation.md", model="gpt-4-turbo")
+    [record] = store.get_records("project")
+    assert (record["name"], record["recommendation"], record["total_score"]) == ("Jane Doe", "Strong Candidate", 7)
+    assert [flag["score"] for flag in record["flags"]] == [2, 2, 1, 0, 2, -1]
+    assert record["concerns"] == ["Little startup experience", "Short tenures"]
+    assert list(store.iter_records("project", batch_size=1)) == [record]
+    assert store.get_records("other") == []
+
+def test_report_with_a_repeated_flag_row_is_saved(tmp_path):
+    content = PROMPT_REPORT.replace(FIRST_FLAG_ROW, FIRST_FLAG_ROW + "\n" + FIRST_FLAG_ROW.replace("| 2 |", "| 0 |"))
+    store = ResultsStore(tmp_path / "results.db")
+    store.save_evaluation("project", record_from_markdown(content))
+    [record] = store.get_records("project")
+    assert [flag["flag_id"] for flag in record["flags"]] == [1, 2, 3, 4, 5, 6]
+    assert record["flags"][0]["score"] == 2
+
+def test_saving_a_candidate_again_replaces_their_evaluation(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    record = record_from_markdown(PROMPT_REPORT)
+    store.save_evaluation("project", record)
+    store.save_evaluation("project", {**record, "total_score": 9.0})
+    # Same name under another key is a different candidate
+    store.save_evaluation("project", record, candidate_key="upload-hash")
+    assert sorted(r["total_score"] for r in store.get_records("project")) == [7, 9]
+
+def test_project_includes_its_sub_projects(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    record = record_from_markdown(PROMPT_REPORT)
+    for project in ("streamlit/job-1", "streamlit/job-2", "streamlit", "streamlit-old", "Streamlit/job-3"):
+        store.save_evaluation(project, record)
+    assert sorted(r["project"] for r in store.get_records("streamlit")) == ["streamlit", "streamlit/job-1", "streamlit/job-2"]
+    assert [r["project"] for r in store.iter_records("streamlit/job-1")] == ["streamlit/job-1"]
+    assert len(store.get_records()) == 5
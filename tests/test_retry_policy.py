@@ -0,0 +1,119 @@
+"""
+Tests for error classification, Retry-After handling and the retry policy's backoff and budget
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from utils.retry_policy import (
+    MAX_RETRY_AFTER, MIN_RETRY_BUDGET, PERMANENT, RATE_LIMIT, TIMEOUT, TRANSIENT, RetryBudget, RetryPolicy,
+    classify_error, retry_after_seconds
+)
+
+REQUEST = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+
+def api_error(status_code, headers=None, code=None):
+    """An openai.APIStatusError as the client raises it for a response."""
+    response = httpx.Response(status_code, headers=headers or {}, request=REQUEST)
+    # The client passes the "error" object of the response body
+    body = {"code": code} if code else None
+    return openai.APIStatusError("error", response=response, body=body)
+
+@pytest.mark.parametrize("error, expected", [
+    (api_error(429), RATE_LIMIT),
+    (api_error(429, code="insufficient_quota"), PERMANENT),
+    (api_error(500), TRANSIENT),
+    (api_error(503), TRANSIENT),
+    (api_error(408), TRANSIENT),
+    (api_error(400), PERMANENT),
+    (api_error(401), PERMANENT),
+    (openai.APITimeoutError(request=REQUEST), TIMEOUT),
+    (openai.APIConnectionError(request=REQUEST), TRANSIENT),
+    (ConnectionError("reset"), TRANSIENT),
+    (TimeoutError(), TIMEOUT),
+    (ValueError("bad"), PERMANENT),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+def test_wrapped_errors_are_classified_by_their_cause():
+    try:
+        try:
+            raise api_error(429)
+        except openai.APIStatusError as e:
+            raise RuntimeError("evaluation failed") from e
+    except RuntimeError as wrapped:
+        assert classify_error(wrapped) == RATE_LIMIT
+
+def test_retry_after_headers():
+    assert retry_after_seconds(api_error(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(api_error(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(api_error(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(api_error(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(api_error(429)) is None
+
+def test_retry_after_attribute_takes_precedence():
+    error = ConnectionError("circuit open")
+    error.retry_after = 12.0
+    assert retry_after_seconds(error) == 12.0
+
+def test_backoff_is_capped_full_jitter():
+    policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=4.0)
+    for retry_number in range(6):
+        for _ in range(50):
+            delay = policy.retry_delay(ConnectionError("reset"), retry_number)
+            assert 0 <= delay <= min(4.0, 2 ** retry_number)
+
+def test_retry_delay_honours_retry_after_and_gives_up_when_too_long():
+    policy = RetryPolicy()
+    assert policy.retry_delay(api_error(429, {"retry-after": "3"}), 0) == 3.0
+    assert policy.retry_delay(api_error(429, {"retry-after": str(MAX_RETRY_AFTER + 1)}), 0) is None
+
+def test_no_retry_for_permanent_errors_or_after_the_last_attempt():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.retry_delay(api_error(400), 0) is None
+    assert policy.retry_delay(ConnectionError("reset"), 1) is not None
+    assert policy.retry_delay(ConnectionError("reset"), 2) is None
+
+def test_budget_is_shared_and_stops_retries():
+    budget = RetryBudget(2)
+    policy = RetryPolicy(max_attempts=10, base_delay=0, budget=budget)
+    calls = []
+    def always_fails():
+        calls.append(1)
+        raise ConnectionError("reset")
+    with pytest.raises(ConnectionError):
+        policy.call(always_fails)
+    # The first attempt plus the two retries the budget allowed
+    assert len(calls) == 3
+    assert budget.spent == 2 and budget.remaining == 0
+    assert not budget.try_spend()
+
+def test_budget_for_batch():
+    assert RetryBudget.for_batch(1).remaining == MIN_RETRY_BUDGET
+    assert RetryBudget.for_batch(101).remaining == 51
+
+def test_call_retries_until_success_and_reports_each_retry():
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise api_error(503)
+        return "ok"
+    retries = []
+    result = RetryPolicy(base_delay=0).call(flaky, on_retry=lambda error, delay, number: retries.append(number))
+    assert result == "ok"
+    assert retries == [0, 1]
+
+def test_call_async_retries_until_success():
+    attempts = []
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise ConnectionError("reset")
+        return "ok"
+    assert asyncio.run(RetryPolicy(base_delay=0).call_async(flaky)) == "ok"
+    assert len(attempts) == 2
@@ -0,0 +1,95 @@
+"""
+Tests for the structured evaluation schema validator and the output template renderer
+"""
+
+import copy
+import json
+
+import pytest
+
+from utils.structured_output import FLAG_KEYS, format_template, parse_structured_evaluation, validate_evaluation
+
+def make_evaluation(**overrides):
+    """A valid structured evaluation reply."""
+    evaluation = {
+        "candidate_name": "Jane Doe",
+        "current_role": "ML Engineer",
+        "recommendation": "Consider",
+        "flag_scores": {key: {"score": 1, "explanation": f"Evidence for {key}"} for key in FLAG_KEYS},
+        "strengths": ["Ships models"],
+        "areas_for_improvement": ["No RAG"],
+        "overall_impression": {"explanation": "Solid"},
+        "summary": "A solid engineer"
+    }
+    evaluation["flag_scores"]["red_flags"]["score"] = -1
+    evaluation.update(overrides)
+    return evaluation
+
+def validation_error(evaluation):
+    with pytest.raises(Exception) as excinfo:
+        validate_evaluation(evaluation)
+    return str(excinfo.value)
+
+def test_valid_reply_gets_computed_scores():
+    evaluation = parse_structured_evaluation(json.dumps(make_evaluation()))
+    assert (evaluation["total_score"], evaluation["critical_score"], evaluation["red_flag_score"]) == (5, 3, -1)
+    assert evaluation["green_flag_percentage"] == 50
+
+def test_invalid_json_is_rejected():
+    with pytest.raises(Exception, match="not valid JSON"):
+        parse_structured_evaluation("Here is the evaluation: {")
+
+def test_missing_and_extra_keys_are_reported():
+    evaluation = make_evaluation(total_score=9)
+    del evaluation["summary"]
+    del evaluation["flag_scores"]["rag_implementation"]
+    evaluation["flag_scores"]["ai_ml_experience"]["confidence"] = "high"
+    message = validation_error(evaluation)
+    assert "evaluation.summary: missing" in message
+    assert "evaluation.flag_scores.rag_implementation: missing" in message
+    assert "evaluation.total_score: unexpected field" in message
+    assert "evaluation.flag_scores.ai_ml_experience.confidence: unexpected field" in message
+
+@pytest.mark.parametrize("key, score", [("ai_ml_experience", 3), ("stem_degree", -1), ("red_flags", 1)])
+def test_out_of_range_scores_are_rejected(key, score):
+    evaluation = make_evaluation()
+    evaluation["flag_scores"][key]["score"] = score
+    assert f"flag_scores.{key}" in validation_error(evaluation)
+
+def test_wrong_types_are_rejected():
+    evaluation = make_evaluation(strengths="Ships models", recommendation="Maybe")
+    evaluation["flag_scores"]["startup_mentality"]["score"] = True
+    evaluation["flag_scores"]["rag_implementation"]["score"] = 1.0
+    evaluation["areas_for_improvement"] = ["No RAG", 7]
+    message = validation_error(evaluation)
+    assert "evaluation.strengths: expected array, got str" in message
+    assert "'Maybe' is not one of" in message
+    # bool and float are not JSON integers
+    assert "startup_mentality.score: expected integer, got bool" in message
+    assert "rag_implementation.score: expected integer, got float" in message
+    assert "evaluation.areas_for_improvement[1]: expected string, got int" in message
+
+def test_list_lines_repeat_per_item():
+    template = "# {candidate_name}\n- 💪 {strengths[]} ({recommendation})\n- ⚠️ {areas_for_improvement[]}\nEnd"
+    evaluation = make_evaluation(strengths=["One", "Two", "Three"], areas_for_improvement=[])
+    assert format_template(template, evaluation) == (
+        "# Jane Doe\n- 💪 One (Consider)\n- 💪 Two (Consider)\n- 💪 Three (Consider)\n- ⚠️ N/A\nEnd"
+    )
+
+def test_nested_and_missing_fields():
+    template = "{flag_scores[red_flags][score]} {strengths[0]} {strengths[5]} {flag_scores[unknown][score]} {missing}"
+    assert format_template(template, make_evaluation()) == "-1 Ships models N/A N/A N/A"
+
+def test_model_text_is_not_expanded_again():
+    evaluation = make_evaluation(
+        candidate_name="{summary}",
+        strengths=["Knows {current_role} and {flag_scores[red_flags][score]}"],
+        summary="Uses {strengths[]} literally"
+    )
+    evaluation["flag_scores"]["ai_ml_experience"]["explanation"] = "Wrote {candidate_name}"
+    template = "# {candidate_name}\n{summary}\n- {strengths[]}\n{flag_scores[ai_ml_experience][explanation]}"
+    original = copy.deepcopy(evaluation)
+    assert format_template(template, evaluation) == (
+        "# {summary}\nUses {strengths[]} literally\n- Knows {current_role} and {flag_scores[red_flags][score]}\nWrote {candidate_name}"
+    )
+    assert evaluation == original
@@ -0,0 +1,48 @@
+"""
+Tests for the streaming top-K and summary aggregation used by the summary scripts
+"""
+
+import random
+
+from utils.summary_aggregator import SummaryAggregator, TopK
+
+def test_top_k_matches_stable_sort_with_ties():
+    rng = random.Random(0)
+    items = [{"id": index, "score": rng.randint(0, 5)} for index in range(500)]
+    top = TopK(10, key=lambda item: item["score"])
+    for item in items:
+        top.add(item)
+    assert top.items() == sorted(items, key=lambda item: item["score"], reverse=True)[:10]
+
+def test_top_k_with_fewer_items_than_k():
+    top = TopK(5, key=lambda item: item)
+    for item in [3, 1, 2]:
+        top.add(item)
+    assert top.items() == [3, 2, 1]
+
+def candidate(name, total, critical, recommendation, strengths=(), improvements=()):
+    return {"name": name, "total_score": total, "critical_score": critical, "recommendation": recommendation,
+            "strengths": list(strengths), "improvements": list(improvements)}
+
+def test_aggregator_running_figures():
+    aggregator = SummaryAggregator(2, key=lambda item: (item["total_score"], item["critical_score"]))
+    for item in [
+        candidate("A", 8, 5, "Strong Candidate", ["NLP", "RAG"], ["Tenure"]),
+        candidate("B", 4, 2, "Consider", ["NLP"]),
+        candidate("C", 8, 6, "Strong Candidate", ["RAG"], ["Tenure"]),
+        candidate("D", 0, 0, "Reject", [], ["No AI"]),
+    ]:
+        aggregator.add(item)
+
+    assert aggregator.count == 4
+    assert aggregator.recommendation_counts == {"Strong Candidate": 2, "Consider": 1, "Reject": 1}
+    assert aggregator.average("total_score") == 5
+    assert aggregator.average("critical_score") == 3.25
+    assert [item["name"] for item in aggregator.top.items()] == ["C", "A"]
+    assert aggregator.most_common_strengths(1) == [("NLP", 2)]
+    assert aggregator.most_common_improvements(5) == [("Tenure", 2), ("No AI", 1)]
+
+def test_empty_aggregator():
+    aggregator = SummaryAggregator(5, key=lambda item: item["total_score"])
+    assert aggregator.average("total_score") == 0
+    assert aggregator.top.items() == []
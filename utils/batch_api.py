@@ -0,0 +1,82 @@
+"""
+Helpers for running evaluations through the OpenAI Batch API
+"""
+
+import json
+import time
+from pathlib import Path
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Batch states after which polling stops
+TERMINAL_BATCH_STATES = ("completed", "failed", "expired", "cancelled")
+
+def write_batch_input(requests, jsonl_path):
+    """Write `(custom_id, request_body)` pairs as a Batch API input file."""
+    jsonl_path = Path(jsonl_path)
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(jsonl_path, 'w') as f:
+        for custom_id, request_body in requests:
+            f.write(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": request_body
+            }) + "\n")
+    return jsonl_path
+
+def submit_batch(client, jsonl_path, metadata=None):
+    """Upload a batch input file and create the batch job."""
+    with open(jsonl_path, 'rb') as f:
+        input_file = client.files.create(file=f, purpose="batch")
+
+    return client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+        metadata=metadata
+    )
+
+def wait_for_batch(client, batch_id, poll_interval=30, on_poll=None):
+    """Poll a batch until it reaches a terminal state and return it."""
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if on_poll:
+            on_poll(batch)
+        if batch.status in TERMINAL_BATCH_STATES:
+            return batch
+        time.sleep(poll_interval)
+
+def _read_file_lines(client, file_id):
+    """Download a batch output or error file and parse its JSON lines."""
+    if not file_id:
+        return []
+    content = client.files.content(file_id).text
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+def download_batch_results(client, batch):
+    """
+    Collect the results of a finished batch as `{custom_id: {"content": ...} or {"error": ...}}`.
+
+    Requests that never produced an output line (e.g. when the batch expired) are absent,
+    so the caller can queue them again.
+    """
+    results = {}
+
+    for line in _read_file_lines(client, batch.output_file_id):
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") == 200 and body.get("choices"):
+            results[line["custom_id"]] = {
+                "content": body["choices"][0]["message"]["content"],
+                "usage": body.get("usage")
+            }
+        else:
+            error = line.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+            results[line["custom_id"]] = {"error": str(error)}
+
+    for line in _read_file_lines(client, getattr(batch, "error_file_id", None)):
+        results.setdefault(line["custom_id"], {"error": str(line.get("error") or line.get("response"))})
+
+    return results
@@ -0,0 +1,72 @@
+"""
+Typed, columnar (Parquet or Feather) export of evaluation results for analytics
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from utils.structured_output import FLAG_KEYS
+
+# File suffixes of the supported formats
+EXPORT_FORMATS = {".parquet": "parquet", ".feather": "feather"}
+
+# One score column per rubric flag, in report order (flag 1 is ai_ml_experience_score)
+FLAG_SCORE_COLUMNS = [f"{key}_score" for key in FLAG_KEYS]
+
+# Column types; low-cardinality text is stored as categories (dictionary-encoded in the file)
+EXPORT_COLUMNS = {
+    "candidate": "string",
+    "current_role": "string",
+    "project": "category",
+    "recommendation": "category",
+    "total_score": "float64",
+    "critical_score": "float64",
+    "red_flag_score": "float64",
+    "green_flag_percentage": "float64",
+    # Nullable, for reports whose flag table is missing a row
+    **{column: "Int8" for column in FLAG_SCORE_COLUMNS},
+    "model": "category",
+    "evaluated_at": "datetime64[ns, UTC]",
+    "report_path": "string"
+}
+
+def records_to_dataframe(records):
+    """Build a typed DataFrame with one row per result record, as returned by ResultsStore.get_records."""
+    rows = []
+    for record in records:
+        flag_scores = {flag["flag_id"]: flag["score"] for flag in record["flags"]}
+        rows.append({
+            "candidate": record["name"],
+            "current_role": record["current_role"],
+            "project": record["project"],
+            "recommendation": record["recommendation"],
+            "total_score": record["total_score"],
+            "critical_score": record["critical_score"],
+            "red_flag_score": record["red_flag_score"],
+            "green_flag_percentage": record["green_flag_percentage"],
+            **{column: flag_scores.get(flag_id) for flag_id, column in enumerate(FLAG_SCORE_COLUMNS, 1)},
+            "model": record.get("model"),
+            "evaluated_at": record["created_at"],
+            "report_path": record.get("report_path")
+        })
+
+    frame = pd.DataFrame(rows, columns=list(EXPORT_COLUMNS))
+    # created_at is seconds since the epoch
+    frame["evaluated_at"] = pd.to_datetime(frame["evaluated_at"], unit="s", utc=True)
+    return frame.astype(EXPORT_COLUMNS)
+
+def export_records(records, output_path):
+    """Write result records to a Parquet or Feather file, chosen by the file suffix. Returns the row count."""
+    output_path = Path(output_path)
+    file_format = EXPORT_FORMATS.get(output_path.suffix.lower())
+    if not file_format:
+        raise Exception(f"Unsupported export format '{output_path.suffix}', use one of: {', '.join(EXPORT_FORMATS)}")
+
+    frame = records_to_dataframe(records)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if file_format == "parquet":
+        frame.to_parquet(output_path, index=False)
+    else:
+        frame.to_feather(output_path)
+    return len(frame)
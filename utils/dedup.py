@@ -0,0 +1,107 @@
+"""
+Near-duplicate resume detection with MinHash signatures and locality-sensitive hashing
+"""
+
+import csv
+import json
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# Resumes whose extracted text is at least this similar (estimated Jaccard similarity of
+# their word shingles) are treated as the same candidate
+DEFAULT_DEDUP_THRESHOLD = 0.8
+# "dedup_threshold" in this file overrides the default
+DEDUP_CONFIG_PATH = "configure/must_configure/config.json"
+
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs above ~0.7 similarity almost always share a band
+LSH_BANDS = 16
+SHINGLE_WORDS = 5
+# Shorter texts (e.g. scanned PDFs with no text layer) are never clustered
+MIN_DEDUP_WORDS = 50
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed, so signatures are comparable across runs
+_rng = np.random.RandomState(1)
+_PERMUTATION_A = _rng.randint(1, _MAX_HASH, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERMUTATION_B = _rng.randint(0, _MAX_HASH, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+def minhash_signature(text):
+    """Get the MinHash signature of a resume's word shingles, or None if the text is too short to compare."""
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    if len(words) < MIN_DEDUP_WORDS:
+        return None
+
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    # One universal hash per permutation: (a * h + b) mod p, truncated to 32 bits
+    permuted = (np.outer(hashes, _PERMUTATION_A) + _PERMUTATION_B) % np.uint64(_MERSENNE_PRIME) & np.uint64(_MAX_HASH)
+    return permuted.min(axis=0)
+
+def load_dedup_threshold(config_path=DEDUP_CONFIG_PATH):
+    """Load the configured similarity threshold from config.json, falling back to the default."""
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f).get("dedup_threshold", DEFAULT_DEDUP_THRESHOLD)
+    except Exception:
+        return DEFAULT_DEDUP_THRESHOLD
+
+class NearDuplicateIndex:
+    """
+    Cluster resumes by the first representative they nearly duplicate.
+
+    Each representative's signature is split into LSH bands; a new resume is only compared
+    with the representatives that share at least one band with it, so checking a resume
+    costs about the same however many have been indexed. Comparing against representatives
+    only (never other duplicates) keeps every member of a cluster close to the resume that
+    was actually evaluated.
+    """
+
+    def __init__(self, threshold=DEFAULT_DEDUP_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self.signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def find(self, signature):
+        """Get `(representative_id, similarity)` for the most similar representative above the threshold, or None."""
+        if signature is None:
+            return None
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+
+        best = None
+        for item_id in candidates:
+            similarity = float(np.mean(self.signatures[item_id] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (item_id, similarity)
+        return best
+
+    def add(self, item_id, signature):
+        """Make an item a representative that later resumes can be matched to."""
+        if signature is None:
+            return
+        self.signatures[item_id] = signature
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(item_id)
+
+def write_dedup_report(links, report_path):
+    """Write one CSV row per duplicate: `links` is a list of (candidate, source, representative, representative source, similarity)."""
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Candidate", "Source", "Duplicate Of", "Representative Source", "Similarity"])
+        for candidate, source, representative, representative_source, similarity in links:
+            writer.writerow([candidate, source, representative, representative_source, round(similarity, 3)])
+    return report_path
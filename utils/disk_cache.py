@@ -0,0 +1,106 @@
+"""
+Persistent on-disk JSON cache with size- and age-based eviction
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+def evict_files(paths, max_bytes=None, max_age_seconds=None, min_age_seconds=0):
+    """
+    Remove files last modified over `max_age_seconds` ago, then the least recently modified until
+    the rest fit in `max_bytes`. Returns how many files were removed.
+
+    Files modified within `min_age_seconds` are never removed, even if that leaves the total over
+    `max_bytes`, so files that were just written are still there when they are read.
+    """
+    entries = []
+    now = time.time()
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    removed = 0
+    total_bytes = sum(size for _, size, _ in entries)
+    # Least recently modified first
+    for mtime, size, path in sorted(entries, key=lambda entry: entry[0]):
+        age = now - mtime
+        expired = max_age_seconds is not None and age > max_age_seconds
+        over_size = max_bytes is not None and total_bytes > max_bytes
+        if age < min_age_seconds or not (expired or over_size):
+            # Every later file is younger still
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total_bytes -= size
+        removed += 1
+    return removed
+
+class DiskCache:
+    """
+    Store JSON-serialisable values as one file per key under `directory`.
+
+    Reading an entry refreshes its modification time, so eviction removes expired
+    entries first and then the least recently used ones until the cache fits in
+    `max_bytes`.
+    """
+
+    # Prune after this many writes instead of scanning the directory on every write
+    PRUNE_INTERVAL = 50
+
+    def __init__(self, directory, max_bytes=None, max_age_seconds=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._writes_since_prune = self.PRUNE_INTERVAL
+
+    def _path_for(self, key):
+        """Get the file path for a key, sharded by its first two characters."""
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached value for `key`, or None if missing or expired."""
+        path = self._path_for(key)
+        try:
+            if self.max_age_seconds is not None and time.time() - path.stat().st_mtime > self.max_age_seconds:
+                path.unlink()
+                return None
+            with open(path, 'r') as f:
+                value = json.load(f)
+            # Mark as recently used
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        """Store `value` under `key`, writing atomically."""
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.PRUNE_INTERVAL:
+                self._writes_since_prune = 0
+                self.prune()
+
+    def prune(self):
+        """Evict expired entries, then least recently used ones until under `max_bytes`."""
+        evict_files(self.directory.glob("*/*.json"), max_bytes=self.max_bytes, max_age_seconds=self.max_age_seconds)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,348 @@
+"""
+Circuit breaker and adaptive (AIMD) concurrency limit per model endpoint, shared by the Streamlit app and the CLI scripts
+"""
+
+import asyncio
+import contextlib
+import json
+import threading
+import time
+from collections import deque
+
+from utils.rate_limiter import MODEL_OPTIONS_PATH
+from utils.retry_policy import PERMANENT, RATE_LIMIT, classify_error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Used for any setting missing from the "endpoint_guard" section of model_options.json
+DEFAULT_ENDPOINT_GUARD_CONFIG = {
+    # In-flight requests per model: where the limit starts and the range it adapts within
+    "initial_concurrency": 4,
+    "min_concurrency": 1,
+    "max_concurrency": 16,
+    # Responses this many times slower than the model's baseline latency mean the endpoint is congested
+    "latency_tolerance": 2.0,
+    # The breaker opens when at least failure_rate_threshold of the last window_size
+    # requests failed, once min_requests have been seen
+    "window_size": 20,
+    "min_requests": 10,
+    "failure_rate_threshold": 0.5,
+    # How long the breaker stays open; doubled (up to max_open_seconds) each time a probe fails
+    "open_seconds": 30.0,
+    "max_open_seconds": 300.0
+}
+
+# Multiplicative decrease of the concurrency limit on a 429 or error, and on congestion
+OVERLOAD_DECREASE_FACTOR = 0.5
+LATENCY_DECREASE_FACTOR = 0.8
+
+# Smoothing of the latency average, and how fast the baseline may rise towards it per response
+LATENCY_EWMA_ALPHA = 0.3
+BASELINE_DRIFT = 1.01
+
+# How often async callers check for a free slot
+_POLL_SECONDS = 0.05
+
+# Outcome of a request that was cancelled before its response; says nothing about the endpoint
+_CANCELLED = "cancelled"
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request while a model's circuit breaker is open."""
+
+    def __init__(self, model_name, retry_after):
+        super().__init__(f"Circuit breaker open for {model_name} after repeated failures; retry in {retry_after:.0f}s")
+        # Read by the retry policy like a Retry-After header
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Stop sending requests to an endpoint that keeps failing, and probe it before trusting it again.
+
+    Closed: requests flow and their outcomes fill a sliding window. When too many of the
+    window failed, the breaker opens and requests are refused for `open_seconds`. Then it is
+    half-open: a single probe request goes through. If it succeeds the breaker closes with a
+    fresh window; if it fails the breaker opens again for twice as long. Only the probe's
+    outcome counts while half-open; requests sent before the breaker opened may still finish
+    then, and say nothing about whether the endpoint has recovered.
+    """
+
+    def __init__(self, window_size, min_requests, failure_rate_threshold, open_seconds, max_open_seconds):
+        self.min_requests = min_requests
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CLOSED
+        self.times_opened = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._cooldown = open_seconds
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def seconds_until_allowed(self):
+        """
+        Get `(0, is_probe)` and admit a request if the breaker lets one through now, or
+        `(seconds to wait, False)`.
+
+        An admitted request must be reported with `record` (or `record_cancelled`), passing
+        back whether it was the probe.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self._cooldown - time.monotonic()
+                if remaining > 0:
+                    return remaining, False
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    # Others wait for the probe's outcome
+                    return min(self.open_seconds, self._cooldown), False
+                self._probe_in_flight = True
+                return 0.0, True
+            return 0.0, False
+
+    def record(self, failed, probe=False):
+        """Report the outcome of an admitted request."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if not probe:
+                    # Sent before the breaker opened; only the probe decides whether to close
+                    return
+                self._probe_in_flight = False
+                if failed:
+                    self._open(min(self.max_open_seconds, self._cooldown * 2))
+                else:
+                    self.state = CLOSED
+                    self._cooldown = self.open_seconds
+                    self._outcomes.clear()
+                return
+            if self.state != CLOSED:
+                # Sent before the breaker opened; the window is reset on closing anyway
+                return
+
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_requests and self.failure_rate() >= self.failure_rate_threshold:
+                self._open(self.open_seconds)
+
+    def record_cancelled(self, probe=False):
+        """Report an admitted request that was cancelled before its response."""
+        with self._lock:
+            if self.state == HALF_OPEN and probe:
+                # Let the next request probe instead
+                self._probe_in_flight = False
+
+    def failure_rate(self):
+        """Share of failures among the requests in the window."""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _open(self, cooldown):
+        self.state = OPEN
+        self.times_opened += 1
+        self._cooldown = cooldown
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+class AdaptiveConcurrencyLimit:
+    """
+    Limit the requests in flight with additive increase, multiplicative decrease (AIMD).
+
+    Each healthy response raises the limit by 1/limit, so it grows by about one per round of
+    requests, as long as at least half the limit is in use. A 429 or a retryable error halves
+    it, and a latency average above `latency_tolerance` times the baseline (the lowest average
+    seen, allowed to drift up slowly as the workload changes) cuts it by a fifth. At most one
+    decrease is made per average response time, so a burst of failures from requests sent
+    together counts as one signal.
+    The limit settles around the most concurrency the endpoint sustains without throttling.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_tolerance):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(max(minimum, min(maximum, initial)))
+        self.peak_limit = self.limit
+        self.in_flight = 0
+        self.latency_ewma = None
+        self.baseline_latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def _try_enter(self):
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        """Like `acquire`, but waits with asyncio.sleep so the event loop keeps running."""
+        while not self._try_enter():
+            await asyncio.sleep(_POLL_SECONDS)
+
+    def release(self, outcome=None, latency=None):
+        """
+        Free a slot and adapt the limit to the request's outcome: None for a response,
+        an error class from classify_error, or _CANCELLED.
+        """
+        with self._condition:
+            # Only a limit that was actually being used has earned an increase
+            limit_in_use = self.in_flight >= self.limit / 2
+            self.in_flight -= 1
+            if outcome is None:
+                self._record_latency(latency)
+                if self.latency_ewma > self.baseline_latency * self.latency_tolerance:
+                    self._decrease(LATENCY_DECREASE_FACTOR)
+                elif limit_in_use:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.peak_limit = max(self.peak_limit, self.limit)
+            elif outcome not in (PERMANENT, _CANCELLED):
+                self._decrease(OVERLOAD_DECREASE_FACTOR)
+            self._condition.notify_all()
+
+    def _record_latency(self, latency):
+        if self.latency_ewma is None:
+            self.latency_ewma = self.baseline_latency = latency
+            return
+        self.latency_ewma += LATENCY_EWMA_ALPHA * (latency - self.latency_ewma)
+        self.baseline_latency = min(self.latency_ewma, self.baseline_latency * BASELINE_DRIFT)
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency_ewma or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+
+class EndpointGuard:
+    """
+    The circuit breaker and concurrency limit for one model, plus its recent error rates.
+
+    Wrap each API call in `request()` (or `request_async()`): it waits for a concurrency slot,
+    raises CircuitOpenError while the breaker is open, times the call and feeds its outcome
+    back. Permanent errors (e.g. a bad request) say nothing about the endpoint's health and
+    count as responses for the breaker but do not change the limit.
+    """
+
+    def __init__(self, model_name, config):
+        self.model_name = model_name
+        self.breaker = CircuitBreaker(config["window_size"], config["min_requests"], config["failure_rate_threshold"],
+                                      config["open_seconds"], config["max_open_seconds"])
+        self.concurrency = AdaptiveConcurrencyLimit(config["initial_concurrency"], config["min_concurrency"],
+                                                    config["max_concurrency"], config["latency_tolerance"])
+        self._recent = deque(maxlen=config["window_size"])
+        self._lock = threading.Lock()
+
+    def _check_breaker(self):
+        """Raise CircuitOpenError unless the breaker admits the request; returns whether it is the probe."""
+        wait, probe = self.breaker.seconds_until_allowed()
+        if wait > 0:
+            self.concurrency.release(_CANCELLED)
+            raise CircuitOpenError(self.model_name, wait)
+        return probe
+
+    def _finish(self, outcome, started, probe):
+        if outcome == _CANCELLED:
+            self.breaker.record_cancelled(probe)
+        else:
+            self.breaker.record(outcome not in (None, PERMANENT), probe)
+            with self._lock:
+                self._recent.append(outcome)
+        self.concurrency.release(outcome, time.monotonic() - started)
+
+    @contextlib.contextmanager
+    def request(self):
+        """Context manager around one API call."""
+        self.concurrency.acquire()
+        probe = self._check_breaker()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._finish(classify_error(e), started, probe)
+            raise
+        except BaseException:
+            self._finish(_CANCELLED, started, probe)
+            raise
+        self._finish(None, started, probe)
+
+    @contextlib.asynccontextmanager
+    async def request_async(self):
+        """Async version of `request`; waits for a slot without blocking the event loop."""
+        await self.concurrency.acquire_async()
+        probe = self._check_breaker()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._finish(classify_error(e), started, probe)
+            raise
+        except BaseException:
+            # Includes asyncio.CancelledError
+            self._finish(_CANCELLED, started, probe)
+            raise
+        self._finish(None, started, probe)
+
+    def summary(self):
+        """Summarise the endpoint's current state and recent requests as a dict suitable for logging or display."""
+        with self._lock:
+            recent = list(self._recent)
+        failures = [outcome for outcome in recent if outcome not in (None, PERMANENT)]
+        latency = self.concurrency.latency_ewma
+        return {
+            "model": self.model_name,
+            "circuit": self.breaker.state,
+            "times_opened": self.breaker.times_opened,
+            "concurrency_limit": int(self.concurrency.limit),
+            "peak_concurrency_limit": int(self.concurrency.peak_limit),
+            "recent_requests": len(recent),
+            "error_rate": round(len(failures) / len(recent), 3) if recent else 0.0,
+            "rate_limited_rate": round(failures.count(RATE_LIMIT) / len(recent), 3) if recent else 0.0,
+            "avg_latency_seconds": round(latency, 2) if latency is not None else None
+        }
+
+def format_endpoint_summary(summary):
+    """Describe an EndpointGuard summary in one line."""
+    line = (
+        f"Endpoint {summary['model']}: concurrency limit {summary['concurrency_limit']} "
+        f"(peak {summary['peak_concurrency_limit']}), circuit {summary['circuit'].replace('_', '-')}"
+    )
+    if summary["times_opened"]:
+        line += f" (opened {summary['times_opened']} time(s))"
+    if summary["recent_requests"]:
+        line += (
+            f"; last {summary['recent_requests']} request(s): {summary['error_rate']:.0%} failed, "
+            f"{summary['rate_limited_rate']:.0%} rate-limited"
+        )
+    if summary["avg_latency_seconds"] is not None:
+        line += f", avg latency {summary['avg_latency_seconds']}s"
+    return line
+
+def load_endpoint_guard_config(config_path=MODEL_OPTIONS_PATH):
+    """Load the endpoint guard settings from model_options.json, falling back to the defaults."""
+    try:
+        with open(config_path, 'r') as f:
+            guard_config = json.load(f).get("endpoint_guard", {})
+    except Exception:
+        guard_config = {}
+    return {**DEFAULT_ENDPOINT_GUARD_CONFIG, **guard_config}
+
+def get_endpoint_guard(model_name, config_path=MODEL_OPTIONS_PATH):
+    """Get the shared endpoint guard for a model, creating it on first use."""
+    with _guards_lock:
+        if model_name not in _guards:
+            _guards[model_name] = EndpointGuard(model_name, load_endpoint_guard_config(config_path))
+        return _guards[model_name]
@@ -0,0 +1,41 @@
+"""
+Content-addressed cache of AI evaluations, keyed on resume text, prompts and model
+"""
+
+import hashlib
+import json
+import re
+
+from utils.disk_cache import DiskCache
+
+EVALUATION_CACHE_DIR = ".cache/evaluations"
+EVALUATION_CACHE_MAX_BYTES = 200 * 1024 * 1024
+EVALUATION_CACHE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+_evaluation_cache = None
+
+def normalize_resume_text(resume_text):
+    """Collapse whitespace so re-extracted copies of the same resume share a key."""
+    return re.sub(r"\s+", " ", resume_text or "").strip()
+
+def evaluation_cache_key(resume_text, system_prompt, user_prompt_template, model_name, temperature=None):
+    """Hash everything that can change the model's answer into a cache key."""
+    payload = json.dumps([
+        normalize_resume_text(resume_text),
+        system_prompt,
+        user_prompt_template,
+        model_name,
+        temperature
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_evaluation_cache():
+    """Get the shared evaluation cache, creating it on first use."""
+    global _evaluation_cache
+    if _evaluation_cache is None:
+        _evaluation_cache = DiskCache(
+            EVALUATION_CACHE_DIR,
+            max_bytes=EVALUATION_CACHE_MAX_BYTES,
+            max_age_seconds=EVALUATION_CACHE_MAX_AGE_SECONDS
+        )
+    return _evaluation_cache
@@ -0,0 +1,36 @@
+"""
+Concurrent evaluation engine for bulk resume processing
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Number of evaluations kept in flight when the caller does not choose one
+DEFAULT_MAX_WORKERS = 4
+
+def evaluate_items_concurrently(items, evaluate_item, max_workers=DEFAULT_MAX_WORKERS, on_result=None):
+    """
+    Evaluate items with a bounded thread pool and return the results in input order.
+
+    `evaluate_item(item)` must return the result dict for one item and capture its own
+    errors. `on_result(index, result, completed_count)` is called from the calling thread
+    as each evaluation finishes, so it is safe to update Streamlit elements from it.
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    worker_count = max(1, min(int(max_workers), len(items)))
+    completed_count = 0
+
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        futures = {executor.submit(evaluate_item, item): index for index, item in enumerate(items)}
+
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            completed_count += 1
+
+            if on_result:
+                on_result(index, results[index], completed_count)
+
+    return results
@@ -0,0 +1,24 @@
+"""
+Persistent cache of PDF text extraction results, keyed by the SHA-256 of the file contents
+"""
+
+import hashlib
+
+from utils.disk_cache import DiskCache
+
+EXTRACTION_CACHE_DIR = ".cache/extractions"
+EXTRACTION_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+_extraction_cache = None
+
+def pdf_content_hash(pdf_data):
+    """Hash the raw PDF bytes."""
+    return hashlib.sha256(pdf_data).hexdigest()
+
+def get_extraction_cache():
+    """Get the shared extraction cache, creating it on first use."""
+    global _extraction_cache
+    if _extraction_cache is None:
+        # Extractions never go stale for the same bytes, so only evict by size
+        _extraction_cache = DiskCache(EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES)
+    return _extraction_cache
@@ -0,0 +1,31 @@
+"""
+Multi-process PDF text extraction for folder batches
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.resume_processor import extract_text_from_pdf_file
+
+def _extract_worker(pdf_path):
+    """Extract one PDF in a worker process, returning (path, text, error)."""
+    try:
+        return pdf_path, extract_text_from_pdf_file(pdf_path), None
+    except Exception as e:
+        return pdf_path, None, str(e)
+
+def extract_pdfs_parallel(pdf_paths, max_workers=None):
+    """
+    Parse PDFs across all cores and yield `(path, text, error)` as each one finishes.
+
+    Results arrive in completion order, so the caller can start evaluating the first
+    resumes while the rest are still being parsed. Unchanged files are served from the
+    extraction cache inside the workers.
+    """
+    pdf_paths = list(pdf_paths)
+    if not pdf_paths:
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_extract_worker, pdf_path) for pdf_path in pdf_paths]
+        for future in as_completed(futures):
+            yield future.result()
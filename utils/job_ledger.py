@@ -0,0 +1,116 @@
+"""
+Durable job ledger for resumable batch evaluations, stored as an append-only JSONL file
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+QUEUED = "queued"
+EXTRACTED = "extracted"
+EVALUATING = "evaluating"
+DONE = "done"
+FAILED = "failed"
+# Left out by the local pre-screen, so no evaluation was requested
+SKIPPED = "skipped"
+
+JOB_LEDGER_DIR = ".cache/jobs"
+
+def batch_job_id(item_ids, *settings):
+    """Derive a stable job id from a batch's items and the settings that affect its results."""
+    payload = json.dumps([list(item_ids), *settings])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+class JobLedger:
+    """
+    Track the state of every file in a batch so an interrupted run can pick up where it stopped.
+
+    Each state change is appended to the ledger file as one JSON line and flushed to disk
+    before returning. On load, the events are replayed to rebuild the latest record per item:
+    its state, attempt count, timings and any extra fields (output path, result, error).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """
+        Replay the existing ledger file, ignoring a torn last line from a crash.
+
+        The torn line is cut off the file, so the next event starts on a line of its own
+        instead of being appended to the fragment and lost on the following replay.
+        """
+        if not self.path.exists():
+            return
+        complete_length = 0
+        missing_newline = False
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    if not line.endswith(b"\n"):
+                        break
+                    complete_length += len(line)
+                    continue
+                complete_length += len(line)
+                # Only the last line can lack its newline; the event itself was written whole
+                missing_newline = not line.endswith(b"\n")
+                self._apply(event)
+
+        if complete_length < self.path.stat().st_size or missing_newline:
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete_length)
+                if missing_newline:
+                    f.seek(complete_length)
+                    f.write(b"\n")
+
+    def _apply(self, event):
+        """Fold one event into the in-memory record for its item."""
+        job = self.jobs.setdefault(event["item_id"], {"item_id": event["item_id"], "attempts": 0})
+        job.update({key: value for key, value in event.items() if key != "time"})
+        job["updated_at"] = event["time"]
+
+        if event["state"] == QUEUED:
+            job.setdefault("queued_at", event["time"])
+        elif event["state"] == EVALUATING:
+            job["attempts"] += 1
+            job["started_at"] = event["time"]
+        elif event["state"] in (DONE, FAILED) and "started_at" in job:
+            job["duration_seconds"] = round(event["time"] - job["started_at"], 3)
+
+        if event["state"] == DONE:
+            job.pop("error", None)
+
+    def record(self, item_id, state, **fields):
+        """Append a state change for an item and apply it."""
+        event = {"item_id": item_id, "state": state, "time": time.time(), **fields}
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(event) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(event)
+
+    def get(self, item_id):
+        """Get the latest record for an item, or None if it was never queued."""
+        return self.jobs.get(item_id)
+
+    def is_done(self, item_id):
+        """Check whether an item already finished successfully."""
+        job = self.jobs.get(item_id)
+        return bool(job) and job["state"] == DONE
+
+    def counts(self):
+        """Count items per state."""
+        counts = {}
+        for job in self.jobs.values():
+            counts[job["state"]] = counts.get(job["state"], 0) + 1
+        return counts
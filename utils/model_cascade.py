@@ -0,0 +1,77 @@
+"""
+Two-tier model cascade: score every resume with a cheap model and re-score borderline ones with a strong model
+"""
+
+import json
+
+from utils.rate_limiter import MODEL_OPTIONS_PATH
+from utils.report_parser import is_complete_report, parse_report
+
+CHEAP_TIER = "cheap"
+STRONG_TIER = "strong"
+
+# Used for any setting missing from the "cascade" section of model_options.json. Critical
+# scores run from 0 to 6; clear rejects (0-1) and clear matches (5-6) keep the cheap report.
+DEFAULT_CASCADE_CONFIG = {
+    "cheap_model": "gpt-3.5-turbo",
+    "strong_model": "gpt-4-turbo",
+    "escalate_critical_scores": [2, 4]
+}
+
+def load_cascade_config(config_path=MODEL_OPTIONS_PATH):
+    """Load the cascade settings from model_options.json, falling back to the defaults."""
+    try:
+        with open(config_path, 'r') as f:
+            cascade_config = json.load(f).get("cascade", {})
+    except Exception:
+        cascade_config = {}
+    return {**DEFAULT_CASCADE_CONFIG, **cascade_config}
+
+def has_distinct_tiers(cascade_config):
+    """Check that the tiers use different models; with one model, escalating only evaluates a resume twice."""
+    return cascade_config["cheap_model"] != cascade_config["strong_model"]
+
+def escalation_reason(report_text, escalate_critical_scores):
+    """Get why a cheap-tier report should be re-scored by the strong model, or None if it can stand."""
+    if not report_text:
+        return "the cheap model returned no report"
+    report = parse_report(report_text)
+    if not is_complete_report(report):
+        return "the cheap report could not be parsed"
+    low, high = escalate_critical_scores
+    if low <= report.critical_score <= high:
+        return f"its critical score {report.critical_score:g} is in the borderline band {low:g}-{high:g}"
+    return None
+
+def tier_note(cascade_result):
+    """The line added to the end of a report to say which tier produced it."""
+    note = f"*Model tier: {cascade_result['tier']} ({cascade_result['model']})"
+    if cascade_result["tier"] == STRONG_TIER:
+        note += f", escalated from {cascade_result['cheap_model']} because {cascade_result['reason']}"
+    return note + "*"
+
+def run_cascade(evaluate, cascade_config):
+    """
+    Evaluate with the cheap model, and again with the strong model if the cheap report is borderline.
+
+    `evaluate(model_name)` returns the markdown report. An exception from the cheap model
+    escalates; one from the strong model is raised. Returns a dict with the final `report`
+    (ending with the tier note), the `tier` and `model` that produced it, the `cheap_model`
+    and the `reason` for escalating (None if the cheap report was kept).
+    """
+    cheap_model = cascade_config["cheap_model"]
+    try:
+        report_text = evaluate(cheap_model)
+        reason = escalation_reason(report_text, cascade_config["escalate_critical_scores"])
+    except Exception as e:
+        reason = f"the cheap model failed ({e})"
+
+    if reason is None:
+        result = {"tier": CHEAP_TIER, "model": cheap_model}
+    else:
+        report_text = evaluate(cascade_config["strong_model"])
+        result = {"tier": STRONG_TIER, "model": cascade_config["strong_model"]}
+
+    result.update(cheap_model=cheap_model, reason=reason)
+    result["report"] = f"{report_text.rstrip()}\n\n---\n\n{tier_note(result)}\n"
+    return result
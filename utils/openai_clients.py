@@ -0,0 +1,184 @@
+"""
+Registry of pooled OpenAI clients, shared across evaluations so HTTP keep-alive and TLS sessions are reused
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+# Connection pool sized for the bulk evaluation thread pools
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY_SECONDS = 90
+
+# Evaluations are long completions, so only the connect phase gets a short timeout
+REQUEST_TIMEOUT = httpx.Timeout(180.0, connect=10.0)
+
+_clients = {}
+_stats = {}
+_clients_lock = threading.Lock()
+
+# Async connections belong to the event loop that opened them, so async clients are kept per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+class ClientStats:
+    """Count requests, new connections and the time spent on each, for one client."""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.connect_seconds = 0.0
+        self.response_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_request(self, response_seconds, connected, connect_seconds):
+        with self._lock:
+            self.requests += 1
+            self.response_seconds += response_seconds
+            if connected:
+                self.new_connections += 1
+                self.connect_seconds += connect_seconds
+
+    def counters(self):
+        """Get the running totals, to pass to `summary` later as `since`."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "connect_seconds": self.connect_seconds,
+                "response_seconds": self.response_seconds
+            }
+
+    def summary(self, since=None):
+        """
+        Summarise the stats as a dict suitable for logging or display.
+
+        The totals cover the life of the process; with `since` (from `counters`), only the requests made after it.
+        """
+        totals = self.counters()
+        if since:
+            totals = {name: value - since[name] for name, value in totals.items()}
+        requests, new_connections = totals["requests"], totals["new_connections"]
+        return {
+            "requests": requests,
+            "new_connections": new_connections,
+            "reused_connections": requests - new_connections,
+            "avg_connect_ms": round(totals["connect_seconds"] / new_connections * 1000, 1) if new_connections else 0.0,
+            "avg_response_seconds": round(totals["response_seconds"] / requests, 2) if requests else 0.0
+        }
+
+def _pool_limits():
+    """Connection pool limits shared by the sync and async clients."""
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+    )
+
+def _start_timing(request):
+    """Attach a timing record to a request and return it."""
+    timing = {"started": time.perf_counter(), "connected": False, "connect_seconds": 0.0}
+    request.extensions["timing"] = timing
+    return timing
+
+def _record_trace_event(timing, event_name):
+    """Update a request's timing record from an httpcore trace event."""
+    # httpcore reports TCP connect and TLS handshake phases only for new connections
+    if event_name == "connection.connect_tcp.started":
+        timing["connect_started"] = time.perf_counter()
+    elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and "connect_started" in timing:
+        timing["connected"] = True
+        timing["connect_seconds"] = time.perf_counter() - timing["connect_started"]
+
+def _record_response(stats, response):
+    """Add a finished request to the client stats."""
+    timing = response.request.extensions.get("timing")
+    if timing:
+        stats.add_request(time.perf_counter() - timing["started"], timing["connected"], timing["connect_seconds"])
+
+def _instrumented_http_client(stats):
+    """Build an httpx client with a tuned pool that records per-request connection overhead."""
+    def on_request(request):
+        timing = _start_timing(request)
+
+        def trace(event_name, info):
+            _record_trace_event(timing, event_name)
+
+        request.extensions["trace"] = trace
+
+    def on_response(response):
+        _record_response(stats, response)
+
+    return httpx.Client(
+        limits=_pool_limits(),
+        timeout=REQUEST_TIMEOUT,
+        event_hooks={"request": [on_request], "response": [on_response]}
+    )
+
+def _instrumented_async_http_client(stats):
+    """Async counterpart of `_instrumented_http_client`; httpx requires async hooks here."""
+    async def on_request(request):
+        timing = _start_timing(request)
+
+        async def trace(event_name, info):
+            _record_trace_event(timing, event_name)
+
+        request.extensions["trace"] = trace
+
+    async def on_response(response):
+        _record_response(stats, response)
+
+    return httpx.AsyncClient(
+        limits=_pool_limits(),
+        timeout=REQUEST_TIMEOUT,
+        event_hooks={"request": [on_request], "response": [on_response]}
+    )
+
+def _client_key(api_key, base_url):
+    # The OpenAI client falls back to OPENAI_BASE_URL too, so include it in the key
+    return (api_key, base_url or os.environ.get("OPENAI_BASE_URL"))
+
+def _get_stats(key):
+    """Get the stats shared by the sync and async clients of a key. Call with the lock held."""
+    if key not in _stats:
+        _stats[key] = ClientStats()
+    return _stats[key]
+
+def get_openai_client(api_key, base_url=None):
+    """Get the shared client for an (api_key, base_url) pair, creating it on first use."""
+    key = _client_key(api_key, base_url)
+    with _clients_lock:
+        if key not in _clients:
+            http_client = _instrumented_http_client(_get_stats(key))
+            _clients[key] = OpenAI(api_key=api_key, base_url=key[1], http_client=http_client)
+        return _clients[key]
+
+def get_async_openai_client(api_key, base_url=None):
+    """Get the shared async client for an (api_key, base_url) pair in the running event loop."""
+    key = _client_key(api_key, base_url)
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        if key not in loop_clients:
+            http_client = _instrumented_async_http_client(_get_stats(key))
+            loop_clients[key] = AsyncOpenAI(api_key=api_key, base_url=key[1], http_client=http_client)
+        return loop_clients[key]
+
+def get_client_stats(api_key, base_url=None, since=None):
+    """
+    Get the connection stats of a key's sync and async clients as a dict, or None if none was created.
+
+    Pass the result of `get_client_counters` taken before a batch as `since` to cover that batch only.
+    """
+    stats = _stats.get(_client_key(api_key, base_url))
+    return stats.summary(since) if stats else None
+
+def get_client_counters(api_key, base_url=None):
+    """Get the running totals behind `get_client_stats`, or None if no client was created yet."""
+    stats = _stats.get(_client_key(api_key, base_url))
+    return stats.counters() if stats else None
@@ -0,0 +1,91 @@
+"""
+Packing several short resumes into one evaluation request, and splitting the reply per candidate
+"""
+
+import re
+
+from utils.rate_limiter import estimate_tokens
+from utils.report_parser import is_complete_report, parse_report
+
+# Resumes up to this many tokens are packed; longer ones are evaluated on their own
+DEFAULT_SHORT_RESUME_TOKENS = 1500
+# Resume tokens per packed request
+DEFAULT_PACK_TOKEN_BUDGET = 4000
+DEFAULT_MAX_PACK_SIZE = 4
+# Completion tokens set aside for each candidate's report in a packed reply; a report in the
+# prompt's format runs to well under this
+DEFAULT_PACKED_REPORT_TOKENS = 1000
+
+# The same for every pack, so it stays part of the cacheable prompt prefix
+PACKING_INSTRUCTIONS = """Several candidates are evaluated in this request. Each resume is given between a
+`<<< CANDIDATE n >>>` line and a `<<< END CANDIDATE n >>>` line.
+
+Evaluate every candidate separately and independently, in the order given, using the complete report format
+requested below for each one. Start each candidate's report with a line containing only `=== CANDIDATE n ===`,
+where n is that candidate's number. Do not compare candidates with each other and do not skip any candidate."""
+
+# "=== CANDIDATE 3 ===" on its own line, in case the model wraps it in bold or a heading
+_SECTION_MARKER = re.compile(r'^[#*\s]*===\s*CANDIDATE\s+(\d+)\s*===[*\s]*$', re.MULTILINE)
+
+class ResumePacker:
+    """
+    Group short resumes into packs by a token budget, as they arrive.
+
+    `add` returns the packs that are complete: the current pack once the next resume would not
+    fit, or a long resume on its own. `flush` returns whatever is left at the end.
+    """
+
+    def __init__(self, token_budget=DEFAULT_PACK_TOKEN_BUDGET, max_pack_size=DEFAULT_MAX_PACK_SIZE,
+                 short_resume_tokens=DEFAULT_SHORT_RESUME_TOKENS):
+        self.token_budget = token_budget
+        self.max_pack_size = max_pack_size
+        self.short_resume_tokens = min(short_resume_tokens, token_budget)
+        self._pack = []
+        self._pack_tokens = 0
+
+    def add(self, item, resume_text):
+        tokens = estimate_tokens(resume_text)
+        if tokens > self.short_resume_tokens:
+            return [[item]]
+
+        ready = []
+        if self._pack and (self._pack_tokens + tokens > self.token_budget or len(self._pack) >= self.max_pack_size):
+            ready.append(self.flush()[0])
+        self._pack.append(item)
+        self._pack_tokens += tokens
+        return ready
+
+    def flush(self):
+        pack, self._pack, self._pack_tokens = self._pack, [], 0
+        return [pack] if pack else []
+
+def max_pack_size_for(completion_token_limit, report_tokens=DEFAULT_PACKED_REPORT_TOKENS,
+                      max_pack_size=DEFAULT_MAX_PACK_SIZE):
+    """Get how many candidates a pack can hold before their reports outgrow the model's completion limit."""
+    return max(1, min(max_pack_size, completion_token_limit // report_tokens))
+
+def pack_resume_text(resume_texts):
+    """Join resumes into the delimited block that replaces {resume_text} in a packed request."""
+    return "\n\n".join(
+        f"<<< CANDIDATE {number} >>>\n{resume_text.strip()}\n<<< END CANDIDATE {number} >>>"
+        for number, resume_text in enumerate(resume_texts, 1)
+    )
+
+def split_packed_response(response_text, candidate_count):
+    """
+    Split a packed reply into one report per candidate, in pack order.
+
+    A candidate whose section is missing or incomplete gets None, so it can be evaluated again.
+    If a number is repeated, its first complete section is used.
+    """
+    markers = list(_SECTION_MARKER.finditer(response_text or ""))
+    reports = [None] * candidate_count
+    for index, marker in enumerate(markers):
+        number = int(marker.group(1))
+        if not 1 <= number <= candidate_count or reports[number - 1] is not None:
+            continue
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(response_text)
+        report_text = response_text[marker.end():end].strip()
+        if is_complete_report(parse_report(report_text)):
+            reports[number - 1] = report_text + "\n"
+    return reports
@@ -0,0 +1,111 @@
+"""
+Streaming extract → evaluate → persist pipeline with bounded queues between the stages
+"""
+
+import queue
+import threading
+
+from utils.evaluation_engine import DEFAULT_MAX_WORKERS
+
+# Marks the end of a stage's output
+_DONE = object()
+
+# How often blocked stages check whether the pipeline was stopped
+_POLL_SECONDS = 0.1
+
+def run_pipeline(sources, extract_item, evaluate_item, on_result=None, max_workers=DEFAULT_MAX_WORKERS, queue_size=None):
+    """
+    Stream `sources` through extraction, evaluation and `on_result`, returning results in input order.
+
+    One thread runs `extract_item(source)` and `max_workers` threads run `evaluate_item(item)`.
+    The queues between the stages hold at most `queue_size` items, so extraction never runs
+    far ahead of evaluation and only a handful of resume texts are in memory at once. Both
+    callables must capture their own per-item errors in the returned dicts.
+
+    `on_result(index, result, completed_count)` is the persistence stage; it runs in the
+    calling thread as results land, so it is safe to update Streamlit elements from it.
+    """
+    sources = list(sources)
+    results = [None] * len(sources)
+    if not sources:
+        return results
+
+    worker_count = max(1, min(int(max_workers), len(sources)))
+    queue_size = queue_size or worker_count * 2
+    extracted_queue = queue.Queue(maxsize=queue_size)
+    evaluated_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    stage_errors = []
+
+    def put(target_queue, entry):
+        """Put an entry, giving up if the pipeline is stopped while the queue is full."""
+        while not stop_event.is_set():
+            try:
+                target_queue.put(entry, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(source_queue):
+        """Get an entry, returning _DONE if the pipeline is stopped while waiting."""
+        while not stop_event.is_set():
+            try:
+                return source_queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def extraction_stage():
+        try:
+            for index, source in enumerate(sources):
+                if not put(extracted_queue, (index, extract_item(source))):
+                    return
+        except Exception as e:
+            stage_errors.append(e)
+        finally:
+            # One end marker per evaluation worker
+            for _ in range(worker_count):
+                put(extracted_queue, _DONE)
+
+    def evaluation_stage():
+        try:
+            while True:
+                entry = get(extracted_queue)
+                if entry is _DONE:
+                    return
+                index, item = entry
+                if not put(evaluated_queue, (index, evaluate_item(item))):
+                    return
+        except Exception as e:
+            stage_errors.append(e)
+        finally:
+            put(evaluated_queue, _DONE)
+
+    threads = [threading.Thread(target=extraction_stage, daemon=True)]
+    threads += [threading.Thread(target=evaluation_stage, daemon=True) for _ in range(worker_count)]
+    for thread in threads:
+        thread.start()
+
+    completed_count = 0
+    finished_workers = 0
+    try:
+        while finished_workers < worker_count:
+            entry = evaluated_queue.get()
+            if entry is _DONE:
+                finished_workers += 1
+                continue
+
+            index, result = entry
+            results[index] = result
+            completed_count += 1
+            if on_result:
+                on_result(index, result, completed_count)
+    finally:
+        # Unblock any stage still waiting, e.g. if on_result raised
+        stop_event.set()
+
+    if stage_errors:
+        raise stage_errors[0]
+
+    return results
@@ -0,0 +1,217 @@
+"""
+Local pre-screening of resumes against the rubric's flags, to skip the model call for clear non-matches
+"""
+
+import csv
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+from utils.structured_output import FLAG_KEYS, CRITICAL_FLAG_KEYS
+
+PRESCREEN_CONFIG_PATH = "configure/nice_to_configure/prescreen.json"
+
+AUTO_REJECT = "auto-reject"
+EVALUATE = "evaluate"
+PRIORITY = "priority"
+
+# Used for any setting missing from the config file; the curated synonyms must come from the file
+DEFAULT_PRESCREEN_CONFIG = {
+    "auto_reject_below": 0.03,
+    "priority_at_or_above": 0.5,
+    "min_text_chars": 500,
+    "terms_for_full_score": 4,
+    "critical_flags": CRITICAL_FLAG_KEYS,
+    "flag_keywords": {}
+}
+
+# "#### Flag 1: AI/ML Experience & Engineering (Critical)" up to the next heading
+_FLAG_SECTION = re.compile(r'^#+\s*Flag\s+(\d+)\s*:(.*?)(?=^#|\Z)', re.MULTILINE | re.DOTALL)
+# "  - **EU**: Technical University of Munich (TUM), RWTH Aachen University, ..."
+_UNIVERSITY_LINE = re.compile(r'^\s*-\s*\*\*[^*]+\*\*:\s*(.+)$', re.MULTILINE)
+# A comma-separated fragment without one of these words continues the previous name ("University of California, Berkeley")
+_INSTITUTION_WORD = re.compile(r'Universit|Institut|College|Polytechn|Politecnico|School|\(')
+# Acronyms such as "AI", "LLM" or "RAG", and "quoted" job titles without template brackets
+_ACRONYM = re.compile(r'\b[A-Z][A-Z0-9]+\b')
+_QUOTED_TERM = re.compile(r'"([^"\[\]]+)"')
+
+def _normalize(text):
+    """Lowercase and reduce punctuation to spaces, so "Fine-tuning" and "AI/ML" match "fine tuning" and "ai ml"."""
+    return re.sub(r'[^a-z0-9+#]+', ' ', text.lower())
+
+def load_prescreen_config(path=PRESCREEN_CONFIG_PATH):
+    """Load the pre-screening settings, falling back to the defaults for anything missing."""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    return {**DEFAULT_PRESCREEN_CONFIG, **config}
+
+def rubric_flag_sections(rubric_text):
+    """Get the text of each "Flag N:" section of the rubric, keyed like FLAG_KEYS."""
+    sections = {}
+    for match in _FLAG_SECTION.finditer(rubric_text or ""):
+        flag_number = int(match.group(1))
+        if 1 <= flag_number <= len(FLAG_KEYS):
+            sections[FLAG_KEYS[flag_number - 1]] = match.group(2)
+    return sections
+
+def _university_terms(name):
+    """Get the names a resume may use for a listed university: in full, its abbreviation and its short form."""
+    terms = {name}
+    abbreviation = re.search(r'\(([^)]+)\)', name)
+    if abbreviation:
+        terms.add(abbreviation.group(1).strip())
+        name = name[:abbreviation.start()].strip()
+        terms.add(name)
+    # "University of Oxford" -> "Oxford", "Stanford University" -> "Stanford"
+    terms.add(re.sub(r'^University of\s+|\s+University$', '', name))
+    return terms
+
+def rubric_flag_terms(rubric_text):
+    """
+    Get the terms each positive flag's rubric section names, keyed like FLAG_KEYS.
+
+    These are the acronyms in the flag's heading (e.g. "LLM" and "NLP"), the job titles quoted in
+    its section (e.g. "LLM Specialist") and, for a section listing universities, every university
+    with its abbreviation and short form. Red flags describe circumstances rather than keywords,
+    so they get no terms.
+    """
+    flag_terms = {}
+    for flag, section in rubric_flag_sections(rubric_text).items():
+        if flag == "red_flags":
+            continue
+        terms = set()
+        for line in _UNIVERSITY_LINE.findall(section):
+            names = []
+            for fragment in line.split(","):
+                fragment = fragment.strip().rstrip(".")
+                if names and not _INSTITUTION_WORD.search(fragment):
+                    names[-1] += f", {fragment}"
+                elif fragment:
+                    names.append(fragment)
+            for name in names:
+                terms |= _university_terms(name)
+        heading = section.split("\n", 1)[0]
+        terms |= set(_ACRONYM.findall(heading))
+        terms |= {quoted.strip() for quoted in _QUOTED_TERM.findall(section)}
+        flag_terms[flag] = terms
+    return flag_terms
+
+class PreScreener:
+    """
+    Score resumes against keyword profiles of the rubric's flags and label them before evaluation.
+
+    Each flag's keywords are the terms its rubric section names (see `rubric_flag_terms`) plus
+    the curated synonyms in `flag_keywords`. They are weighted TF-IDF style: term frequency is
+    how often the rubric's definition of the flag mentions the keyword (plus one), and inverse
+    document frequency is taken over the flags, so keywords shared by several flags count less.
+    A resume's score for a flag is the weight of the keywords it mentions, relative to
+    `terms_for_full_score` keywords of average weight and capped at 1, so adding synonyms does not
+    dilute the others. Its signal is the mean score of the critical flags. All keywords are
+    matched in one pass of a compiled regex.
+    """
+
+    def __init__(self, flag_keywords, rubric_text="", critical_flags=CRITICAL_FLAG_KEYS,
+                 auto_reject_below=0.03, priority_at_or_above=0.5, min_text_chars=500, terms_for_full_score=4):
+        flag_terms = rubric_flag_terms(rubric_text)
+        for flag, terms in flag_keywords.items():
+            flag_terms[flag] = flag_terms.get(flag, set()) | set(terms)
+
+        self.critical_flags = [flag for flag in critical_flags if flag_terms.get(flag)]
+        if not self.critical_flags:
+            raise Exception("Pre-screening needs keywords for at least one critical flag")
+        self.auto_reject_below = auto_reject_below
+        self.priority_at_or_above = priority_at_or_above
+        self.min_text_chars = min_text_chars
+
+        keywords = {
+            flag: sorted({_normalize(keyword).strip() for keyword in terms} - {""})
+            for flag, terms in flag_terms.items() if terms
+        }
+        sections = {flag: f" {_normalize(text)} " for flag, text in rubric_flag_sections(rubric_text).items()}
+        document_frequency = Counter(term for terms in keywords.values() for term in terms)
+
+        self.weights = {}
+        for flag, terms in keywords.items():
+            section = sections.get(flag, "")
+            self.weights[flag] = {
+                term: (1 + section.count(f" {term} ")) * (math.log((1 + len(keywords)) / (1 + document_frequency[term])) + 1)
+                for term in terms
+            }
+        # The weight a flag's score is measured against: `terms_for_full_score` keywords of average weight
+        self.full_score_weights = {
+            flag: sum(weights.values()) * min(1.0, terms_for_full_score / len(weights))
+            for flag, weights in self.weights.items()
+        }
+
+        # Longest first, so "large language model" wins over "language model"
+        all_terms = sorted(document_frequency, key=len, reverse=True)
+        self._pattern = re.compile(r'(?<![a-z0-9])(?:' + '|'.join(re.escape(term) for term in all_terms) + r')(?![a-z0-9])')
+
+    def score(self, resume_text):
+        """Get each flag's score (0 to 1) and the keywords found for it."""
+        found = set(self._pattern.findall(_normalize(resume_text)))
+        flag_scores = {}
+        matched_terms = {}
+        for flag, weights in self.weights.items():
+            matched = [term for term in weights if term in found]
+            flag_scores[flag] = min(1.0, sum(weights[term] for term in matched) / self.full_score_weights[flag])
+            matched_terms[flag] = matched
+        return flag_scores, matched_terms
+
+    def screen(self, resume_text):
+        """Label a resume as auto-reject, evaluate or priority, with the scores behind the label."""
+        flag_scores, matched_terms = self.score(resume_text)
+        signal = sum(flag_scores[flag] for flag in self.critical_flags) / len(self.critical_flags)
+
+        if len(resume_text.strip()) < self.min_text_chars:
+            # Too little text to judge (e.g. a scanned PDF), so leave it to the model
+            label = EVALUATE
+        elif signal < self.auto_reject_below:
+            label = AUTO_REJECT
+        elif signal >= self.priority_at_or_above:
+            label = PRIORITY
+        else:
+            label = EVALUATE
+
+        return {
+            "label": label,
+            "signal": round(signal, 4),
+            "flag_scores": {flag: round(score, 4) for flag, score in flag_scores.items()},
+            "matched_terms": matched_terms
+        }
+
+def build_prescreener(rubric_text, config=None):
+    """Build a PreScreener from the rubric prompt and the pre-screening settings."""
+    config = config or load_prescreen_config()
+    return PreScreener(
+        config["flag_keywords"],
+        rubric_text=rubric_text,
+        critical_flags=config["critical_flags"],
+        auto_reject_below=config["auto_reject_below"],
+        priority_at_or_above=config["priority_at_or_above"],
+        min_text_chars=config["min_text_chars"],
+        terms_for_full_score=config["terms_for_full_score"]
+    )
+
+def write_prescreen_report(decisions, report_path):
+    """Write one CSV row per screened resume: `decisions` is a list of (candidate, source, decision)."""
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    flags = sorted({flag for _, _, decision in decisions for flag in decision["flag_scores"]}, key=FLAG_KEYS.index)
+
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Candidate", "Source", "Label", "Signal", *[f"{flag} score" for flag in flags], "Matched Terms"])
+        for candidate, source, decision in decisions:
+            matched = sorted({term for terms in decision["matched_terms"].values() for term in terms})
+            writer.writerow([
+                candidate, source, decision["label"], decision["signal"],
+                *[decision["flag_scores"].get(flag, 0) for flag in flags],
+                "; ".join(matched)
+            ])
+    return report_path
@@ -0,0 +1,107 @@
+"""
+Chat message layout with a stable prompt prefix, and prompt-cache usage accounting
+"""
+
+import threading
+
+# Stands in for the resume when a template puts text after the {resume_text} placeholder
+RESUME_REFERENCE = "[the resume at the end of this message]"
+RESUME_HEADING = "Resume text:"
+
+# Unlikely to appear in a prompt, used to find where the template places the resume
+_PLACEHOLDER_MARK = "\x00resume_text\x00"
+
+def split_prompt_template(user_prompt_template):
+    """
+    Split a user prompt template into the text before and after its {resume_text} placeholder.
+
+    The template is formatted first, so escaped braces come out as they would with str.format.
+    """
+    formatted = user_prompt_template.format(resume_text=_PLACEHOLDER_MARK)
+    if _PLACEHOLDER_MARK not in formatted:
+        raise Exception("The user prompt template has no {resume_text} placeholder")
+    head, tail = formatted.split(_PLACEHOLDER_MARK, 1)
+    # Any further placeholders get the reference too
+    return head, tail.replace(_PLACEHOLDER_MARK, RESUME_REFERENCE)
+
+def build_user_prompt(user_prompt_template, resume_text):
+    """
+    Fill the user prompt so that everything except the resume comes before it.
+
+    Providers cache the longest prompt prefix shared with recent requests, so the rubric must
+    not depend on the candidate. With the placeholder at the end of the template (as in
+    resume_prompt.txt) this is the same as str.format. Otherwise the placeholder becomes a
+    reference and the resume is appended after the rest of the template.
+    """
+    head, tail = split_prompt_template(user_prompt_template)
+    if not tail.strip():
+        return f"{head}{resume_text}{tail}"
+    return f"{head}{RESUME_REFERENCE}{tail.rstrip()}\n\n{RESUME_HEADING} {resume_text}"
+
+def build_messages(system_prompt, user_prompt_template, resume_text, instructions=None):
+    """
+    Build the chat messages for one evaluation, stable prefix first.
+
+    The order is: system prompt, extra system `instructions` (e.g. for structured output),
+    then the user prompt, which ends with the resume.
+    """
+    messages = [{"role": "system", "content": system_prompt}]
+    if instructions:
+        messages.append({"role": "system", "content": instructions})
+    messages.append({"role": "user", "content": build_user_prompt(user_prompt_template, resume_text)})
+    return messages
+
+def usage_tokens(usage):
+    """
+    Get the prompt, cached and completion token counts from a response's usage.
+
+    Accepts the SDK's usage object, the plain dict found in Batch API results, or counts
+    returned by this function before. Returns None without usage; cached_tokens is 0 when
+    the provider does not report it.
+    """
+    if not usage:
+        return None
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+    details = usage.get("prompt_tokens_details") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens") or 0,
+        "cached_tokens": details.get("cached_tokens") or usage.get("cached_tokens") or 0,
+        "completion_tokens": usage.get("completion_tokens") or 0
+    }
+
+class PromptCacheStats:
+    """Sum the prompt and cached tokens of a batch's requests, keeping each request's counts."""
+
+    def __init__(self):
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, usage):
+        """Record the usage of the request for `key` and return its token counts (None without usage)."""
+        tokens = usage_tokens(usage)
+        if tokens:
+            with self._lock:
+                self.requests[key] = tokens
+        return tokens
+
+    def summary(self):
+        """Summarise the batch as a dict suitable for logging or display."""
+        with self._lock:
+            counts = list(self.requests.values())
+        prompt_tokens = sum(tokens["prompt_tokens"] for tokens in counts)
+        cached_tokens = sum(tokens["cached_tokens"] for tokens in counts)
+        return {
+            "requests": len(counts),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": sum(tokens["completion_tokens"] for tokens in counts),
+            "cached_share": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0
+        }
+
+def format_prompt_cache_summary(summary):
+    """Describe a PromptCacheStats summary in one line."""
+    return (
+        f"Prompt cache: {summary['cached_tokens']:,} of {summary['prompt_tokens']:,} prompt tokens cached "
+        f"({summary['cached_share']:.0%}) over {summary['requests']} request(s)"
+    )
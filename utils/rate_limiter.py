@@ -0,0 +1,148 @@
+"""
+Token-bucket rate limiting for OpenAI requests, shared by the Streamlit app and the CLI scripts
+"""
+
+import asyncio
+import json
+import math
+import threading
+import time
+
+MODEL_OPTIONS_PATH = "configure/nice_to_configure/model_options.json"
+
+# Used when model_options.json has no rate limits for a model
+DEFAULT_RATE_LIMITS = {
+    "requests_per_minute": 500,
+    "tokens_per_minute": 30000
+}
+
+# Rough average for English text with the GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+# Extra tokens per request for chat message framing
+MESSAGE_OVERHEAD_TOKENS = 12
+
+# Expected length of a markdown evaluation report, used when no max_tokens is set
+DEFAULT_COMPLETION_TOKENS = 1500
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+class TokenBucket:
+    """A bucket that holds up to `capacity` units and refills continuously."""
+
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.available = float(capacity)
+        self.last_refill = time.monotonic()
+
+    def _refill(self):
+        """Add the units accrued since the last refill."""
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.last_refill) * self.refill_per_second)
+        self.last_refill = now
+
+    def time_until_available(self, amount):
+        """Seconds until `amount` units can be consumed (0 if available now)."""
+        self._refill()
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_per_second
+
+    def consume(self, amount):
+        """Take `amount` units from the bucket; the balance may go negative when adjusting."""
+        self._refill()
+        self.available -= amount
+
+class RateLimiter:
+    """Admit requests only when both the requests-per-minute and tokens-per-minute budgets allow it."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tokens):
+        """Consume the budget for one request if it fits now; otherwise return the seconds to wait."""
+        with self._lock:
+            wait = max(
+                self.request_bucket.time_until_available(1),
+                self.token_bucket.time_until_available(tokens)
+            )
+            if wait <= 0:
+                self.request_bucket.consume(1)
+                self.token_bucket.consume(tokens)
+            return wait
+
+    def acquire(self, tokens=0):
+        """Block until one request of `tokens` estimated tokens fits the budget. Returns seconds waited."""
+        # A single request larger than the whole bucket would wait forever
+        tokens = min(tokens, self.token_bucket.capacity)
+        waited = 0.0
+
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return waited
+
+            # Sleep outside the lock so other threads can check the buckets
+            sleep_for = min(wait, 1.0)
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+    async def acquire_async(self, tokens=0):
+        """Like `acquire`, but waits with asyncio.sleep so the event loop keeps running."""
+        tokens = min(tokens, self.token_bucket.capacity)
+        waited = 0.0
+
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return waited
+
+            sleep_for = min(wait, 1.0)
+            await asyncio.sleep(sleep_for)
+            waited += sleep_for
+
+    def reconcile(self, estimated_tokens, actual_tokens):
+        """Correct the token budget once the real usage of a request is known."""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self.token_bucket.consume(actual_tokens - estimated_tokens)
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def estimate_request_tokens(system_prompt, user_prompt_template, resume_text, completion_tokens=None):
+    """Estimate the tokens a single evaluation request counts against the TPM budget."""
+    if completion_tokens is None:
+        completion_tokens = DEFAULT_COMPLETION_TOKENS
+    # The template still contains the placeholder, which is close enough for an estimate
+    prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt_template) + estimate_tokens(resume_text)
+    return prompt_tokens + MESSAGE_OVERHEAD_TOKENS + completion_tokens
+
+def load_rate_limits(model_name, config_path=MODEL_OPTIONS_PATH):
+    """Load the RPM/TPM limits for a model from model_options.json."""
+    limits = dict(DEFAULT_RATE_LIMITS)
+    try:
+        with open(config_path, 'r') as f:
+            rate_limits = json.load(f).get("rate_limits", {})
+    except Exception:
+        return limits
+
+    limits.update(rate_limits.get("default", {}))
+    limits.update(rate_limits.get(model_name, {}))
+    return limits
+
+def get_rate_limiter(model_name, config_path=MODEL_OPTIONS_PATH):
+    """Get the shared rate limiter for a model, creating it on first use."""
+    with _limiters_lock:
+        if model_name not in _limiters:
+            limits = load_rate_limits(model_name, config_path)
+            _limiters[model_name] = RateLimiter(limits["requests_per_minute"], limits["tokens_per_minute"])
+        return _limiters[model_name]
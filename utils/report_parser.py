@@ -0,0 +1,177 @@
+"""
+Parser for markdown evaluation reports, shared by the summary scripts and the results store
+"""
+
+import re
+from dataclasses import dataclass, field, asdict
+
+from utils.structured_output import MAX_TOTAL_SCORE
+
+_NUMBER_PATTERN = r'-?\d+(?:\.\d+)?'
+_NUMBER = re.compile(_NUMBER_PATTERN)
+_LINKEDIN_URL = re.compile(r'https?://(?:www\.)?linkedin\.com/\S+')
+# One table cell and the `|` closing it
+_CELL = r'(?P<{}>[^|\n]*)\|'
+
+# Every line the summaries use, as one alternation. Lines are told apart by the name of the
+# group that matched, so each kind of line is described once for all the summaries.
+_REPORT_LINE = re.compile(
+    r'\n[ \t]*(?:'
+    # "# Candidate Name - Current Role"
+    r'\#[ ](?P<title>[^\n]*)'
+    r'|\#+[^\n]*?RECOMMENDATION:(?P<recommendation>[^\n]*)'
+    # Flag table row; the prompt's table has a flag description column, the rendered template's does not
+    rf'|\|[ \t]*(?P<flag>(?P<flag_id>\d+)[ \t]*\|{_CELL.format("flag_category")}(?:{_CELL.format("flag_description")})?'
+    rf'{_CELL.format("flag_critical")}{_CELL.format("flag_score")}{_CELL.format("flag_evidence")})'
+    r'|-[ ](?:'
+    # Bullet markers used for strengths and concerns in resume_prompt.txt
+    r'💪[ \t]*(?P<strength>[^\n]*)'
+    r'|(?:⚠️|⚠|🔍)[ \t]*(?P<concern>[^\n]*)'
+    # The last bold number is the result, e.g. "1 + 2 = **3**"
+    rf'|Sum[ ]of[ ]all[ ]positive[ ]flags[^\n]*\*\*[ \t]*(?P<total>{_NUMBER_PATTERN})[ \t]*\*\*'
+    rf'|Sum[ ]of[ ]positive[ ]critical[ ]flags[^\n]*\*\*[ \t]*(?P<critical>{_NUMBER_PATTERN})[ \t]*\*\*'
+    rf'|Sum[ ]of[ ]all[ ]negative[ ]flags[^\n]*\*\*[ \t]*(?P<red_flags>{_NUMBER_PATTERN})[ \t]*\*\*'
+    rf'|(?:\*\*)?Green[ ]Flag[ ]Percentage[^\d\n-]*(?P<percentage>{_NUMBER_PATTERN})'
+    # Rendered template: "- **Total Score:** 7/10"
+    rf'|\*\*Total[ ]Score:\*\*[ \t]*(?P<template_total>{_NUMBER_PATTERN})'
+    rf'|\*\*Critical[ ]Score:\*\*[ \t]*(?P<template_critical>{_NUMBER_PATTERN})'
+    r'))'
+)
+
+@dataclass
+class FlagRow:
+    """One row of the flag criteria table."""
+    flag_id: int
+    category: str
+    critical: bool
+    score: int
+    evidence: str
+    description: str = ""
+
+@dataclass
+class EvaluationReport:
+    """Everything the summaries use from one evaluation report."""
+    name: str = "Unknown"
+    current_role: str = "Unknown"
+    recommendation: str = "Unknown"
+    total_score: float = 0.0
+    critical_score: float = 0.0
+    red_flag_score: float = 0.0
+    green_flag_percentage: float = 0.0
+    linkedin_url: str = ""
+    flags: list = field(default_factory=list)
+    strengths: list = field(default_factory=list)
+    concerns: list = field(default_factory=list)
+
+    def flag_score(self, flag_id, default=0):
+        """Get the score of a flag by its id."""
+        for flag in self.flags:
+            if flag.flag_id == flag_id:
+                return flag.score
+        return default
+
+    def to_dict(self):
+        return asdict(self)
+
+def _first_number(text):
+    match = _NUMBER.search(text)
+    return match.group(0) if match else None
+
+def _add_bullet(items, text):
+    """Add a strength or concern, skipping the placeholders of unfilled template slots."""
+    text = text.strip()
+    if text and text != "N/A":
+        items.append(text)
+
+def _flag_from_match(match):
+    """Build a FlagRow from the groups of a matched flag table row."""
+    flag_id, category, description, critical, score, evidence = match.group(
+        "flag_id", "flag_category", "flag_description", "flag_critical", "flag_score", "flag_evidence"
+    )
+    try:
+        score = int(score)
+    except ValueError:
+        # Scores like "2/2" count as their first number
+        number = _first_number(score)
+        score = int(float(number)) if number else 0
+    return FlagRow(
+        int(flag_id), category.strip().strip("*"), critical.strip().lower() == "critical",
+        score, evidence.strip(), (description or "").strip()
+    )
+
+def parse_report(content):
+    """
+    Parse a markdown evaluation report.
+
+    Understands both the report format requested by resume_prompt.txt and the one rendered
+    from output_templates.json. If the totals are missing but the flag table is not, they are
+    computed from the flag scores instead of defaulting to 0. If a flag's row appears more
+    than once, the first one counts.
+    """
+    report = EvaluationReport()
+    name_found = False
+    scores = {}
+    flag_ids = set()
+
+    # The leading newline lets the first line match too
+    for match in _REPORT_LINE.finditer("\n" + content):
+        kind = match.lastgroup
+        if kind == "flag":
+            flag = _flag_from_match(match)
+            if flag.flag_id not in flag_ids:
+                flag_ids.add(flag.flag_id)
+                report.flags.append(flag)
+            continue
+
+        value = match.group(kind).strip()
+        if kind == "strength":
+            _add_bullet(report.strengths, value)
+        elif kind == "concern":
+            _add_bullet(report.concerns, value)
+        elif kind == "title":
+            if not name_found:
+                name_found = True
+                name, separator, role = value.partition(" - ")
+                report.name = name.strip()
+                if separator:
+                    report.current_role = role.strip()
+        elif kind == "recommendation":
+            report.recommendation = value.strip("*").strip()
+        else:
+            # Summary lines take precedence over the rendered template's, whichever comes first
+            scores.setdefault(kind, float(value))
+
+    linkedin_match = _LINKEDIN_URL.search(content)
+    if linkedin_match:
+        report.linkedin_url = linkedin_match.group(0)
+
+    total_score = scores.get("total", scores.get("template_total"))
+    critical_score = scores.get("critical", scores.get("template_critical"))
+    red_flag_score = scores.get("red_flags")
+    percentage = scores.get("percentage")
+
+    # Fall back to the flag table when the summary lines are missing
+    positive_flags = [flag for flag in report.flags if flag.score >= 0 and flag.category != "Red Flags"]
+    if total_score is None and report.flags:
+        total_score = sum(flag.score for flag in positive_flags)
+    if critical_score is None and report.flags:
+        critical_score = sum(flag.score for flag in positive_flags if flag.critical)
+    if red_flag_score is None and report.flags:
+        red_flag_score = sum(flag.score for flag in report.flags if flag.score < 0)
+    if percentage is None and total_score is not None:
+        percentage = total_score / MAX_TOTAL_SCORE * 100
+
+    report.total_score = float(total_score or 0)
+    report.critical_score = float(critical_score or 0)
+    report.red_flag_score = float(red_flag_score or 0)
+    report.green_flag_percentage = float(percentage or 0)
+    return report
+
+def parse_report_file(file_path):
+    """Parse the evaluation report stored at `file_path`."""
+    with open(file_path, 'r') as f:
+        return parse_report(f.read())
+
+def is_complete_report(report):
+    """Check that a parsed report has the recommendation and flag table the summaries rely on."""
+    return report.recommendation != "Unknown" and bool(report.flags)
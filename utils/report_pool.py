@@ -0,0 +1,36 @@
+"""
+Multi-process parsing of evaluation reports for the summary scripts
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Chunks handed to each worker over a run; more chunks balance load better, fewer cost less IPC
+CHUNKS_PER_WORKER = 4
+
+def _parse_worker(parse_file, path):
+    """Parse one file in a worker process, returning (path, record, error)."""
+    try:
+        return path, parse_file(path), None
+    except Exception as e:
+        return path, None, str(e)
+
+def parse_files(paths, parse_file, workers=1, chunksize=None):
+    """
+    Call `parse_file(path)` for every path and yield `(path, record, error)` in input order.
+
+    With more than one worker the files are parsed in a process pool, dispatched in chunks
+    so each worker gets a batch of files per round trip. `parse_file` must be a module-level
+    function so it can be sent to the workers, and its records must be picklable.
+    """
+    paths = list(paths)
+    worker_count = min(int(workers or 1), len(paths))
+    if worker_count <= 1:
+        for path in paths:
+            yield _parse_worker(parse_file, path)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(paths) // (worker_count * CHUNKS_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+        yield from executor.map(partial(_parse_worker, parse_file), paths, chunksize=chunksize)
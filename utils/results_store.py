@@ -0,0 +1,258 @@
+"""
+SQLite store of evaluation results, written as evaluations finish and queried by the summary scripts
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from utils.structured_output import FLAG_KEYS, FLAG_CATEGORIES, CRITICAL_FLAG_KEYS
+from utils.report_parser import parse_report
+
+RESULTS_DB_PATH = "evaluations/results.db"
+# Evaluations fetched per query when streaming records
+RECORD_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    candidate_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    current_role TEXT,
+    linkedin_url TEXT,
+    UNIQUE (project, candidate_key)
+);
+
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY,
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    project TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    model TEXT,
+    recommendation TEXT,
+    total_score REAL,
+    critical_score REAL,
+    red_flag_score REAL,
+    green_flag_percentage REAL,
+    report_path TEXT
+);
+
+CREATE TABLE IF NOT EXISTS flag_scores (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations(id) ON DELETE CASCADE,
+    flag_id INTEGER NOT NULL,
+    category TEXT,
+    critical INTEGER NOT NULL DEFAULT 0,
+    score INTEGER,
+    evidence TEXT,
+    PRIMARY KEY (evaluation_id, flag_id)
+);
+
+CREATE TABLE IF NOT EXISTS strengths (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (evaluation_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS concerns (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (evaluation_id, position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_candidates_project ON candidates (project);
+CREATE INDEX IF NOT EXISTS idx_evaluations_candidate ON evaluations (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_evaluations_total_score ON evaluations (project, total_score DESC, critical_score DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_critical_score ON evaluations (project, critical_score DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_recommendation ON evaluations (project, recommendation);
+"""
+
+_results_stores = {}
+_results_stores_lock = threading.Lock()
+
+def record_from_markdown(content):
+    """Build a result record from a markdown evaluation report."""
+    return parse_report(content).to_dict()
+
+def record_from_structured(evaluation):
+    """Build a result record from a parsed structured evaluation."""
+    return {
+        "name": evaluation["candidate_name"],
+        "current_role": evaluation["current_role"],
+        "recommendation": evaluation["recommendation"],
+        "total_score": float(evaluation["total_score"]),
+        "critical_score": float(evaluation["critical_score"]),
+        "red_flag_score": float(evaluation["red_flag_score"]),
+        "green_flag_percentage": float(evaluation["green_flag_percentage"]),
+        "linkedin_url": "",
+        "flags": [
+            {
+                "flag_id": flag_id,
+                "category": FLAG_CATEGORIES[key],
+                "critical": key in CRITICAL_FLAG_KEYS or key == "red_flags",
+                "score": evaluation["flag_scores"][key]["score"],
+                "evidence": evaluation["flag_scores"][key]["explanation"]
+            }
+            for flag_id, key in enumerate(FLAG_KEYS, 1)
+        ],
+        "strengths": list(evaluation["strengths"]),
+        "concerns": list(evaluation["areas_for_improvement"])
+    }
+
+class ResultsStore:
+    """
+    Keep one current evaluation per (project, candidate) in an SQLite database.
+
+    The database runs in WAL mode, so the summary scripts can read it while an
+    evaluation run is writing. Candidates are identified within a project by a key,
+    their name unless the caller has a better one (e.g. the content hash of an upload).
+    Saving a candidate again replaces their previous evaluation. The connection is
+    shared between threads behind a lock.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(_SCHEMA)
+
+    def save_evaluation(self, project, record, report_path=None, model=None, candidate_name=None, candidate_key=None):
+        """
+        Store a result record for a candidate, replacing their previous evaluation. Returns the evaluation id.
+
+        The candidate is identified by `candidate_key` within the project, or by their name if none is given.
+        """
+        name = candidate_name or record["name"]
+        candidate_key = candidate_key or name
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO candidates (project, candidate_key, name, current_role, linkedin_url) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (project, candidate_key) DO UPDATE SET name = excluded.name, "
+                "current_role = excluded.current_role, linkedin_url = excluded.linkedin_url",
+                (project, candidate_key, name, record["current_role"], record["linkedin_url"])
+            )
+            candidate_id = self.connection.execute(
+                "SELECT id FROM candidates WHERE project = ? AND candidate_key = ?", (project, candidate_key)
+            ).fetchone()["id"]
+
+            # Flags, strengths and concerns of the old evaluation go with it
+            self.connection.execute("DELETE FROM evaluations WHERE candidate_id = ?", (candidate_id,))
+            evaluation_id = self.connection.execute(
+                "INSERT INTO evaluations (candidate_id, project, created_at, model, recommendation, total_score, "
+                "critical_score, red_flag_score, green_flag_percentage, report_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (candidate_id, project, time.time(), model, record["recommendation"], record["total_score"],
+                 record["critical_score"], record["red_flag_score"], record["green_flag_percentage"],
+                 str(report_path) if report_path else None)
+            ).lastrowid
+
+            self.connection.executemany(
+                "INSERT INTO flag_scores (evaluation_id, flag_id, category, critical, score, evidence) VALUES (?, ?, ?, ?, ?, ?)",
+                [(evaluation_id, flag["flag_id"], flag["category"], int(flag["critical"]), flag["score"], flag["evidence"])
+                 for flag in record["flags"]]
+            )
+            for table, texts in (("strengths", record["strengths"]), ("concerns", record["concerns"])):
+                self.connection.executemany(
+                    f"INSERT INTO {table} (evaluation_id, position, text) VALUES (?, ?, ?)",
+                    [(evaluation_id, position, text) for position, text in enumerate(texts)]
+                )
+            return evaluation_id
+
+    def _project_filter(self, project):
+        """
+        Build the WHERE clause and parameters restricting a query to a project (or none).
+
+        A project includes its sub-projects, so "streamlit" also selects every "streamlit/<job id>" batch.
+        """
+        if project is None:
+            return "", ()
+        prefix = project + "/"
+        return "WHERE (e.project = ? OR substr(e.project, 1, ?) = ?)", (project, len(prefix), prefix)
+
+    def _records_query(self, project=None):
+        """Build the query selecting result rows ordered by total and critical score, best first."""
+        where, params = self._project_filter(project)
+        query = (
+            "SELECT e.id, e.project, e.created_at, e.model, e.recommendation, e.total_score, e.critical_score, e.red_flag_score, "
+            "e.green_flag_percentage, e.report_path, c.name, c.current_role, c.linkedin_url "
+            f"FROM evaluations e JOIN candidates c ON c.id = e.candidate_id {where} "
+            "ORDER BY e.total_score DESC, e.critical_score DESC, e.id"
+        )
+        return query, params
+
+    def _build_records(self, rows):
+        """Turn evaluation rows into records with their flags, strengths and concerns. Call with the lock held."""
+        records = {row["id"]: {**dict(row), "flags": [], "strengths": [], "concerns": []} for row in rows}
+        if not records:
+            return []
+
+        # Fetch the child rows of all selected evaluations in one query per table
+        ids = list(records)
+        placeholders = ", ".join("?" for _ in ids)
+        for flag in self.connection.execute(
+            f"SELECT * FROM flag_scores WHERE evaluation_id IN ({placeholders}) ORDER BY flag_id", ids
+        ):
+            records[flag["evaluation_id"]]["flags"].append({
+                "flag_id": flag["flag_id"],
+                "category": flag["category"],
+                "critical": bool(flag["critical"]),
+                "score": flag["score"],
+                "evidence": flag["evidence"]
+            })
+        for table in ("strengths", "concerns"):
+            for item in self.connection.execute(
+                f"SELECT * FROM {table} WHERE evaluation_id IN ({placeholders}) ORDER BY position", ids
+            ):
+                records[item["evaluation_id"]][table].append(item["text"])
+
+        return [records[row["id"]] for row in rows]
+
+    def get_records(self, project=None, limit=None):
+        """Get result records ordered by total and critical score, best first."""
+        query, params = self._records_query(project)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (int(limit),)
+
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+            return self._build_records(rows)
+
+    def iter_records(self, project=None, batch_size=RECORD_BATCH_SIZE):
+        """
+        Yield the records of `get_records` in the same order, `batch_size` at a time.
+
+        Only one batch of records is held at once, so summaries over large projects don't
+        grow with the number of evaluations.
+        """
+        query, params = self._records_query(project)
+        with self._lock:
+            cursor = self.connection.execute(query, params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    records = self._build_records(rows)
+                yield from records
+        finally:
+            cursor.close()
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+def get_results_store(path=RESULTS_DB_PATH):
+    """Get the shared results store for a database path, opening it on first use."""
+    with _results_stores_lock:
+        if path not in _results_stores:
+            _results_stores[path] = ResultsStore(path)
+        return _results_stores[path]
@@ -2,86 +2,327 @@
 Utility functions for processing resumes
 """
 
+import io
 import os
+import asyncio
 import json
 import PyPDF2
 import pdfplumber
-from openai import OpenAI
 from pathlib import Path
+from utils.rate_limiter import get_rate_limiter, estimate_request_tokens
+from utils.openai_clients import get_openai_client, get_async_openai_client
+from utils.evaluation_cache import get_evaluation_cache, evaluation_cache_key
+from utils.extraction_cache import get_extraction_cache, pdf_content_hash
+from utils.prompt_builder import build_messages, usage_tokens
+from utils.retry_policy import RetryPolicy, RetryBudget
+from utils.endpoint_guard import get_endpoint_guard
+from utils.disk_cache import evict_files
 
-def extract_text_from_pdf_bytes(pdf_bytes):
-    """Extract text from PDF bytes (for Streamlit file uploader)"""
+# Uploaded PDFs are kept on disk instead of in the Streamlit session
+UPLOAD_DIR = ".cache/uploads"
+# Uploads hold candidates' personal data, so they are removed after a day without being uploaded
+# again, and the oldest go first once the directory passes its size cap
+UPLOAD_MAX_AGE_SECONDS = 24 * 60 * 60
+UPLOAD_MAX_BYTES = 500 * 1024 * 1024
+# Uploads spooled (or uploaded again) this recently are never evicted, even over the size cap, so a batch
+# queued in another session still finds its files
+UPLOAD_GRACE_SECONDS = 2 * 60 * 60
+
+# Requests kept in flight by evaluate_resumes_async when the caller does not choose a limit
+DEFAULT_ASYNC_CONCURRENCY = 16
+
+def extract_pdf(pdf_bytes):
+    """Extract text from a PDF stream, returning the text, the extractor used and the page count"""
     text = ""
+    extractor = "PyPDF2"
     try:
         # Using PyPDF2
         pdf_reader = PyPDF2.PdfReader(pdf_bytes)
+        page_count = len(pdf_reader.pages)
         for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+            text += (page.extract_text() or "") + "\n"
             
         # If PyPDF2 extraction is poor, try pdfplumber as backup
         if len(text.strip()) < 100:  # Arbitrary threshold
+            pdf_bytes.seek(0)
             with pdfplumber.open(pdf_bytes) as pdf:
                 text = ""
+                extractor = "pdfplumber"
+                page_count = len(pdf.pages)
                 for page in pdf.pages:
-                    text += page.extract_text() + "\n"
+                    text += (page.extract_text() or "") + "\n"
                     
-        return text.strip()
+        return {"text": text.strip(), "extractor": extractor, "page_count": page_count}
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {e}")
 
-def extract_text_from_pdf_file(pdf_path):
+def extract_text_from_pdf_bytes(pdf_bytes, use_cache=True):
+    """Extract text from PDF bytes (for Streamlit file uploader), reusing cached text for unchanged files"""
+    pdf_data = pdf_bytes.read() if hasattr(pdf_bytes, 'read') else pdf_bytes
+    content_hash = pdf_content_hash(pdf_data)
+    
+    # Skip parsing if these exact bytes were extracted before
+    if use_cache:
+        cached_extraction = get_extraction_cache().get(content_hash)
+        if cached_extraction:
+            return cached_extraction["text"]
+    
+    extraction = extract_pdf(io.BytesIO(pdf_data))
+    get_extraction_cache().set(content_hash, extraction)
+    return extraction["text"]
+
+def extract_text_from_pdf_file(pdf_path, use_cache=True):
     """Extract text from a PDF file path"""
     try:
         with open(pdf_path, 'rb') as file:
-            return extract_text_from_pdf_bytes(file)
+            return extract_text_from_pdf_bytes(file, use_cache=use_cache)
     except Exception as e:
         raise Exception(f"Error opening PDF file: {e}")
 
-def evaluate_resume_with_ai(resume_text, system_prompt, user_prompt_template, model_name, api_key):
-    """Evaluate the resume using OpenAI API"""
-    client = OpenAI(api_key=api_key)
+def save_uploaded_pdf(pdf_data, upload_dir=UPLOAD_DIR):
+    """Spool uploaded PDF bytes to disk under their content hash and return the file path"""
+    upload_dir = Path(upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = upload_dir / f"{pdf_content_hash(pdf_data)}.pdf"
+    if pdf_path.exists():
+        # Uploading it again restarts its age
+        os.utime(pdf_path)
+    else:
+        pdf_path.write_bytes(pdf_data)
+    return str(pdf_path)
+
+def prune_uploaded_pdfs(upload_dir=UPLOAD_DIR, max_age_seconds=UPLOAD_MAX_AGE_SECONDS, max_bytes=UPLOAD_MAX_BYTES,
+                        grace_seconds=UPLOAD_GRACE_SECONDS):
+    """Evict expired spooled uploads, then the oldest until under `max_bytes`; returns how many were removed"""
+    # The directory is shared by every session, so uploads another session may still be evaluating stay
+    return evict_files(Path(upload_dir).glob("*.pdf"), max_bytes=max_bytes, max_age_seconds=max_age_seconds,
+                       min_age_seconds=grace_seconds)
+
+class EvaluationStream:
+    """Iterate over the report text of a streamed evaluation; `result` holds the result dict once the stream ends"""
     
-    # Format the user prompt with the resume text
-    user_prompt = user_prompt_template.format(resume_text=resume_text)
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.result = None
     
-    # Remove JSON forcing code - we want to preserve the markdown format
-    # We don't need to modify the prompts anymore to force JSON
+    def __iter__(self):
+        # The chunk generator returns the finished result dict
+        self.result = yield from self._chunks
+
+def evaluate_resume_with_ai(resume_text, system_prompt, user_prompt_template, model_name, api_key,
+                            temperature=None, use_cache=True, stream=False, retry_policy=None):
+    """
+    Evaluate the resume using OpenAI API, reusing a cached evaluation of identical input if available.
+    
+    With stream=True, returns an EvaluationStream that yields the markdown report as it is generated.
+    Failed requests are retried per `retry_policy` (pass one per batch to share its retry budget).
+    """
+    # Return the stored evaluation if this exact resume/prompt/model combination was scored before
+    cache_key = evaluation_cache_key(resume_text, system_prompt, user_prompt_template, model_name, temperature)
+    if use_cache:
+        cached_result = get_evaluation_cache().get(cache_key)
+        if cached_result:
+            if stream:
+                return EvaluationStream(_replay_cached(cached_result))
+            return {**cached_result, "_cached": True}
+    
+    # Reuse the pooled client so bulk runs keep their connections warm; retries are left to the retry policy
+    client = get_openai_client(api_key).with_options(max_retries=0)
+    retry_policy = retry_policy or RetryPolicy()
+    
+    messages, request_options = _build_request(resume_text, system_prompt, user_prompt_template, temperature)
     
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt}
-    ]
+    # Each attempt waits until the model's RPM/TPM budget admits it
+    rate_limiter = get_rate_limiter(model_name)
+    estimated_tokens = estimate_request_tokens(system_prompt, user_prompt_template, resume_text)
+    
+    if stream:
+        return EvaluationStream(_stream_evaluation(
+            client, model_name, messages, request_options, cache_key, rate_limiter, estimated_tokens, retry_policy
+        ))
     
     try:
         # Make API request without forcing JSON format
-        response = client.chat.completions.create(
+        response = _send_with_retries(
+            retry_policy, rate_limiter, estimated_tokens, client.chat.completions.create,
             model=model_name,
-            messages=messages
+            messages=messages,
+            **request_options
             # Removed response_format={"type": "json_object"} to allow markdown
         )
-        
-        # Get the response content
-        response_content = response.choices[0].message.content
-        
-        # Return a dictionary with the raw markdown content
-        return {
-            "markdown_content": response_content,
-            "_raw_response": response_content
-        }
+        return _store_response(response, cache_key, rate_limiter, estimated_tokens)
         
     except Exception as e:
-        # Wrap any API errors in a dict with explanation
-        error_details = {
-            "error": f"Error evaluating resume with AI: {e}",
-            "_raw_response": str(e)
-        }
-        if hasattr(e, 'response'):
-            error_details["response"] = str(e.response)
-        if hasattr(e, 'status_code'):
-            error_details["status_code"] = e.status_code
+        raise Exception(f"Error evaluating resume with AI: {e}")
+
+def _send_with_retries(retry_policy, rate_limiter, estimated_tokens, create, **request):
+    """
+    Send a request, retrying per the policy. Each attempt waits for the rate limits, then for a
+    slot under the model's adaptive concurrency limit, and fails fast while its circuit is open
+    """
+    endpoint_guard = get_endpoint_guard(request["model"])
+    def attempt():
+        rate_limiter.acquire(estimated_tokens)
+        try:
+            with endpoint_guard.request():
+                return create(**request)
+        except Exception:
+            # A failed attempt produced no completion, so give its estimate back before the retry takes another
+            rate_limiter.reconcile(estimated_tokens, 0)
+            raise
+    return retry_policy.call(attempt)
+
+async def _send_with_retries_async(retry_policy, rate_limiter, estimated_tokens, create, **request):
+    """Async version of _send_with_retries; waits without blocking the event loop"""
+    endpoint_guard = get_endpoint_guard(request["model"])
+    async def attempt():
+        await rate_limiter.acquire_async(estimated_tokens)
+        try:
+            async with endpoint_guard.request_async():
+                return await create(**request)
+        except Exception:
+            rate_limiter.reconcile(estimated_tokens, 0)
+            raise
+    return await retry_policy.call_async(attempt)
+
+def _build_request(resume_text, system_prompt, user_prompt_template, temperature):
+    """Build the chat messages and optional request parameters for one evaluation"""
+    # The prompts shared by every resume come first and the resume last, so the provider can cache the prefix
+    messages = build_messages(system_prompt, user_prompt_template, resume_text)
+    
+    # Remove JSON forcing code - we want to preserve the markdown format
+    # We don't need to modify the prompts anymore to force JSON
+    
+    # Only send a temperature when the caller chose one
+    request_options = {}
+    if temperature is not None:
+        request_options["temperature"] = temperature
+    
+    return messages, request_options
+
+def _store_response(response, cache_key, rate_limiter, estimated_tokens):
+    """Turn a chat completion into the evaluation result dict and cache it"""
+    return _finish_evaluation(response.choices[0].message.content, getattr(response, "usage", None),
+                              cache_key, rate_limiter, estimated_tokens)
+
+def _finish_evaluation(response_content, usage, cache_key, rate_limiter, estimated_tokens):
+    """Build the evaluation result dict from the report text and cache it"""
+    # Correct the token budget with the real usage
+    if usage:
+        rate_limiter.reconcile(estimated_tokens, usage.total_tokens)
+    
+    # Return a dictionary with the raw markdown content
+    result = {
+        "markdown_content": response_content,
+        "_raw_response": response_content
+    }
+    
+    # Store the evaluation even when bypassing, so the fresh result replaces any stale one
+    get_evaluation_cache().set(cache_key, result)
+    
+    # Token counts belong to this request only, so they are not cached
+    return {**result, "_cached": False, "_usage": usage_tokens(usage)}
+
+def _stream_evaluation(client, model_name, messages, request_options, cache_key, rate_limiter, estimated_tokens, retry_policy):
+    """Yield the report text as it arrives, then cache the finished evaluation and return its result dict"""
+    content_parts = []
+    usage = None
+    try:
+        # Only opening the stream is retried (and timed by the endpoint guard); once text has been shown it cannot be taken back
+        response = _send_with_retries(
+            retry_policy, rate_limiter, estimated_tokens, client.chat.completions.create,
+            model=model_name,
+            messages=messages,
+            stream=True,
+            # Usage arrives in a final chunk without choices
+            stream_options={"include_usage": True},
+            **request_options
+        )
+        for chunk in response:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                content_parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise Exception(f"Error evaluating resume with AI: {e}")
+    
+    return _finish_evaluation("".join(content_parts), usage, cache_key, rate_limiter, estimated_tokens)
+
+def _replay_cached(cached_result):
+    """Yield a cached report as a single chunk and return its result dict"""
+    yield cached_result["markdown_content"]
+    return {**cached_result, "_cached": True}
+
+async def evaluate_resume_with_ai_async(resume_text, system_prompt, user_prompt_template, model_name, api_key,
+                                        temperature=None, use_cache=True, retry_policy=None):
+    """
+    Async version of evaluate_resume_with_ai, using the pooled async client of the running event loop.
+    
+    The evaluation cache is read and written in a worker thread, as a write can prune the whole cache
+    directory and would otherwise stall every coroutine on the loop.
+    """
+    cache_key = evaluation_cache_key(resume_text, system_prompt, user_prompt_template, model_name, temperature)
+    if use_cache:
+        cached_result = await asyncio.to_thread(get_evaluation_cache().get, cache_key)
+        if cached_result:
+            return {**cached_result, "_cached": True}
+    
+    client = get_async_openai_client(api_key).with_options(max_retries=0)
+    retry_policy = retry_policy or RetryPolicy()
+    messages, request_options = _build_request(resume_text, system_prompt, user_prompt_template, temperature)
+    
+    # Each attempt waits for the shared RPM/TPM budget without blocking the event loop
+    rate_limiter = get_rate_limiter(model_name)
+    estimated_tokens = estimate_request_tokens(system_prompt, user_prompt_template, resume_text)
+    
+    try:
+        response = await _send_with_retries_async(
+            retry_policy, rate_limiter, estimated_tokens, client.chat.completions.create,
+            model=model_name,
+            messages=messages,
+            **request_options
+        )
+        return await asyncio.to_thread(_store_response, response, cache_key, rate_limiter, estimated_tokens)
         
+    except Exception as e:
         raise Exception(f"Error evaluating resume with AI: {e}")
 
+async def evaluate_resumes_async(items, system_prompt, user_prompt_template, model_name, api_key,
+                                 temperature=None, use_cache=True, max_concurrency=DEFAULT_ASYNC_CONCURRENCY,
+                                 retry_policy=None):
+    """
+    Evaluate many resumes concurrently from one thread, returning the results in input order.
+    
+    Each item is a dict with "filename" and "text". At most `max_concurrency` requests are in
+    flight at once, and fewer while the model's adaptive concurrency limit is lower. Each result is `{"filename", **evaluate_resume_with_ai result}`, or
+    `{"filename", "error", "_raw_response"}` if that evaluation failed. Unless a `retry_policy`
+    is given, the items share a default policy with a retry budget sized for the batch.
+    """
+    items = list(items)
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+    retry_policy = retry_policy or RetryPolicy(budget=RetryBudget.for_batch(len(items)))
+    
+    async def evaluate_item(item):
+        async with semaphore:
+            try:
+                evaluation_result = await evaluate_resume_with_ai_async(
+                    item["text"],
+                    system_prompt,
+                    user_prompt_template,
+                    model_name,
+                    api_key,
+                    temperature=temperature,
+                    use_cache=use_cache,
+                    retry_policy=retry_policy
+                )
+                return {"filename": item["filename"], **evaluation_result}
+            except Exception as e:
+                error_msg = f"Error evaluating {item['filename']}: {e}"
+                return {"filename": item["filename"], "error": error_msg, "_raw_response": str(e)}
+    
+    return await asyncio.gather(*(evaluate_item(item) for item in items))
+
 def get_available_templates():
     """Get list of available templates from the configure directory"""
     templates = []
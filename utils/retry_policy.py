@@ -0,0 +1,182 @@
+"""
+Shared retry policy for API calls: error classification, Retry-After, capped exponential backoff with jitter
+"""
+
+import asyncio
+import email.utils
+import math
+import random
+import threading
+import time
+
+import httpx
+import openai
+
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+TIMEOUT = "timeout"
+PERMANENT = "permanent"
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+# A server asking for a longer wait than this is treated as a permanent failure for the batch
+MAX_RETRY_AFTER = 300.0
+
+# A batch may spend this many retries per item, but at least MIN_RETRY_BUDGET in total
+RETRY_BUDGET_PER_ITEM = 0.5
+MIN_RETRY_BUDGET = 10
+
+def _status_code(error):
+    status_code = getattr(error, "status_code", None)
+    if status_code is None and getattr(error, "response", None) is not None:
+        status_code = getattr(error.response, "status_code", None)
+    return status_code
+
+def classify_error(error):
+    """Classify an exception from an API call as rate_limit, transient, timeout or permanent."""
+    # Wrapped errors are classified by their cause
+    while not isinstance(error, (openai.OpenAIError, httpx.HTTPError)) and error.__cause__ is not None:
+        error = error.__cause__
+
+    if isinstance(error, (openai.APITimeoutError, httpx.TimeoutException, TimeoutError)):
+        return TIMEOUT
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError, ConnectionError)):
+        return TRANSIENT
+
+    status_code = _status_code(error)
+    if status_code == 429:
+        # An exhausted quota does not come back by waiting
+        if getattr(error, "code", None) == "insufficient_quota":
+            return PERMANENT
+        return RATE_LIMIT
+    if status_code in (408, 409) or (status_code is not None and status_code >= 500):
+        return TRANSIENT
+    return PERMANENT
+
+def retry_after_seconds(error):
+    """Get the wait the server asked for in retry-after-ms or Retry-After (seconds or an HTTP date), or None."""
+    # Errors raised locally (e.g. an open circuit breaker) can carry the wait themselves
+    if getattr(error, "retry_after", None) is not None:
+        return max(0.0, float(error.retry_after))
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+    except ValueError:
+        pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryBudget:
+    """
+    Retries left for one batch, shared by all of its threads or tasks.
+
+    Once the budget is spent, further failures are not retried, so a batch hitting a
+    persistent outage fails fast instead of every item waiting out its full backoff.
+    """
+
+    def __init__(self, max_retries):
+        self.remaining = max_retries
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_batch(cls, item_count):
+        """Size a budget for a batch of `item_count` items."""
+        return cls(max(MIN_RETRY_BUDGET, math.ceil(item_count * RETRY_BUDGET_PER_ITEM)))
+
+    def try_spend(self):
+        """Take one retry from the budget. Returns False if none are left."""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            self.spent += 1
+            return True
+
+class RetryPolicy:
+    """
+    Retry failed API calls that can succeed later, and give up at once on permanent errors.
+
+    The wait before each retry is what the server asked for in Retry-After, if anything,
+    and otherwise full-jitter exponential backoff: a random delay between 0 and
+    `base_delay * 2 ** retry`, capped at `max_delay`. Jitter keeps the threads of a bulk
+    run that failed together from retrying in lockstep. Each retry also spends one from the
+    `budget` shared by the batch, if given. Only the failing call waits; other requests in
+    flight carry on, as the sync path sleeps in its own worker thread and the async path awaits.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, budget=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def retry_delay(self, error, retry_number):
+        """
+        Get the seconds to wait before retry `retry_number` (0 for the first) after `error`,
+        or None if the call should not be retried.
+        """
+        error_class = classify_error(error)
+        if error_class == PERMANENT or retry_number + 1 >= self.max_attempts:
+            return None
+
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry_number))
+        elif delay > MAX_RETRY_AFTER:
+            return None
+
+        if self.budget is not None and not self.budget.try_spend():
+            return None
+        return delay
+
+    def call(self, function, *args, on_retry=None, **kwargs):
+        """
+        Call `function(*args, **kwargs)`, retrying as the policy allows, and return its result.
+
+        `on_retry(error, delay, retry_number)` is called before each wait. The last error is raised.
+        """
+        retry_number = 0
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(e, retry_number)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(e, delay, retry_number)
+                time.sleep(delay)
+                retry_number += 1
+
+    async def call_async(self, function, *args, on_retry=None, **kwargs):
+        """Async version of call, for a coroutine function; waits without blocking the event loop."""
+        retry_number = 0
+        while True:
+            try:
+                return await function(*args, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(e, retry_number)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(e, delay, retry_number)
+                await asyncio.sleep(delay)
+                retry_number += 1
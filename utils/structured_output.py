@@ -0,0 +1,216 @@
+"""
+Structured (JSON) evaluation output: the schema sent to the model, a validator for its replies,
+and local rendering of the markdown report from the output templates
+"""
+
+import json
+import re
+from pathlib import Path
+
+# Rubric flags from resume_prompt.txt, keyed as in output_templates.json, in report order
+FLAG_KEYS = [
+    "ai_ml_experience",
+    "llm_nlp_specialization",
+    "rag_implementation",
+    "startup_mentality",
+    "stem_degree",
+    "red_flags"
+]
+
+# Category of each flag as named in the rubric
+FLAG_CATEGORIES = {
+    "ai_ml_experience": "AI/ML Experience & Engineering",
+    "llm_nlp_specialization": "LLM/NLP Specialization & Engineering",
+    "rag_implementation": "Production-Grade RAG Implementation",
+    "startup_mentality": "Startup Mentality & Hands-on Ownership",
+    "stem_degree": "STEM",
+    "red_flags": "Red Flags"
+}
+
+# Positive flags that count towards the critical score
+CRITICAL_FLAG_KEYS = ["ai_ml_experience", "llm_nlp_specialization", "rag_implementation"]
+
+RECOMMENDATIONS = ["Reject", "Consider", "Strong Candidate"]
+
+# Maximum of the positive flag scores (5 flags x 2 points)
+MAX_TOTAL_SCORE = 10
+
+def _flag_schema(score_schema):
+    return {
+        "type": "object",
+        "properties": {
+            "score": score_schema,
+            "explanation": {"type": "string"}
+        },
+        "required": ["score", "explanation"],
+        "additionalProperties": False
+    }
+
+# JSON schema for the model's reply; every field is required, as strict structured outputs expect
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "candidate_name": {"type": "string"},
+        "current_role": {"type": "string"},
+        "recommendation": {"type": "string", "enum": RECOMMENDATIONS},
+        "flag_scores": {
+            "type": "object",
+            "properties": {
+                **{key: _flag_schema({"type": "integer", "enum": [0, 1, 2]}) for key in FLAG_KEYS[:-1]},
+                # Red flags are zero or negative points
+                "red_flags": _flag_schema({"type": "integer"})
+            },
+            "required": FLAG_KEYS,
+            "additionalProperties": False
+        },
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "areas_for_improvement": {"type": "array", "items": {"type": "string"}},
+        "overall_impression": {
+            "type": "object",
+            "properties": {"explanation": {"type": "string"}},
+            "required": ["explanation"],
+            "additionalProperties": False
+        },
+        "summary": {"type": "string"}
+    },
+    "required": [
+        "candidate_name", "current_role", "recommendation", "flag_scores",
+        "strengths", "areas_for_improvement", "overall_impression", "summary"
+    ],
+    "additionalProperties": False
+}
+
+# Sent with the rubric prompt, which otherwise asks for a markdown report
+STRUCTURED_OUTPUT_INSTRUCTIONS = (
+    "Return the evaluation as a JSON object matching the provided schema instead of a markdown report. "
+    "Score each flag in flag_scores using the rubric, with the evidence as its explanation. "
+    "Red flags are 0 or a negative number. Do not calculate totals; they are computed from the flag scores."
+)
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool
+}
+
+def get_response_format():
+    """Get the `response_format` request parameter for structured evaluations."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "resume_evaluation", "strict": True, "schema": EVALUATION_SCHEMA}
+    }
+
+def _validate(value, schema, path, errors):
+    """Check a value against the subset of JSON schema used by EVALUATION_SCHEMA, collecting errors."""
+    expected_type = _JSON_TYPES[schema["type"]]
+    # bool is a subclass of int, but not a JSON integer
+    if not isinstance(value, expected_type) or (isinstance(value, bool) and schema["type"] != "boolean"):
+        errors.append(f"{path}: expected {schema['type']}, got {type(value).__name__}")
+        return
+
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if schema["type"] == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing")
+        for key, item in value.items():
+            if key in schema.get("properties", {}):
+                _validate(item, schema["properties"][key], f"{path}.{key}", errors)
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}.{key}: unexpected field")
+    elif schema["type"] == "array":
+        for index, item in enumerate(value):
+            _validate(item, schema["items"], f"{path}[{index}]", errors)
+
+def validate_evaluation(evaluation):
+    """Raise an exception listing every way an evaluation deviates from EVALUATION_SCHEMA."""
+    errors = []
+    _validate(evaluation, EVALUATION_SCHEMA, "evaluation", errors)
+    if not errors and evaluation["flag_scores"]["red_flags"]["score"] > 0:
+        errors.append("evaluation.flag_scores.red_flags.score: must be 0 or negative")
+    if errors:
+        raise Exception(f"Invalid structured evaluation: {'; '.join(errors)}")
+
+def add_scores(evaluation):
+    """Return a copy of an evaluation with the totals computed from its flag scores."""
+    flag_scores = evaluation["flag_scores"]
+    total_score = sum(flag_scores[key]["score"] for key in FLAG_KEYS if key != "red_flags")
+    return {
+        **evaluation,
+        "total_score": total_score,
+        "critical_score": sum(flag_scores[key]["score"] for key in CRITICAL_FLAG_KEYS),
+        "red_flag_score": flag_scores["red_flags"]["score"],
+        "green_flag_percentage": round(total_score / MAX_TOTAL_SCORE * 100)
+    }
+
+def parse_structured_evaluation(response_text):
+    """Parse and validate a structured evaluation reply, returning it with the computed scores."""
+    try:
+        evaluation = json.loads(response_text)
+    except ValueError as e:
+        raise Exception(f"Structured evaluation is not valid JSON: {e}")
+
+    validate_evaluation(evaluation)
+    return add_scores(evaluation)
+
+def load_structured_evaluation(json_path):
+    """Load a saved `<name>_evaluation.json` file, validating it and refreshing the computed scores."""
+    with open(json_path, 'r') as f:
+        evaluation = json.load(f)
+
+    validate_evaluation({key: value for key, value in evaluation.items() if key in EVALUATION_SCHEMA["properties"]})
+    return add_scores(evaluation)
+
+def structured_evaluation_path(markdown_path):
+    """Get the JSON file saved next to a `<name>_evaluation.md` report."""
+    return Path(markdown_path).with_suffix(".json")
+
+# Any placeholder: "{summary}", "{flag_scores[red_flags][score]}" or "{strengths[]}"
+_PLACEHOLDER = re.compile(r'\{([^{}]+)\}')
+# "{strengths[]}": the whole list, one template line per item
+_LIST_PLACEHOLDER = re.compile(r'\{(\w+)\[\]\}')
+
+def _field_value(placeholder, data_dict):
+    """Look up `field` or `field[key][index]` in nested dicts and lists, as "N/A" if missing."""
+    # Handle nested dictionary access with square brackets like flag_scores[ai_ml_experience][score]
+    parts = [part for part in re.split(r'[\[\]]', placeholder) if part]
+    value = data_dict
+    for part in parts:
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return "N/A"
+    return str(value)
+
+def format_template(template_str, data_dict):
+    """
+    Fill `{field}` and `{field[key][index]}` placeholders from nested dicts and lists.
+
+    A line with a `{field[]}` placeholder is repeated once per item of that list, so lists of
+    any length render without empty or missing entries. Missing fields are rendered as "N/A"
+    instead of raising, so one gap in an evaluation does not lose the whole report. Each line
+    is filled in one pass, so braces in the model's text are never expanded as placeholders.
+    """
+    lines = []
+    for line in template_str.split("\n"):
+        list_match = _LIST_PLACEHOLDER.search(line)
+        if not list_match:
+            lines.append(_PLACEHOLDER.sub(lambda match: _field_value(match.group(1), data_dict), line))
+            continue
+
+        items = data_dict.get(list_match.group(1))
+        if not isinstance(items, list) or not items:
+            items = ["N/A"]
+        for item in items:
+            lines.append(_PLACEHOLDER.sub(
+                lambda match: str(item) if match.group(0) == list_match.group(0) else _field_value(match.group(1), data_dict),
+                line
+            ))
+    return "\n".join(lines)
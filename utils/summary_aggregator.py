@@ -0,0 +1,69 @@
+"""
+Streaming aggregation of candidate records for the summary scripts
+"""
+
+import heapq
+from collections import Counter
+
+class TopK:
+    """
+    Keep the `k` best items seen so far in a bounded min-heap.
+
+    Ties rank in arrival order, so `items()` matches `sorted(all_items, key=key, reverse=True)[:k]`
+    (which is stable) while holding at most `k` items.
+    """
+
+    def __init__(self, k, key):
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._count = 0
+
+    def add(self, item):
+        # Among equal keys a later item ranks lower, so it gets the smaller -index
+        entry = (self.key(item), -self._count, item)
+        self._count += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Get the kept items, best first."""
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+class SummaryAggregator:
+    """
+    Running statistics of generate_summary's candidate records, plus the top `top_k` candidates.
+
+    Candidates are only held for the top list, so memory does not grow with the number of
+    evaluations; the strength and concern tallies grow with the number of distinct texts.
+    """
+
+    def __init__(self, top_k, key):
+        self.count = 0
+        self.recommendation_counts = Counter()
+        self.score_sums = {"total_score": 0, "critical_score": 0}
+        self.strength_counts = Counter()
+        self.improvement_counts = Counter()
+        self.top = TopK(top_k, key)
+
+    def add(self, candidate):
+        self.count += 1
+        self.recommendation_counts[candidate["recommendation"]] += 1
+        for field in self.score_sums:
+            self.score_sums[field] += candidate[field]
+        self.strength_counts.update(candidate["strengths"])
+        self.improvement_counts.update(candidate["improvements"])
+        self.top.add(candidate)
+
+    def average(self, field):
+        """Get the average of a score field, or 0 if there are no candidates."""
+        return self.score_sums[field] / self.count if self.count > 0 else 0
+
+    def most_common_strengths(self, n):
+        # Counter.most_common keeps first-seen order among equal counts, like a stable sort
+        return self.strength_counts.most_common(n)
+
+    def most_common_improvements(self, n):
+        return self.improvement_counts.most_common(n)
@@ -0,0 +1,113 @@
+"""
+Manifest of parsed evaluation files, so summaries only re-parse files that changed since the last run
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from utils.report_pool import parse_files
+
+SUMMARY_MANIFEST_DIR = ".cache/summaries"
+
+def _file_signature(path):
+    """Get `[mtime_ns, size]` for a file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _content_hash(paths):
+    """Hash the contents of the existing files among `paths`."""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+    return digest.hexdigest()
+
+class SummaryManifest:
+    """
+    Map each evaluation file to (mtime, size, hash) and the record parsed from it.
+
+    A file is re-parsed only if its modification time or size changed and its content
+    hash differs too, so touched-but-identical files are not parsed again. Records must
+    be JSON-serialisable. Bump `version` whenever the parser's record shape changes, which
+    discards every cached record.
+    """
+
+    def __init__(self, name, version, manifest_dir=SUMMARY_MANIFEST_DIR):
+        self.path = Path(manifest_dir) / f"{name}.json"
+        self.version = version
+        self.entries = {}
+        self.parsed_count = 0
+        self._load()
+
+    def _load(self):
+        """Read the manifest, starting empty if it is missing, unreadable or from another version."""
+        try:
+            with open(self.path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") == self.version:
+            self.entries = manifest.get("entries", {})
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, 'w') as f:
+            json.dump({"version": self.version, "entries": self.entries}, f)
+        os.replace(temp_path, self.path)
+
+    def get_records(self, paths, parse_file, related_paths=None, workers=1):
+        """
+        Get the record of every file in `paths`, calling `parse_file(path)` only for new or changed files.
+
+        `related_paths(path)` may list other files whose changes also invalidate the record,
+        like the structured JSON saved next to a markdown report. Changed files are parsed
+        together, in `workers` processes when that is more than one. Returns `(path, record)`
+        pairs in input order; files that fail to parse are reported and skipped. Entries for
+        files no longer in `paths` are dropped.
+        """
+        paths = list(paths)
+        entries = {}
+        changed = False
+        to_parse = []
+        self.parsed_count = 0
+
+        for path in paths:
+            key = str(path)
+            sources = [path] + list(related_paths(path) if related_paths else [])
+            signature = [_file_signature(source) for source in sources]
+            entry = self.entries.get(key)
+
+            if not entry or entry["signature"] != signature:
+                changed = True
+                content_hash = _content_hash(sources)
+                if entry and entry["hash"] == content_hash:
+                    # Touched but unchanged, so keep the record and remember the new signature
+                    entry = {**entry, "signature": signature}
+                else:
+                    to_parse.append(path)
+                    entry = {"signature": signature, "hash": content_hash, "record": None}
+
+            entries[key] = entry
+
+        for path, record, error in parse_files(to_parse, parse_file, workers=workers):
+            if error:
+                print(f"Error processing {path}: {error}")
+                del entries[str(path)]
+            else:
+                entries[str(path)]["record"] = record
+                self.parsed_count += 1
+
+        if changed or len(entries) != len(self.entries):
+            self.entries = entries
+            self.save()
+        return [(path, entries[str(path)]["record"]) for path in paths if str(path) in entries]